@@ -2,12 +2,20 @@
 Adapters - Implementações concretas das Ports
 """
 
+from src.adapters.async_azure_devops_adapter import (
+    AsyncAzureDevOpsAdapter,
+    PooledAzureDevOpsAdapter,
+)
 from src.adapters.azure_devops_adapter import AzureDevOpsAdapter
 from src.adapters.diff_adapter import DiffAdapter
+from src.adapters.git_diff_adapter import GitDiffAdapter
 from src.adapters.litellm_adapter import LiteLLMAdapter
 
 __all__ = [
     "AzureDevOpsAdapter",
+    "AsyncAzureDevOpsAdapter",
+    "PooledAzureDevOpsAdapter",
     "LiteLLMAdapter",
     "DiffAdapter",
+    "GitDiffAdapter",
 ]
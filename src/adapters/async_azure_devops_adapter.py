@@ -0,0 +1,629 @@
+"""
+Adapter assíncrono para Azure DevOps
+Todas as chamadas (PR, iterações, mudanças, conteúdo de arquivos e threads)
+compartilham um único cliente httpx com keep-alive, HTTP/2 e pool limitado
+"""
+
+import asyncio
+import importlib.util
+import io
+import json
+import threading
+import time
+from collections.abc import Coroutine, Iterable, Iterator
+from dataclasses import replace
+from typing import Any, TypeVar
+
+import httpx
+
+from src.adapters.azure_devops_adapter import (
+    THREAD_ACTION_LABELS,
+    THREAD_FIXED,
+    ThreadAction,
+    ThreadIndex,
+    ThreadPayload,
+    build_comment_payload,
+    build_last_reviewed_patch,
+    build_pr_comment_payload,
+    build_pr_info,
+    build_summary_payload,
+    created_bot_thread,
+    iteration_source_commit,
+    parse_last_reviewed_iteration,
+    payload_anchor,
+    payload_fingerprint,
+)
+from src.adapters.diff_adapter import (
+    ARCHIVE_CHUNK_BYTES,
+    STREAM_CHUNK_BYTES,
+    CappedBuffer,
+    DiffAdapter,
+    ItemContent,
+    ItemRequest,
+    SkippedFile,
+    oversize_reason,
+)
+from src.core.domain.file_diff import FileDiffChunk
+from src.core.domain.pull_request import PullRequestInfo, PullRequestSnapshot
+from src.core.ports.diff_port import FileChange
+from src.infrastructure.cache.blob_cache import BlobCache
+from src.infrastructure.cache.http_cache import HttpValidatorCache
+from src.infrastructure.config.settings import (
+    AzureDevOpsConfig,
+    HttpConfig,
+    ReviewBehavior,
+    ReviewLimits,
+)
+from src.infrastructure.http.rate_limiter import (
+    THROTTLE_RETRIES,
+    RateLimiter,
+    parse_retry_after,
+)
+from src.infrastructure.http.transport import RETRY_METHODS, RETRY_STATUSES, HttpTransport
+
+# HTTP/2 depende do `h2` (extra http2 do httpx, declarado no pyproject); sem ele o pool
+# usa HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+T = TypeVar("T")
+
+
+class AsyncAzureDevOpsAdapter:
+    """Cliente asyncio para a API REST do Azure DevOps"""
+
+    def __init__(
+        self,
+        config: AzureDevOpsConfig,
+        max_connections: int = 10,
+        transport: httpx.AsyncBaseTransport | None = None,
+        http_cache: HttpValidatorCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http: HttpTransport | None = None,
+        max_file_bytes: int = 0,
+    ):
+        self.config = config
+        self.max_file_bytes = max_file_bytes
+        self.base_url = f"{config.project_url()}/_apis"
+        self.params = {"api-version": config.api_version}
+        self.http_cache = http_cache
+        self.rate_limiter = rate_limiter
+
+        # Headers, timeouts e métricas seguem o transporte compartilhado
+        self.http = http or HttpTransport(HttpConfig(), config.get_token(), rate_limiter)
+        self.client = self.http.async_client(max_connections, transport, http2=HTTP2_AVAILABLE)
+        # Downloads em lote (zip, itemsbatch) usam o timeout de leitura maior
+        self._bulk_timeout = httpx.Timeout(
+            self.http.config.bulk_timeout, connect=self.http.config.connect_timeout
+        )
+        # Limita requisições em voo para não estourar o timeout de espera do pool
+        self._in_flight = asyncio.Semaphore(max_connections)
+        self._thread_indexes: dict[tuple[str, int], ThreadIndex] = {}
+        self._threads_lock = asyncio.Lock()
+        self._anchor_locks: dict[tuple[str, int, str], asyncio.Lock] = {}
+
+    async def _send(
+        self, method: str, url: str, stream: bool = False, **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Envia respeitando o agendador (se houver) e o limite de concorrência
+        Respostas 429 são repetidas após a pausa indicada pelo servidor; 5xx transitórios e
+        falhas de conexão, só em GET/PATCH, com o retry/backoff da sessão síncrona
+        Com `stream`, o corpo não é lido: quem chama consome e fecha a resposta
+        """
+        limiter = self.rate_limiter
+        idempotent = method.upper() in RETRY_METHODS
+        attempt = 0
+        failures = 0
+        while True:
+            if limiter is not None:
+                # O bucket é uma transação SQLite (BEGIN IMMEDIATE, pode esperar outro
+                # processo): roda numa thread para não travar o event loop. A espera
+                # fica fora do semáforo para não segurar vaga do pool
+                await asyncio.sleep(await asyncio.to_thread(limiter.reserve))
+            request = self.client.build_request(method, url, **kwargs)
+            try:
+                async with self._in_flight:
+                    resp = await self.client.send(request, stream=stream)
+            except httpx.TransportError:
+                if not idempotent or failures >= self.http.config.max_retries:
+                    raise
+                failures += 1
+                await asyncio.sleep(self.http.retry_delay(failures))
+                continue
+            if limiter is not None:
+                await asyncio.to_thread(limiter.observe, resp.status_code, resp.headers)
+
+            if (
+                resp.status_code in RETRY_STATUSES
+                and idempotent
+                and failures < self.http.config.max_retries
+            ):
+                await resp.aclose()
+                failures += 1
+                await asyncio.sleep(self.http.retry_delay(failures))
+                continue
+
+            if resp.status_code != 429 or attempt >= THROTTLE_RETRIES:
+                return resp
+            await resp.aclose()
+            if limiter is None:
+                # Sem agendador, a pausa do servidor vale só para esta requisição
+                delay = parse_retry_after(resp.headers.get("Retry-After"), time.time())
+                await asyncio.sleep(1.0 if delay is None else delay)
+            attempt += 1
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Executa requisição e falha em status de erro"""
+        resp = await self._send(method, url, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    async def _get_json(self, url: str, params: dict[str, Any]) -> Any:
+        """GET condicional (If-None-Match); num 304 devolve o corpo guardado no cache"""
+        cached = self.http_cache.get(url, params) if self.http_cache else None
+        headers = {"If-None-Match": cached.etag} if cached else {}
+
+        resp = await self._send("GET", url, params=params, headers=headers)
+        if self.http_cache is not None and cached is not None and resp.status_code == 304:
+            return self.http_cache.revalidated(url, params, cached)
+        resp.raise_for_status()
+        data = resp.json()
+
+        etag = resp.headers.get("ETag")
+        if self.http_cache is not None and etag:
+            self.http_cache.put(url, params, etag, data)
+        return data
+
+    async def get_pr_info(self, repo_id: str, pr_id: int) -> PullRequestInfo:
+        """Busca informações da PR e retorna model"""
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullrequests/{pr_id}"
+        return build_pr_info(await self._get_json(url, self.params))
+
+    async def get_iterations(self, repo_id: str, pr_id: int) -> list[dict[str, Any]]:
+        """Iterações (pushes) da PR, da mais antiga para a mais recente"""
+        iter_url = f"{self.base_url}/git/repositories/{repo_id}/pullrequests/{pr_id}/iterations"
+        return list((await self._get_json(iter_url, self.params)).get("value", []))
+
+    async def get_latest_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """Retorna o id da última iteração (push) da PR"""
+        iterations = await self.get_iterations(repo_id, pr_id)
+        return iterations[-1]["id"] if iterations else None
+
+    async def get_changes_page(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int,
+        compare_to: int | None = None,
+        skip: int = 0,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Busca uma página de changeEntries; retorna (entries, nextSkip) — 0 na última"""
+        params: dict[str, Any] = {
+            **self.params,
+            "$top": self.config.changes_page_size,
+            "$skip": skip,
+        }
+        if compare_to is not None:
+            params["$compareTo"] = compare_to
+
+        changes_url = (
+            f"{self.base_url}/git/repositories/{repo_id}/pullrequests/"
+            f"{pr_id}/iterations/{iteration_id}/changes"
+        )
+        changes = await self._get_json(changes_url, params)
+
+        next_skip = changes.get("nextSkip") or 0
+        return changes.get("changeEntries", []), next_skip if next_skip > skip else 0
+
+    async def get_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Busca changeEntries (todas as páginas) da última iteração ou de `iteration_id`"""
+        if iteration_id is None:
+            iteration_id = await self.get_latest_iteration(repo_id, pr_id)
+            if iteration_id is None:
+                return []
+
+        files: list[dict[str, Any]] = []
+        skip = 0
+        while True:
+            entries, skip = await self.get_changes_page(
+                repo_id, pr_id, iteration_id, compare_to, skip
+            )
+            files.extend(entries)
+            if not skip:
+                return files
+
+    async def fetch_pr_snapshot(
+        self, repo_id: str, pr_id: int, incremental: bool = False
+    ) -> PullRequestSnapshot:
+        """PR, iterações e última iteração revisada em paralelo; mudanças logo em seguida"""
+
+        async def first_page() -> dict[str, Any]:
+            lookups: list[Coroutine[Any, Any, Any]] = [self.get_iterations(repo_id, pr_id)]
+            if incremental:
+                lookups.append(self.get_last_reviewed_iteration(repo_id, pr_id))
+            iterations, *reviewed = await asyncio.gather(*lookups)
+            iteration_id = iterations[-1]["id"] if iterations else None
+            last_reviewed = reviewed[0] if reviewed else None
+            state: dict[str, Any] = {
+                "iteration_id": iteration_id,
+                "last_reviewed_iteration": last_reviewed,
+                "compare_commit": (
+                    iteration_source_commit(iterations, last_reviewed)
+                    if last_reviewed is not None
+                    else None
+                ),
+            }
+            if iteration_id is None or (
+                last_reviewed is not None and last_reviewed >= iteration_id
+            ):
+                return state
+            changes, next_skip = await self.get_changes_page(
+                repo_id, pr_id, iteration_id, compare_to=last_reviewed
+            )
+            return {**state, "changes": tuple(changes), "next_skip": next_skip}
+
+        pr_info, state = await asyncio.gather(self.get_pr_info(repo_id, pr_id), first_page())
+        return PullRequestSnapshot(pr_info=pr_info, **state)
+
+    async def get_last_reviewed_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """Lê das propriedades da PR a última iteração revisada pelo bot"""
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/properties"
+        resp = await self._request("GET", url, params=self.params)
+        return parse_last_reviewed_iteration(resp.json())
+
+    async def set_last_reviewed_iteration(
+        self, repo_id: str, pr_id: int, iteration_id: int
+    ) -> None:
+        """Grava nas propriedades da PR a iteração que acabou de ser revisada"""
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/properties"
+        await self._request(
+            "PATCH",
+            url,
+            content=json.dumps(build_last_reviewed_patch(iteration_id)),
+            params=self.params,
+            headers={"Content-Type": "application/json-patch+json"},
+        )
+
+    async def get_item(self, url: str, params: dict[str, str]) -> str:
+        """Baixa o conteúdo de um arquivo em blocos, abortando binários e grandes demais"""
+        buffer = CappedBuffer(self.max_file_bytes)
+        resp = await self._send("GET", url, stream=True, params=params)
+        try:
+            resp.raise_for_status()
+            buffer.check_size(int(resp.headers.get("Content-Length") or 0))
+            async for chunk in resp.aiter_bytes(STREAM_CHUNK_BYTES):
+                buffer.feed(chunk)
+        finally:
+            await resp.aclose()
+        return buffer.text()
+
+    async def get_items(self, requests_list: list[ItemRequest]) -> list[ItemContent]:
+        """Baixa vários arquivos simultaneamente, mantendo a ordem de `requests_list`"""
+        results = await asyncio.gather(
+            *(self.get_item(url, params) for url, params in requests_list),
+            return_exceptions=True,
+        )
+        contents: list[ItemContent] = []
+        for result in results:
+            # Cancelamento não é falha de arquivo: propaga
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+            contents.append(result)
+        return contents
+
+    async def get_json(self, url: str, params: dict[str, str]) -> Any:
+        """GET simples (sem cache de ETag), ex: merge base do diff"""
+        return (await self._request("GET", url, params=params)).json()
+
+    async def post_json(self, url: str, payload: Any, params: dict[str, str]) -> Any:
+        """POST de consulta em lote (itemsbatch)"""
+        resp = await self._request(
+            "POST", url, json=payload, params=params, timeout=self._bulk_timeout
+        )
+        return resp.json()
+
+    async def post_zip(self, url: str, payload: Any, params: dict[str, str]) -> bytes:
+        """POST que devolve um zip (blobs em lote)"""
+        resp = await self._request(
+            "POST",
+            url,
+            json=payload,
+            params=params,
+            headers={"Accept": "application/zip"},
+            timeout=self._bulk_timeout,
+        )
+        return resp.content
+
+    async def get_zip(self, url: str, params: dict[str, str], max_bytes: int) -> bytes:
+        """Zip da árvore (modo archive) lido em blocos, até `max_bytes`"""
+        buffer = io.BytesIO()
+        resp = await self._send(
+            "GET",
+            url,
+            stream=True,
+            params=params,
+            headers={"Accept": "application/zip"},
+            timeout=self._bulk_timeout,
+        )
+        try:
+            resp.raise_for_status()
+            declared = int(resp.headers.get("Content-Length") or 0)
+            if reason := oversize_reason(declared, max_bytes):
+                raise SkippedFile(reason)
+            async for block in resp.aiter_bytes(ARCHIVE_CHUNK_BYTES):
+                buffer.write(block)
+                if reason := oversize_reason(buffer.tell(), max_bytes):
+                    raise SkippedFile(reason)
+        finally:
+            await resp.aclose()
+        return buffer.getvalue()
+
+    async def _thread_index(self, repo_id: str, pr_id: int) -> ThreadIndex:
+        """Busca as threads da PR uma única vez e indexa as criadas pelo bot"""
+        key = (repo_id, pr_id)
+        async with self._threads_lock:
+            if key not in self._thread_indexes:
+                url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/threads"
+                resp = await self._request("GET", url, params=self.params)
+                self._thread_indexes[key] = ThreadIndex(resp.json().get("value", []))
+            return self._thread_indexes[key]
+
+    async def _anchor_lock(self, repo_id: str, pr_id: int, key: str) -> asyncio.Lock:
+        """Lock por arquivo (ou chave da thread geral) da PR"""
+        async with self._threads_lock:
+            return self._anchor_locks.setdefault((repo_id, pr_id, key), asyncio.Lock())
+
+    async def _publish(self, repo_id: str, pr_id: int, payload: ThreadPayload) -> ThreadAction:
+        """Cria a thread ou reaproveita a do bot já existente (mesmas regras do síncrono)"""
+        index = await self._thread_index(repo_id, pr_id)
+        key = payload_anchor(payload)[0]
+        async with await self._anchor_lock(repo_id, pr_id, key):
+            return await self._publish_anchor(repo_id, pr_id, index, payload)
+
+    async def _publish_anchor(
+        self, repo_id: str, pr_id: int, index: ThreadIndex, payload: ThreadPayload
+    ) -> ThreadAction:
+        """Aplica o plano do índice para o payload (chamado com o lock da âncora)"""
+        key, start_line, end_line = payload_anchor(payload)
+        fingerprint = payload_fingerprint(payload)
+        action, existing = index.plan(key, start_line, end_line, fingerprint)
+
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/threads"
+
+        if action == "skip":
+            return action
+
+        if action == "update":
+            thread = existing[0]
+            await self._request(
+                "PATCH",
+                f"{url}/{thread.thread_id}/comments/{thread.comment_id}",
+                json={"content": payload["comments"][0]["content"]},
+                params=self.params,
+            )
+            await self._request(
+                "PATCH",
+                f"{url}/{thread.thread_id}",
+                json={"properties": payload["properties"]},
+                params=self.params,
+            )
+            index.record(replace(thread, fingerprint=fingerprint))
+            return action
+
+        for thread in existing:
+            await self._request(
+                "PATCH",
+                f"{url}/{thread.thread_id}",
+                json={"status": THREAD_FIXED},
+                params=self.params,
+            )
+            index.record(replace(thread, active=False))
+
+        resp = await self._request("POST", url, json=payload, params=self.params)
+        created = created_bot_thread(resp.json(), payload)
+        if created is not None:
+            index.record(created)
+        return action
+
+    async def post_comment(
+        self, repo_id: str, pr_id: int, file_path: str, start_line: int, end_line: int, comment: str
+    ) -> bool:
+        """Posta um comentário em um arquivo específico (sem duplicar threads do bot)"""
+        payload = build_comment_payload(file_path, start_line, end_line, comment)
+        action = await self._publish(repo_id, pr_id, payload)
+
+        print(f"   {THREAD_ACTION_LABELS[action]}: {file_path}:{start_line}-{end_line}")
+        return True
+
+    async def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
+        """Posta comentário resumo inicial (atualiza o resumo anterior do bot, se houver)"""
+        await self._publish(repo_id, pr_id, build_summary_payload(stats))
+        return True
+
+    async def post_pr_comment(self, repo_id: str, pr_id: int, key: str, comment: str) -> bool:
+        """Posta thread geral da PR; `key` identifica a thread para atualizá-la em re-execuções"""
+        action = await self._publish(repo_id, pr_id, build_pr_comment_payload(key, comment))
+
+        print(f"   {THREAD_ACTION_LABELS[action]}: {key}")
+        return True
+
+    async def aclose(self) -> None:
+        """Fecha as conexões do pool"""
+        await self.client.aclose()
+
+
+class LoopDiffTransport:
+    """DiffTransport que roda as requisições do diff no event loop do cliente assíncrono"""
+
+    def __init__(self, pooled: "PooledAzureDevOpsAdapter"):
+        self.pooled = pooled
+
+    def get_json(self, url: str, params: dict[str, str]) -> Any:
+        return self.pooled._run(self.pooled.client.get_json(url, params))
+
+    def post_json(self, url: str, payload: Any, params: dict[str, str]) -> Any:
+        return self.pooled._run(self.pooled.client.post_json(url, payload, params))
+
+    def post_zip(self, url: str, payload: Any, params: dict[str, str]) -> bytes:
+        return self.pooled._run(self.pooled.client.post_zip(url, payload, params))
+
+    def get_zip(self, url: str, params: dict[str, str], max_bytes: int) -> bytes:
+        return self.pooled._run(self.pooled.client.get_zip(url, params, max_bytes))
+
+
+class PooledAzureDevOpsAdapter:
+    """
+    Fachada síncrona sobre AsyncAzureDevOpsAdapter
+    Implementa VCSPort e DiffPort; as corrotinas rodam em um event loop dedicado,
+    então o mesmo pool de conexões é reaproveitado entre chamadas
+    """
+
+    def __init__(
+        self,
+        config: AzureDevOpsConfig,
+        behavior: ReviewBehavior,
+        limits: ReviewLimits,
+        transport: httpx.AsyncBaseTransport | None = None,
+        blob_cache: BlobCache | None = None,
+        http_cache: HttpValidatorCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http: HttpTransport | None = None,
+    ):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="azdo-async-client", daemon=True
+        )
+        self._thread.start()
+
+        self.client = AsyncAzureDevOpsAdapter(
+            config,
+            max_connections=config.max_connections,
+            transport=transport,
+            http_cache=http_cache,
+            rate_limiter=rate_limiter,
+            http=http,
+            max_file_bytes=limits.max_file_bytes,
+        )
+        # Downloads, itemsbatch, zips e merge base do diff saem pelo mesmo pool
+        self.diff_transport = LoopDiffTransport(self)
+        self.diff = DiffAdapter(
+            behavior,
+            limits,
+            config,
+            item_fetcher=self.fetch_items,
+            blob_cache=blob_cache,
+            rate_limiter=rate_limiter,
+            http=self.client.http,
+            api=self.diff_transport,
+        )
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Executa corrotina no loop do cliente e aguarda o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_items(self, requests_list: list[ItemRequest]) -> list[ItemContent]:
+        """Downloads por arquivo no pool assíncrono (ItemFetcher do DiffAdapter)"""
+        return self._run(self.client.get_items(requests_list))
+
+    def get_pr_info(self, repo_id: str, pr_id: int) -> PullRequestInfo:
+        return self._run(self.client.get_pr_info(repo_id, pr_id))
+
+    def get_iterations(self, repo_id: str, pr_id: int) -> list[dict[str, Any]]:
+        return self._run(self.client.get_iterations(repo_id, pr_id))
+
+    def get_latest_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        return self._run(self.client.get_latest_iteration(repo_id, pr_id))
+
+    def iter_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+        skip: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        if iteration_id is None:
+            iteration_id = self.get_latest_iteration(repo_id, pr_id)
+            if iteration_id is None:
+                return
+
+        while True:
+            entries, skip = self._run(
+                self.client.get_changes_page(repo_id, pr_id, iteration_id, compare_to, skip)
+            )
+            yield from entries
+            if not skip:
+                return
+
+    def get_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+    ) -> list[dict[str, Any]]:
+        return self._run(self.client.get_pr_files(repo_id, pr_id, iteration_id, compare_to))
+
+    def fetch_pr_snapshot(
+        self, repo_id: str, pr_id: int, incremental: bool = False
+    ) -> PullRequestSnapshot:
+        return self._run(self.client.fetch_pr_snapshot(repo_id, pr_id, incremental))
+
+    def get_last_reviewed_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        return self._run(self.client.get_last_reviewed_iteration(repo_id, pr_id))
+
+    def set_last_reviewed_iteration(self, repo_id: str, pr_id: int, iteration_id: int) -> None:
+        self._run(self.client.set_last_reviewed_iteration(repo_id, pr_id, iteration_id))
+
+    def iter_file_diffs(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> Iterator[FileDiffChunk]:
+        return self.diff.iter_file_diffs(
+            repo_id, files, source_branch, target_branch, source_commit, target_commit, base_commit
+        )
+
+    def generate_diff(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> tuple[str, int, int]:
+        return self.diff.generate_diff(
+            repo_id, files, source_branch, target_branch, source_commit, target_commit, base_commit
+        )
+
+    def post_comment(
+        self, repo_id: str, pr_id: int, file_path: str, start_line: int, end_line: int, comment: str
+    ) -> bool:
+        return self._run(
+            self.client.post_comment(repo_id, pr_id, file_path, start_line, end_line, comment)
+        )
+
+    def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
+        return self._run(self.client.post_summary_comment(repo_id, pr_id, stats))
+
+    def post_pr_comment(self, repo_id: str, pr_id: int, key: str, comment: str) -> bool:
+        return self._run(self.client.post_pr_comment(repo_id, pr_id, key, comment))
+
+    def close(self) -> None:
+        """Fecha o pool e encerra o event loop"""
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -2,15 +2,35 @@
 Service de integração com Azure DevOps
 """
 
-import base64
-from typing import Any, TypedDict
+import hashlib
+import json
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Literal, TypedDict, cast
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from src.core.domain.pull_request import PullRequestInfo, PullRequestSnapshot
+from src.infrastructure.cache.http_cache import HttpValidatorCache
+from src.infrastructure.config.settings import AzureDevOpsConfig, HttpConfig
+from src.infrastructure.http.rate_limiter import RateLimiter
+from src.infrastructure.http.transport import HttpTransport
 
-from src.core.domain.pull_request import PullRequestInfo
-from src.infrastructure.config.settings import AzureDevOpsConfig
+# Propriedade da PR onde o modo incremental guarda a última iteração revisada
+LAST_REVIEWED_ITERATION_PROPERTY = "CodeReviewBot.LastReviewedIteration"
+
+# Propriedades das threads do bot: fingerprint do conteúdo postado e, nas threads
+# gerais da PR (sem arquivo), a chave que identifica a thread entre execuções
+FINGERPRINT_PROPERTY = "CodeReviewBot.Fingerprint"
+THREAD_KEY_PROPERTY = "CodeReviewBot.ThreadKey"
+SUMMARY_THREAD_KEY = "summary"
+
+# Status de thread do Azure DevOps (POST/PATCH aceitam o número, GET devolve o nome)
+THREAD_ACTIVE = 1
+THREAD_FIXED = 2
+
+# O que fazer com um comentário diante das threads do bot já existentes na PR
+ThreadAction = Literal["create", "skip", "update", "replace"]
 
 
 class CommentDict(TypedDict):
@@ -33,135 +53,557 @@ class ThreadPayload(TypedDict, total=False):
     comments: list[CommentDict]
     status: int
     threadContext: ThreadContext
+    properties: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class BotThread:
+    """Thread criada pelo bot em uma execução anterior"""
+
+    thread_id: int
+    comment_id: int
+    key: str  # Caminho do arquivo ou chave da thread geral (ex: "summary")
+    file_path: str | None  # None = thread geral da PR (sem arquivo)
+    start_line: int
+    end_line: int
+    fingerprint: str
+    active: bool
+
+    def overlaps(self, start_line: int, end_line: int) -> bool:
+        return self.start_line <= end_line and start_line <= self.end_line
+
+
+def comment_fingerprint(key: str, content: str) -> str:
+    """Identifica o conteúdo de um comentário do bot (arquivo/chave + texto)"""
+    return hashlib.sha256(f"{key}\n{content}".encode()).hexdigest()[:16]
+
+
+def _property_value(properties: dict[str, Any], name: str) -> str | None:
+    entry = properties.get(name)
+    value = entry.get("$value") if isinstance(entry, dict) else entry
+    return str(value) if value else None
+
+
+def _bot_properties(key: str, content: str, general: bool) -> dict[str, Any]:
+    properties = {
+        FINGERPRINT_PROPERTY: {
+            "$type": "System.String",
+            "$value": comment_fingerprint(key, content),
+        }
+    }
+    if general:
+        properties[THREAD_KEY_PROPERTY] = {"$type": "System.String", "$value": key}
+    return properties
+
+
+def parse_bot_thread(thread: dict[str, Any]) -> BotThread | None:
+    """Converte thread da API em BotThread; None se não foi criada pelo bot"""
+    properties = thread.get("properties") or {}
+    fingerprint = _property_value(properties, FINGERPRINT_PROPERTY)
+    comments = thread.get("comments") or []
+    if not fingerprint or not comments or thread.get("isDeleted"):
+        return None
+
+    context = thread.get("threadContext") or {}
+    file_path = context.get("filePath")
+    return BotThread(
+        thread_id=thread["id"],
+        comment_id=comments[0].get("id", 1),
+        key=file_path or _property_value(properties, THREAD_KEY_PROPERTY) or SUMMARY_THREAD_KEY,
+        file_path=file_path,
+        start_line=(context.get("rightFileStart") or {}).get("line", 0),
+        end_line=(context.get("rightFileEnd") or {}).get("line", 0),
+        fingerprint=str(fingerprint),
+        active=thread.get("status") in (THREAD_ACTIVE, "active"),
+    )
+
+
+class ThreadIndex:
+    """
+    Threads do bot já existentes na PR, por arquivo (ou chave da thread geral)
+    Decide se um comentário novo é criado, ignorado (mesmo conteúdo),
+    atualizado no lugar (mesmo trecho) ou substitui threads antigas do arquivo
+    """
+
+    def __init__(self, threads: list[dict[str, Any]]):
+        self.by_key: dict[str, list[BotThread]] = {}
+        for thread in threads:
+            bot_thread = parse_bot_thread(thread)
+            if bot_thread is not None:
+                self.record(bot_thread)
+
+    def record(self, thread: BotThread) -> None:
+        """Adiciona ou substitui (pelo id) uma thread no índice"""
+        threads = self.by_key.setdefault(thread.key, [])
+        threads[:] = [t for t in threads if t.thread_id != thread.thread_id] + [thread]
+
+    def plan(
+        self, key: str, start_line: int, end_line: int, fingerprint: str
+    ) -> tuple[ThreadAction, list[BotThread]]:
+        """Retorna a ação e as threads existentes envolvidas nela"""
+        threads = self.by_key.get(key, [])
+
+        # Mesmo conteúdo já postado (mesmo que resolvido por alguém): não repete
+        for thread in threads:
+            if thread.fingerprint == fingerprint:
+                return "skip", [thread]
+
+        active = [thread for thread in threads if thread.active]
+        for thread in active:
+            # Thread geral tem uma única instância por chave: sempre atualiza
+            if thread.file_path is None or thread.overlaps(start_line, end_line):
+                return "update", [thread]
+        if active:
+            return "replace", active
+        return "create", []
+
+
+def build_pr_info(pr_data: dict[str, Any]) -> PullRequestInfo:
+    """Normaliza resposta da API de pull requests em PullRequestInfo"""
+    # Busca labels se houver
+    labels = []
+    if "labels" in pr_data:
+        labels = [label.get("name", "") for label in pr_data.get("labels", [])]
+
+    return PullRequestInfo(
+        id=pr_data["pullRequestId"],
+        title=pr_data.get("title", ""),
+        source_branch=pr_data["sourceRefName"].replace("refs/heads/", ""),
+        target_branch=pr_data["targetRefName"].replace("refs/heads/", ""),
+        is_draft=pr_data.get("isDraft", False),
+        additions=0,  # Será calculado no diff
+        deletions=0,  # Será calculado no diff
+        changed_files_count=0,  # Será calculado no diff
+        labels=labels,
+        source_commit=pr_data.get("lastMergeSourceCommit", {}).get("commitId"),
+        target_commit=pr_data.get("lastMergeTargetCommit", {}).get("commitId"),
+    )
+
+
+def build_comment_payload(
+    file_path: str, start_line: int, end_line: int, comment: str
+) -> ThreadPayload:
+    """Monta payload de thread ancorada em um intervalo de linhas do arquivo"""
+
+    # Valida tamanho do comentário
+    if len(comment) > 150000:
+        comment = comment[:150000] + "\n\n[... truncado]"
+
+    return {
+        "comments": [{"content": comment, "commentType": 1}],
+        "status": THREAD_ACTIVE,
+        "threadContext": {
+            "filePath": file_path,
+            "rightFileStart": {"line": start_line, "offset": 1},
+            "rightFileEnd": {"line": end_line, "offset": 999},
+        },
+        "properties": _bot_properties(file_path, comment, general=False),
+    }
+
+
+def build_pr_comment_payload(key: str, comment: str) -> ThreadPayload:
+    """Monta payload de thread geral da PR (sem arquivo), identificada por `key`"""
+    if len(comment) > 150000:
+        comment = comment[:150000] + "\n\n[... truncado]"
+
+    return {
+        "comments": [{"content": comment, "commentType": 1}],
+        "status": THREAD_ACTIVE,
+        "properties": _bot_properties(key, comment, general=True),
+    }
+
+
+def build_summary_payload(stats: dict[str, int]) -> ThreadPayload:
+    """Monta payload da thread de resumo do review"""
+
+    comment = f"""🤖 **Code Review Automático**
+
+📊 **Estatísticas:**
+- Arquivos analisados: {stats['files_reviewed']}
+- Comentários: {stats['critical']}🔴 {stats['important']}🟡 {stats['suggestions']}🟢
+
+💡 Este é um review automatizado. Sempre valide as sugestões com seu julgamento técnico.
+"""
+
+    return build_pr_comment_payload(SUMMARY_THREAD_KEY, comment)
+
+
+def payload_fingerprint(payload: ThreadPayload) -> str:
+    return str(payload["properties"][FINGERPRINT_PROPERTY]["$value"])
+
+
+def payload_anchor(payload: ThreadPayload) -> tuple[str, int, int]:
+    """(chave, linha inicial, linha final) da thread; thread geral não tem linhas"""
+    context = payload.get("threadContext")
+    if context is None:
+        return payload["properties"][THREAD_KEY_PROPERTY]["$value"], 0, 0
+    return (
+        context["filePath"],
+        context["rightFileStart"]["line"],
+        context["rightFileEnd"]["line"],
+    )
+
+
+def created_bot_thread(response: dict[str, Any], payload: ThreadPayload) -> BotThread | None:
+    """BotThread da thread recém-criada, a partir da resposta do POST"""
+    key, start_line, end_line = payload_anchor(payload)
+    if "id" not in response:
+        return None
+    comments = response.get("comments") or [{}]
+    context = payload.get("threadContext")
+    return BotThread(
+        thread_id=response["id"],
+        comment_id=comments[0].get("id", 1),
+        key=key,
+        file_path=context["filePath"] if context else None,
+        start_line=start_line,
+        end_line=end_line,
+        fingerprint=payload_fingerprint(payload),
+        active=True,
+    )
+
+
+# Mensagens exibidas para cada ação sobre a thread do comentário
+THREAD_ACTION_LABELS: dict[ThreadAction, str] = {
+    "create": "✅ Comentário postado",
+    "skip": "⏭ Comentário já existente",
+    "update": "♻️ Comentário atualizado",
+    "replace": "✅ Comentário postado (anterior resolvido)",
+}
+
+
+def parse_last_reviewed_iteration(properties: dict[str, Any]) -> int | None:
+    """Extrai a última iteração revisada da resposta de propriedades da PR"""
+    entry = properties.get("value", {}).get(LAST_REVIEWED_ITERATION_PROPERTY)
+    if not entry:
+        return None
+    try:
+        return int(entry.get("$value"))
+    except (TypeError, ValueError):
+        return None
+
+
+def iteration_source_commit(iterations: list[dict[str, Any]], iteration_id: int) -> str | None:
+    """sourceRefCommit da iteração `iteration_id` (None se ausente da lista)"""
+    for iteration in iterations:
+        if iteration.get("id") == iteration_id:
+            return (iteration.get("sourceRefCommit") or {}).get("commitId")
+    return None
+
+
+def build_last_reviewed_patch(iteration_id: int) -> list[dict[str, Any]]:
+    """JSON Patch que grava a última iteração revisada nas propriedades da PR"""
+    return [
+        {
+            "op": "add",
+            "path": f"/{LAST_REVIEWED_ITERATION_PROPERTY}",
+            "value": str(iteration_id),
+        }
+    ]
 
 
 class AzureDevOpsAdapter:
     """Gerencia toda comunicação com Azure DevOps"""
 
-    def __init__(self, config: AzureDevOpsConfig):
+    def __init__(
+        self,
+        config: AzureDevOpsConfig,
+        http_cache: HttpValidatorCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http: HttpTransport | None = None,
+    ):
         self.config = config
-        self.base_url = f"https://dev.azure.com/{config.org}/{config.project}/_apis"
-        self._setup_session()
-
-    def _setup_session(self):
-        """Configura session com retry automático"""
-        self.session = requests.Session()
-
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "POST"],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
+        self.base_url = f"{config.project_url()}/_apis"
+        self.http_cache = http_cache
+        self.rate_limiter = rate_limiter
+        self._thread_indexes: dict[tuple[str, int], ThreadIndex] = {}
+        self._threads_lock = threading.Lock()
+        self._anchor_locks: dict[tuple[str, int, str], threading.Lock] = {}
+
+        # Sessão (pool, retry, timeouts, autenticação) vem do transporte compartilhado
+        self.http = http or HttpTransport(HttpConfig(), config.get_token(), rate_limiter)
+        self.session = self.http.session
+
+    def _get_json(self, url: str, params: dict[str, Any]) -> Any:
+        """
+        GET condicional: com ETag guardado envia If-None-Match
+        e, se a API responder 304, devolve o corpo do cache sem baixá-lo de novo
+        """
+        cached = self.http_cache.get(url, params) if self.http_cache else None
+        headers = {"If-None-Match": cached.etag} if cached else {}
 
-        token = self.config.get_token()
-        auth = base64.b64encode(f":{token}".encode()).decode()
-        self.session.headers.update(
-            {"Authorization": f"Basic {auth}", "Content-Type": "application/json"}
-        )
+        resp = self.session.get(url, params=params, headers=headers, timeout=self.http.timeout)
+        if self.http_cache is not None and cached is not None and resp.status_code == 304:
+            return self.http_cache.revalidated(url, params, cached)
+        resp.raise_for_status()
+        data = resp.json()
+
+        if self.http_cache is not None:
+            etag = resp.headers.get("ETag")
+            if etag:
+                self.http_cache.put(url, params, etag, data)
+        return data
 
     def get_pr_info(self, repo_id: str, pr_id: int) -> PullRequestInfo:
         """Busca informações da PR e retorna model"""
         url = f"{self.base_url}/git/repositories/{repo_id}/pullrequests/{pr_id}"
         params = {"api-version": self.config.api_version}
 
-        resp = self.session.get(url, params=params, timeout=30)
-        resp.raise_for_status()
-        pr_data = resp.json()
-
-        # Busca labels se houver
-        labels = []
-        if "labels" in pr_data:
-            labels = [label.get("name", "") for label in pr_data.get("labels", [])]
-
-        return PullRequestInfo(
-            id=pr_data["pullRequestId"],
-            title=pr_data.get("title", ""),
-            source_branch=pr_data["sourceRefName"].replace("refs/heads/", ""),
-            target_branch=pr_data["targetRefName"].replace("refs/heads/", ""),
-            is_draft=pr_data.get("isDraft", False),
-            additions=0,  # Será calculado no diff
-            deletions=0,  # Será calculado no diff
-            changed_files_count=0,  # Será calculado no diff
-            labels=labels,
-        )
+        pr_data = self._get_json(url, params)
 
-    def get_pr_files(self, repo_id: str, pr_id: int) -> list[dict[str, Any]]:
-        """
-        Busca lista de arquivos modificados na PR
-        Retorna changeEntries da última iteração
-        """
-        params = {"api-version": self.config.api_version}
+        return build_pr_info(pr_data)
 
-        # Busca iterações da PR
+    def get_iterations(self, repo_id: str, pr_id: int) -> list[dict[str, Any]]:
+        """Iterações (pushes) da PR, da mais antiga para a mais recente"""
         iter_url = f"{self.base_url}/git/repositories/{repo_id}/pullrequests/{pr_id}/iterations"
-        iterations_resp = self.session.get(iter_url, params=params, timeout=30)
-        iterations_resp.raise_for_status()
-        iterations = iterations_resp.json().get("value", [])
+        params = {"api-version": self.config.api_version}
+
+        return list(self._get_json(iter_url, params).get("value", []))
 
-        if not iterations:
-            return []
+    def get_latest_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """Retorna o id da última iteração (push) da PR"""
+        iterations = self.get_iterations(repo_id, pr_id)
 
-        # Busca mudanças da última iteração
-        last_iteration = iterations[-1]["id"]
+        return iterations[-1]["id"] if iterations else None
+
+    def get_changes_page(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int,
+        compare_to: int | None = None,
+        skip: int = 0,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Busca uma página de changeEntries; retorna (entries, nextSkip) — 0 na última"""
         changes_url = (
             f"{self.base_url}/git/repositories/{repo_id}/pullrequests/"
-            f"{pr_id}/iterations/{last_iteration}/changes"
+            f"{pr_id}/iterations/{iteration_id}/changes"
         )
-        changes_resp = self.session.get(changes_url, params=params, timeout=30)
-        changes_resp.raise_for_status()
-        changes = changes_resp.json()
-
-        return changes.get("changeEntries", [])
-
-    def post_comment(
-        self, repo_id: str, pr_id: int, file_path: str, start_line: int, end_line: int, comment: str
-    ) -> bool:
-        """Posta um comentário em um arquivo específico"""
-
-        # Valida tamanho do comentário
-        if len(comment) > 150000:
-            comment = comment[:150000] + "\n\n[... truncado]"
-
-        payload: ThreadPayload = {
-            "comments": [{"content": comment, "commentType": 1}],
-            "status": 1,
-            "threadContext": {
-                "filePath": file_path,
-                "rightFileStart": {"line": start_line, "offset": 1},
-                "rightFileEnd": {"line": end_line, "offset": 999},
-            },
+        params: dict[str, Any] = {
+            "api-version": self.config.api_version,
+            "$top": self.config.changes_page_size,
+            "$skip": skip,
         }
+        if compare_to is not None:
+            params["$compareTo"] = compare_to
+
+        changes = self._get_json(changes_url, params)
+
+        # nextSkip == 0 (ou ausente) indica a última página
+        next_skip = changes.get("nextSkip") or 0
+        return changes.get("changeEntries", []), next_skip if next_skip > skip else 0
+
+    def iter_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+        skip: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Itera sobre os changeEntries da iteração, página a página ($top/$skip)
+        Cada página só é buscada quando a anterior foi consumida
+        """
+        if iteration_id is None:
+            iteration_id = self.get_latest_iteration(repo_id, pr_id)
+            if iteration_id is None:
+                return
+
+        while True:
+            entries, skip = self.get_changes_page(repo_id, pr_id, iteration_id, compare_to, skip)
+            yield from entries
+            if not skip:
+                return
+
+    def get_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Busca lista de arquivos modificados na PR (todas as páginas)
+        Retorna changeEntries da última iteração (ou de `iteration_id`)
+        Com `compare_to`, apenas os arquivos alterados desde aquela iteração
+        """
+        return list(self.iter_pr_files(repo_id, pr_id, iteration_id, compare_to))
 
-        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/threads"
+    def fetch_pr_snapshot(
+        self, repo_id: str, pr_id: int, incremental: bool = False
+    ) -> PullRequestSnapshot:
+        """
+        Busca PR, iterações e (no modo incremental) a última iteração revisada em paralelo
+        A primeira página de mudanças sai assim que a iteração é conhecida,
+        sem esperar pelos dados da PR
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pr_info = executor.submit(self.get_pr_info, repo_id, pr_id)
+            iterations = executor.submit(self.get_iterations, repo_id, pr_id)
+            reviewed = (
+                executor.submit(self.get_last_reviewed_iteration, repo_id, pr_id)
+                if incremental
+                else None
+            )
+
+            iteration_list = iterations.result()
+            iteration_id = iteration_list[-1]["id"] if iteration_list else None
+            last_reviewed = reviewed.result() if reviewed else None
+
+            changes: list[dict[str, Any]] = []
+            next_skip = 0
+            if iteration_id is not None and not (
+                last_reviewed is not None and last_reviewed >= iteration_id
+            ):
+                changes, next_skip = self.get_changes_page(
+                    repo_id, pr_id, iteration_id, compare_to=last_reviewed
+                )
+
+            return PullRequestSnapshot(
+                pr_info=pr_info.result(),
+                iteration_id=iteration_id,
+                last_reviewed_iteration=last_reviewed,
+                changes=tuple(changes),
+                next_skip=next_skip,
+                compare_commit=(
+                    iteration_source_commit(iteration_list, last_reviewed)
+                    if last_reviewed is not None
+                    else None
+                ),
+            )
+
+    def get_last_reviewed_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """Lê das propriedades da PR a última iteração revisada pelo bot"""
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/properties"
         params = {"api-version": self.config.api_version}
 
-        resp = self.session.post(url, json=payload, params=params, timeout=30)
+        resp = self.session.get(url, params=params, timeout=self.http.timeout)
         resp.raise_for_status()
 
-        print(f"   ✅ Comentário postado: {file_path}:{start_line}-{end_line}")
-        return True
-
-    def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
-        """Posta comentário resumo inicial"""
-
-        comment = f"""🤖 **Code Review Automático**
+        return parse_last_reviewed_iteration(resp.json())
 
-📊 **Estatísticas:**
-- Arquivos analisados: {stats['files_reviewed']}
-- Comentários: {stats['critical']}🔴 {stats['important']}🟡 {stats['suggestions']}🟢
+    def set_last_reviewed_iteration(self, repo_id: str, pr_id: int, iteration_id: int) -> None:
+        """Grava nas propriedades da PR a iteração que acabou de ser revisada"""
+        url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/properties"
+        params = {"api-version": self.config.api_version}
 
-💡 Este é um review automatizado. Sempre valide as sugestões com seu julgamento técnico.
-"""
+        resp = self.session.patch(
+            url,
+            data=json.dumps(build_last_reviewed_patch(iteration_id)),
+            params=params,
+            headers={"Content-Type": "application/json-patch+json"},
+            timeout=self.http.timeout,
+        )
+        resp.raise_for_status()
 
-        payload: ThreadPayload = {"comments": [{"content": comment, "commentType": 1}], "status": 1}
+    def _thread_index(self, repo_id: str, pr_id: int) -> ThreadIndex:
+        """Busca as threads da PR uma única vez e indexa as criadas pelo bot"""
+        key = (repo_id, pr_id)
+        with self._threads_lock:
+            if key not in self._thread_indexes:
+                url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/threads"
+                params = {"api-version": self.config.api_version}
+
+                resp = self.session.get(url, params=params, timeout=self.http.timeout)
+                resp.raise_for_status()
+                self._thread_indexes[key] = ThreadIndex(resp.json().get("value", []))
+            return self._thread_indexes[key]
+
+    def _anchor_lock(self, repo_id: str, pr_id: int, key: str) -> threading.Lock:
+        """Lock por arquivo (ou chave da thread geral) da PR"""
+        with self._threads_lock:
+            return self._anchor_locks.setdefault((repo_id, pr_id, key), threading.Lock())
+
+    def _publish(self, repo_id: str, pr_id: int, payload: ThreadPayload) -> ThreadAction:
+        """
+        Cria a thread, ou reaproveita a do bot já existente na PR:
+        mesmo conteúdo é ignorado, mesmo trecho é atualizado no lugar
+        e threads antigas do arquivo em outro trecho são resolvidas
+        """
+        index = self._thread_index(repo_id, pr_id)
+        key = payload_anchor(payload)[0]
+
+        # plan, requisições e record sob o mesmo lock: com post_concurrency > 1,
+        # dois comentários do mesmo arquivo não podem planejar sobre o índice antigo
+        with self._anchor_lock(repo_id, pr_id, key):
+            return self._publish_anchor(repo_id, pr_id, index, payload)
+
+    def _publish_anchor(
+        self, repo_id: str, pr_id: int, index: ThreadIndex, payload: ThreadPayload
+    ) -> ThreadAction:
+        """Aplica o plano do índice para o payload (chamado com o lock da âncora)"""
+        key, start_line, end_line = payload_anchor(payload)
+        fingerprint = payload_fingerprint(payload)
+        with self._threads_lock:
+            action, existing = index.plan(key, start_line, end_line, fingerprint)
 
         url = f"{self.base_url}/git/repositories/{repo_id}/pullRequests/{pr_id}/threads"
         params = {"api-version": self.config.api_version}
 
-        resp = self.session.post(url, json=payload, params=params, timeout=30)
+        if action == "skip":
+            return action
+
+        if action == "update":
+            thread = existing[0]
+            resp = self.session.patch(
+                f"{url}/{thread.thread_id}/comments/{thread.comment_id}",
+                json={"content": payload["comments"][0]["content"]},
+                params=params,
+                timeout=self.http.timeout,
+            )
+            resp.raise_for_status()
+            resp = self.session.patch(
+                f"{url}/{thread.thread_id}",
+                json={"properties": payload["properties"]},
+                params=params,
+                timeout=self.http.timeout,
+            )
+            resp.raise_for_status()
+            with self._threads_lock:
+                index.record(replace(thread, fingerprint=fingerprint))
+            return action
+
+        for thread in existing:
+            resp = self.session.patch(
+                f"{url}/{thread.thread_id}",
+                json={"status": THREAD_FIXED},
+                params=params,
+                timeout=self.http.timeout,
+            )
+            resp.raise_for_status()
+            with self._threads_lock:
+                index.record(replace(thread, active=False))
+
+        resp = self.session.post(
+            url, json=cast(dict[str, Any], payload), params=params, timeout=self.http.timeout
+        )
         resp.raise_for_status()
 
+        created = created_bot_thread(resp.json(), payload)
+        if created is not None:
+            with self._threads_lock:
+                index.record(created)
+        return action
+
+    def post_comment(
+        self, repo_id: str, pr_id: int, file_path: str, start_line: int, end_line: int, comment: str
+    ) -> bool:
+        """Posta um comentário em um arquivo específico (sem duplicar threads do bot)"""
+        payload = build_comment_payload(file_path, start_line, end_line, comment)
+        action = self._publish(repo_id, pr_id, payload)
+
+        print(f"   {THREAD_ACTION_LABELS[action]}: {file_path}:{start_line}-{end_line}")
+        return True
+
+    def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
+        """Posta comentário resumo inicial (atualiza o resumo anterior do bot, se houver)"""
+        self._publish(repo_id, pr_id, build_summary_payload(stats))
+        return True
+
+    def post_pr_comment(self, repo_id: str, pr_id: int, key: str, comment: str) -> bool:
+        """Posta thread geral da PR; `key` identifica a thread para atualizá-la em re-execuções"""
+        action = self._publish(repo_id, pr_id, build_pr_comment_payload(key, comment))
+
+        print(f"   {THREAD_ACTION_LABELS[action]}: {key}")
         return True
@@ -3,36 +3,305 @@ Adapter para processar e filtrar diffs
 Implementa DiffPort
 """
 
-import base64
-import difflib
-
-import requests
+import io
+import posixpath
+import zipfile
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import chain, islice
+from typing import Any, Protocol
 
+from src.core.domain.file_diff import FileDiffChunk
 from src.core.ports.diff_port import FileChange
-from src.infrastructure.config.settings import AzureDevOpsConfig, ReviewBehavior, ReviewLimits
+from src.infrastructure.cache.blob_cache import BlobCache
+from src.infrastructure.config.settings import (
+    AzureDevOpsConfig,
+    HttpConfig,
+    ReviewBehavior,
+    ReviewLimits,
+)
+from src.infrastructure.diff.engines import DiffEngineSelector
+from src.infrastructure.diff.generated import GeneratedFileDetector, GitAttributes
+from src.infrastructure.http.rate_limiter import RateLimiter
+from src.infrastructure.http.transport import HttpTransport
+from src.infrastructure.utils.formatting import format_diff_chunks
+
+# Conteúdo de um arquivo ou a exceção ocorrida ao baixá-lo
+ItemContent = str | Exception
+
+# Conteúdo (base, source) de um arquivo ou a exceção ocorrida ao baixá-lo
+FileVersions = tuple[str, str] | Exception
+
+# Linhas do diff unificado de um arquivo ou a exceção que impediu gerá-lo
+FileDiff = list[str] | Exception
+
+# Requisição de conteúdo: (url, params)
+ItemRequest = tuple[str, dict[str, str]]
+
+# Estratégia de download: lista de requisições -> conteúdos na mesma ordem
+ItemFetcher = Callable[[list[ItemRequest]], list[ItemContent]]
+
+# Tamanho dos blocos lidos do corpo do zip no modo archive
+ARCHIVE_CHUNK_BYTES = 64 * 1024
+
+# Tamanho dos blocos lidos no download de um arquivo
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Bytes do início do arquivo inspecionados para detectar conteúdo binário
+SNIFF_BYTES = 8000
+
+# contentType (contentMetadata do Azure DevOps ou MIME) que indica arquivo binário
+BINARY_CONTENT_TYPES = frozenset({"rawbinary", "application/octet-stream", "application/zip"})
+BINARY_CONTENT_PREFIXES = ("image/", "audio/", "video/", "font/")
+
+
+class SkippedFile(Exception):
+    """Arquivo fora do diff: binário ou acima do limite de bytes (download abortado)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def oversize_reason(size: int, max_bytes: int) -> str | None:
+    """Motivo para ignorar um arquivo de `size` bytes, ou None se cabe no limite (0 = off)"""
+    if max_bytes and size > max_bytes:
+        return f"muito grande ({size / 1024:.1f} KB > {max_bytes / 1024:.1f} KB)"
+    return None
+
+
+def metadata_skip_reason(item: dict[str, Any], max_bytes: int) -> str | None:
+    """
+    Decide pelos metadados do item (size, contentMetadata, gitObjectType), sem baixar nada,
+    se o arquivo fica fora do diff; None quando os metadados não bastam para decidir
+    Os changeEntries das iterações só trazem gitObjectType: size e contentMetadata vêm do
+    itemsbatch, consultado antes do download (`metadata_prefetch`). Sem eles, binários e
+    arquivos grandes só são vistos no download, que para no Content-Length ou no primeiro
+    bloco (CappedBuffer)
+    """
+    if item.get("gitObjectType") == "commit":
+        return "submódulo"
+    size = item.get("size")
+    if isinstance(size, int) and (reason := oversize_reason(size, max_bytes)):
+        return reason
+    metadata = item.get("contentMetadata") or {}
+    content_type = str(metadata.get("contentType") or "").lower()
+    if (
+        metadata.get("isBinary")
+        or metadata.get("isImage")
+        or content_type in BINARY_CONTENT_TYPES
+        or content_type.startswith(BINARY_CONTENT_PREFIXES)
+    ):
+        return "binário"
+    return None
+
+
+def looks_binary(head: bytes) -> bool:
+    """Heurística do git: byte nulo no início do conteúdo indica arquivo binário"""
+    return b"\0" in head[:SNIFF_BYTES]
+
+
+class CappedBuffer:
+    """
+    Acumula o corpo de um download em blocos
+    Aborta (SkippedFile) no primeiro bloco binário ou ao passar de `max_bytes` (0 = sem limite)
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._parts: list[bytes] = []
+
+    def check_size(self, size: int) -> None:
+        """Valida um tamanho conhecido antes do download (Content-Length, zip)"""
+        if reason := oversize_reason(size, self.max_bytes):
+            raise SkippedFile(reason)
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if not self._parts and looks_binary(chunk):
+            raise SkippedFile("binário")
+        self.size += len(chunk)
+        self.check_size(self.size)
+        self._parts.append(chunk)
+
+    def text(self) -> str:
+        return b"".join(self._parts).decode("utf-8", errors="replace")
+
+
+@dataclass(frozen=True)
+class VersionRef:
+    """Versão de um arquivo a baixar: blob objectId ou path em um commit/branch"""
+
+    path: str
+    object_id: str | None
+    version: str
+    version_type: str  # "commit" ou "branch"
+
+
+@dataclass(frozen=True)
+class SelectedFile:
+    """Arquivo selecionado para o diff, com as chaves imutáveis de cada versão"""
+
+    path: str
+    change_type: str
+    original_path: str
+    base_object_id: str | None = None
+    source_object_id: str | None = None
+    skip_reason: str | None = None  # Ignorado pelos metadados: nenhuma versão é baixada
+    metadata_known: bool = False  # O changeEntry já trouxe size ou contentMetadata
+
+    @property
+    def is_added(self) -> bool:
+        return "add" in _change_kinds(self.change_type)
+
+    @property
+    def is_deleted(self) -> bool:
+        return "delete" in _change_kinds(self.change_type)
+
+
+def _change_kinds(change_type: str) -> set[str]:
+    """Separa changeType composto (ex: "edit, rename")"""
+    return {kind.strip() for kind in change_type.split(",")}
+
+
+def archive_scope(paths: list[str]) -> str:
+    """Menor diretório que contém todos os `paths` (scopePath do zip)"""
+    return posixpath.commonpath([posixpath.dirname(path) or "/" for path in paths])
+
+
+def _archive_names(path: str, scope: str) -> list[str]:
+    """Nomes possíveis da entrada de `path` no zip: absoluto, relativo ao scope ou à pasta"""
+    relative = posixpath.relpath(path, scope)
+    folder = posixpath.basename(scope)
+    names = [path.lstrip("/"), relative]
+    if folder:
+        names.append(f"{folder}/{relative}")
+    return names
+
+
+def read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int) -> ItemContent:
+    """Lê uma entrada do zip; o tamanho declarado e o primeiro bloco decidem se é ignorada"""
+    buffer = CappedBuffer(max_bytes)
+    try:
+        buffer.check_size(info.file_size)
+        with archive.open(info) as entry:
+            while chunk := entry.read(STREAM_CHUNK_BYTES):
+                buffer.feed(chunk)
+    except SkippedFile as e:
+        return e
+    return buffer.text()
+
+
+class DiffTransport(Protocol):
+    """
+    Requisições do diff além do download por arquivo (merge base, itemsbatch, zips)
+    Falhas HTTP viram exceção; zips acima de `max_bytes` viram SkippedFile
+    """
+
+    def get_json(self, url: str, params: dict[str, str]) -> Any: ...
+
+    def post_json(self, url: str, payload: Any, params: dict[str, str]) -> Any: ...
+
+    def post_zip(self, url: str, payload: Any, params: dict[str, str]) -> bytes: ...
+
+    def get_zip(self, url: str, params: dict[str, str], max_bytes: int) -> bytes: ...
+
+
+class SessionDiffTransport:
+    """DiffTransport sobre a sessão síncrona do transporte HTTP"""
+
+    def __init__(self, http: HttpTransport):
+        self.http = http
+        self.session = http.session
+
+    def get_json(self, url: str, params: dict[str, str]) -> Any:
+        resp = self.session.get(url, params=params, timeout=self.http.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def post_json(self, url: str, payload: Any, params: dict[str, str]) -> Any:
+        resp = self.session.post(url, json=payload, params=params, timeout=self.http.bulk_timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def post_zip(self, url: str, payload: Any, params: dict[str, str]) -> bytes:
+        resp = self.session.post(
+            url,
+            json=payload,
+            params=params,
+            headers={"Accept": "application/zip"},
+            timeout=self.http.bulk_timeout,
+        )
+        resp.raise_for_status()
+        return bytes(resp.content)
+
+    def get_zip(self, url: str, params: dict[str, str], max_bytes: int) -> bytes:
+        """Corpo lido em blocos, até `max_bytes`"""
+        buffer = io.BytesIO()
+        with self.session.get(
+            url,
+            params=params,
+            headers={"Accept": "application/zip"},
+            stream=True,
+            timeout=self.http.bulk_timeout,
+        ) as resp:
+            resp.raise_for_status()
+            declared = int(resp.headers.get("Content-Length") or 0)
+            if reason := oversize_reason(declared, max_bytes):
+                raise SkippedFile(reason)
+            for block in resp.iter_content(chunk_size=ARCHIVE_CHUNK_BYTES):
+                buffer.write(block)
+                if reason := oversize_reason(buffer.tell(), max_bytes):
+                    raise SkippedFile(reason)
+        return buffer.getvalue()
 
 
 class DiffAdapter:
     """Processa e filtra diffs"""
 
     def __init__(
-        self, behavior: ReviewBehavior, limits: ReviewLimits, azure_config: AzureDevOpsConfig
+        self,
+        behavior: ReviewBehavior,
+        limits: ReviewLimits,
+        azure_config: AzureDevOpsConfig,
+        item_fetcher: ItemFetcher | None = None,
+        blob_cache: BlobCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http: HttpTransport | None = None,
+        api: DiffTransport | None = None,
     ):
         self.behavior = behavior
         self.limits = limits
         self.azure_config = azure_config
-        self._setup_session()
-
-    def _setup_session(self):
-        """Configura session para buscar conteúdo de arquivos"""
-        self.session = requests.Session()
-        token = self.azure_config.get_token()
-        auth = base64.b64encode(f":{token}".encode()).decode()
-        self.session.headers.update(
-            {
-                "Authorization": f"Basic {auth}",
-            }
+        self.blob_cache = blob_cache
+        self.rate_limiter = rate_limiter
+
+        # Mesmo pool do adapter de VCS quando injetado pelo bootstrap
+        self.http = http or HttpTransport(HttpConfig(), azure_config.get_token(), rate_limiter)
+        self.session = self.http.session
+        # Permite que outro cliente HTTP (ex: assíncrono) faça os downloads e as demais
+        # requisições do diff, no mesmo pool
+        self.item_fetcher: ItemFetcher = item_fetcher or self._fetch_items
+        self.api: DiffTransport = api or SessionDiffTransport(self.http)
+        # Algoritmo de diff escolhido por arquivo, conforme o número de linhas
+        self.diff_engines = DiffEngineSelector(behavior.diff_engine, limits.diff_large_file_lines)
+        # Merge base por (source, target): commits são imutáveis, o resultado também
+        self._merge_bases: dict[tuple[str, str], str | None] = {}
+        # Arquivos gerados/vendorizados: .gitattributes antes do download, conteúdo depois
+        self.generated = (
+            GeneratedFileDetector(
+                behavior.generated_header_bytes,
+                behavior.generated_max_line_length,
+                behavior.generated_max_entropy,
+            )
+            if behavior.skip_generated
+            else None
         )
+        self._gitattributes: dict[tuple[str, str], GitAttributes] = {}
 
     def should_include_file(self, filepath: str) -> bool:
         """Decide se arquivo deve ser incluído no diff"""
@@ -54,80 +323,682 @@ class DiffAdapter:
 
         return diff_lines[:max_lines]
 
-    def generate_diff(
-        self, repo_id: str, files: list[FileChange], source_branch: str, target_branch: str
-    ) -> tuple[str, int, int]:
+    def _version_ref(
+        self, path: str, object_id: str | None, commit: str | None, branch: str
+    ) -> VersionRef:
         """
-        Gera diff completo formatado para LLM
-        Retorna (diff_text, total_additions, total_deletions)
+        Escolhe a chave de uma versão do arquivo, preferindo chaves imutáveis:
+        blob objectId > commit da PR > nome da branch
         """
-        base_url = (
-            f"https://dev.azure.com/{self.azure_config.org}/{self.azure_config.project}/_apis"
+        if commit:
+            return VersionRef(path, object_id, commit, "commit")
+        return VersionRef(path, object_id, branch, "branch")
+
+    def _version_request(self, repo_url: str, ref: VersionRef) -> ItemRequest:
+        """Monta requisição de conteúdo (endpoint blobs ou items) para uma versão"""
+        api_version = self.azure_config.api_version
+
+        if ref.object_id:
+            return (
+                f"{repo_url}/blobs/{ref.object_id}",
+                {"$format": "octetstream", "api-version": api_version},
+            )
+
+        return (
+            f"{repo_url}/items",
+            {
+                "path": ref.path,
+                "versionDescriptor.version": ref.version,
+                "versionDescriptor.versionType": ref.version_type,
+                "api-version": api_version,
+            },
         )
-        diff_text = ""
-        total_additions = 0
-        total_deletions = 0
-        files_included = 0
 
-        for file in files[: self.limits.max_files_to_analyze]:
-            path = file.get("item", {}).get("path", "")
-            change_type = file.get("changeType", "")
+    def resolve_merge_base(
+        self, repo_url: str, source_commit: str, target_commit: str
+    ) -> str | None:
+        """
+        Ancestral comum dos commits da PR (commonCommit do endpoint diffs/commits)
+        None se a API não responder: o chamador usa o topo do destino. A falha também
+        fica guardada, para o par de commits ser consultado uma vez só
+        """
+        key = (source_commit, target_commit)
+        if key not in self._merge_bases:
+            try:
+                data = self.api.get_json(
+                    f"{repo_url}/diffs/commits",
+                    {
+                        "baseVersion": target_commit,
+                        "baseVersionType": "commit",
+                        "targetVersion": source_commit,
+                        "targetVersionType": "commit",
+                        "diffCommonCommit": "true",
+                        "$top": "1",  # Só o commonCommit interessa, não a lista de mudanças
+                        "api-version": self.azure_config.api_version,
+                    },
+                )
+                self._merge_bases[key] = data.get("commonCommit") or None
+            except Exception as e:
+                print(f"  • Merge base indisponível ({e}), comparando com o topo do destino")
+                self._merge_bases[key] = None
+        return self._merge_bases[key]
 
-            # Filtra arquivos irrelevantes
-            if not self.should_include_file(path):
-                continue
-            diff_text += f"\n## Arquivo {files_included + 1}: `{path}`\n**Tipo:** {change_type}\n\n"
+    def load_gitattributes(
+        self, repo_url: str, source_commit: str | None, source_branch: str
+    ) -> GitAttributes:
+        """
+        Regras do linguist no .gitattributes da raiz, na versão de origem da PR
+        Uma requisição por versão; sem o arquivo (ou com erro), nenhuma regra
+        """
+        ref = self._version_ref("/.gitattributes", None, source_commit, source_branch)
+        key = (repo_url, ref.version)
+        if key not in self._gitattributes:
+            content = self.item_fetcher([self._version_request(repo_url, ref)])[0]
+            self._gitattributes[key] = (
+                GitAttributes.parse(content) if isinstance(content, str) else GitAttributes()
+            )
+        return self._gitattributes[key]
+
+    def _skip_attributed(
+        self, selected: Iterator[SelectedFile], attributes: Callable[[], GitAttributes]
+    ) -> Iterator[SelectedFile]:
+        """
+        Marca como ignorados os arquivos gerados/vendorizados pelo .gitattributes
+        `attributes` só é chamado no primeiro arquivo: PR sem arquivos não faz a requisição
+        """
+        if self.generated is None:
+            yield from selected
+            return
+        for file in selected:
+            reason = file.skip_reason is None and attributes().linguist_reason(file.path)
+            yield replace(file, skip_reason=reason) if reason else file
+
+    def _detect_generated(self, versions: FileVersions) -> FileVersions:
+        """Ignora arquivo gerado pelo conteúdo da origem (da base, se o arquivo foi removido)"""
+        if self.generated is None or isinstance(versions, Exception):
+            return versions
+        reason = self.generated.detect(versions[1] or versions[0])
+        return SkippedFile(reason) if reason else versions
+
+    def _fetch_item(self, url: str, params: dict[str, str]) -> str:
+        """
+        Baixa o conteúdo de um arquivo em blocos, sem bufferizar além do limite
+        Binários e arquivos acima de `max_file_bytes` abortam o download (SkippedFile)
+        """
+        buffer = CappedBuffer(self.limits.max_file_bytes)
+        with self.session.get(url, params=params, stream=True, timeout=self.http.timeout) as resp:
+            resp.raise_for_status()
+            buffer.check_size(int(resp.headers.get("Content-Length") or 0))
+            for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+                buffer.feed(chunk)
+        return buffer.text()
+
+    def _fetch_items(self, requests_list: list[ItemRequest]) -> list[ItemContent]:
+        """
+        Baixa vários arquivos, em paralelo até `fetch_concurrency`
+        Retorna na mesma ordem de `requests_list`; falhas viram a exceção correspondente
+        """
 
+        def fetch(request: ItemRequest) -> ItemContent:
             try:
-                item_url = f"{base_url}/git/repositories/{repo_id}/items"
-                base_params: dict[str, str] = {
-                    "path": path,
-                    "versionDescriptor.version": target_branch,
-                    "versionDescriptor.versionType": "branch",
-                    "api-version": self.azure_config.api_version,
-                }
-                source_params: dict[str, str] = {
-                    "path": path,
-                    "versionDescriptor.version": source_branch,
-                    "versionDescriptor.versionType": "branch",
-                    "api-version": self.azure_config.api_version,
+                return self._fetch_item(*request)
+            except Exception as e:
+                return e
+
+        workers = min(self.limits.fetch_concurrency, len(requests_list))
+        if workers <= 1:
+            return [fetch(request) for request in requests_list]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch, requests_list))
+
+    def _post_items_batch(self, repo_url: str, refs: list[VersionRef]) -> list[Any]:
+        """Uma requisição itemsbatch: lista de itens (com contentMetadata) por versão"""
+        payload: dict[str, Any] = {
+            "itemDescriptors": [
+                {
+                    "path": ref.path,
+                    "version": ref.version,
+                    "versionType": ref.version_type,
+                    "recursionLevel": "none",
                 }
+                for ref in refs
+            ],
+            "includeContentMetadata": True,
+        }
+        data = self.api.post_json(
+            f"{repo_url}/itemsbatch", payload, {"api-version": self.azure_config.api_version}
+        )
+        return list(data.get("value", []))
 
-                base_content = self.session.get(item_url, params=base_params, timeout=30).text
-                source_content = self.session.get(item_url, params=source_params, timeout=30).text
+    def _metadata_skip_reasons(self, repo_url: str, refs: list[VersionRef]) -> list[str | None]:
+        """
+        Motivo para ignorar cada versão pelos metadados do itemsbatch, em lotes de
+        `batch_chunk_size`; falhas e itens sem metadados ficam para o download decidir
+        """
+        reasons: list[str | None] = []
+        chunk_size = max(1, self.limits.batch_chunk_size)
 
-                diff_lines = list(
-                    difflib.unified_diff(
-                        base_content.splitlines(keepends=True),
-                        source_content.splitlines(keepends=True),
-                        fromfile=f"a/{path}",
-                        tofile=f"b/{path}",
-                        lineterm="",
-                    )
+        for start in range(0, len(refs), chunk_size):
+            chunk = refs[start : start + chunk_size]
+            try:
+                results = self._post_items_batch(repo_url, chunk)
+            except Exception:
+                reasons.extend([None] * len(chunk))
+                continue
+            for index in range(len(chunk)):
+                items = results[index] if index < len(results) else []
+                reasons.append(
+                    metadata_skip_reason(items[0], self.limits.max_file_bytes) if items else None
+                )
+
+        return reasons
+
+    def _skip_by_metadata(
+        self,
+        repo_url: str,
+        selected: list[SelectedFile],
+        source: tuple[str | None, str],
+        target: tuple[str | None, str],
+        fetch_mode: str | None = None,
+    ) -> list[SelectedFile]:
+        """
+        Marca binários e arquivos grandes pelos metadados antes de qualquer GET de conteúdo
+        `source` e `target` são (commit, branch). Só consulta arquivos cujo changeEntry não
+        trouxe size/contentMetadata; no modo batch, quem não tem objectId já passa pelo
+        itemsbatch ao resolver o blob
+        """
+        if not self.behavior.metadata_prefetch:
+            return selected
+        fetch_mode = fetch_mode or self.behavior.fetch_mode
+
+        pending: list[int] = []
+        refs: list[VersionRef] = []
+        for index, file in enumerate(selected):
+            if file.skip_reason is not None or file.metadata_known:
+                continue
+            # Arquivo removido só tem a versão base; os demais são julgados pela origem
+            if file.is_deleted:
+                object_id, path, (commit, branch) = file.base_object_id, file.original_path, target
+            else:
+                object_id, path, (commit, branch) = file.source_object_id, file.path, source
+            if fetch_mode == "batch" and not object_id:
+                continue
+            pending.append(index)
+            refs.append(self._version_ref(path, None, commit, branch))
+
+        marked = list(selected)
+        reasons = self._metadata_skip_reasons(repo_url, refs) if refs else []
+        for index, reason in zip(pending, reasons, strict=True):
+            if reason:
+                marked[index] = replace(marked[index], skip_reason=reason)
+        return marked
+
+    def _resolve_object_ids(self, repo_url: str, refs: list[VersionRef]) -> list[ItemContent]:
+        """
+        Resolve o objectId das versões via endpoint itemsbatch, em lotes
+        Retorna o objectId ou a exceção correspondente, na ordem de `refs`
+        """
+        resolved: list[ItemContent] = []
+        chunk_size = max(1, self.limits.batch_chunk_size)
+
+        for start in range(0, len(refs), chunk_size):
+            chunk = refs[start : start + chunk_size]
+            try:
+                results = self._post_items_batch(repo_url, chunk)
+            except Exception as e:
+                resolved.extend([e] * len(chunk))
+                continue
+
+            for index, ref in enumerate(chunk):
+                items = results[index] if index < len(results) else []
+                if items and (reason := metadata_skip_reason(items[0], self.limits.max_file_bytes)):
+                    resolved.append(SkippedFile(reason))  # Nem entra no zip de blobs
+                    continue
+                object_id = items[0].get("objectId") if items else None
+                resolved.append(
+                    object_id or FileNotFoundError(f"{ref.path} não existe em {ref.version}")
+                )
+
+        return resolved
+
+    def _download_blobs_zip(self, repo_url: str, object_ids: list[str]) -> dict[str, ItemContent]:
+        """Baixa blobs em lotes como zip (POST blobs) e extrai o conteúdo em memória"""
+        contents: dict[str, ItemContent] = {}
+        chunk_size = max(1, self.limits.batch_chunk_size)
+
+        for start in range(0, len(object_ids), chunk_size):
+            chunk = object_ids[start : start + chunk_size]
+            try:
+                content = self.api.post_zip(
+                    f"{repo_url}/blobs", chunk, {"api-version": self.azure_config.api_version}
+                )
+                with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                    for info in archive.infolist():
+                        object_id = info.filename.rsplit("/", 1)[-1].split(".", 1)[0].lower()
+                        contents[object_id] = read_zip_entry(
+                            archive, info, self.limits.max_file_bytes
+                        )
+            except Exception as e:
+                for object_id in chunk:
+                    contents.setdefault(object_id.lower(), e)
+
+        return contents
+
+    def _fetch_batch(self, repo_url: str, refs: list[VersionRef]) -> list[ItemContent]:
+        """
+        Modo batch: poucas requisições para muitos arquivos
+        1) itemsbatch resolve objectIds das versões que só têm commit/branch
+        2) blobs (zip) baixa todos os conteúdos de uma vez
+        """
+        object_ids: list[ItemContent] = [ref.object_id or "" for ref in refs]
+
+        unresolved = [index for index, ref in enumerate(refs) if not ref.object_id]
+        if unresolved:
+            resolved = self._resolve_object_ids(repo_url, [refs[i] for i in unresolved])
+            for index, object_id in zip(unresolved, resolved, strict=True):
+                object_ids[index] = object_id
+
+        wanted = sorted({oid.lower() for oid in object_ids if isinstance(oid, str)})
+        blobs = self._download_blobs_zip(repo_url, wanted) if wanted else {}
+
+        contents: list[ItemContent] = []
+        for ref, object_id in zip(refs, object_ids, strict=True):
+            if isinstance(object_id, Exception):
+                contents.append(object_id)
+            else:
+                contents.append(
+                    blobs.get(object_id.lower(), FileNotFoundError(f"blob ausente: {ref.path}"))
                 )
+        return contents
 
-                if diff_lines:
-                    # Conta adições e remoções
-                    for line in diff_lines:
-                        if line.startswith("+") and not line.startswith("+++"):
-                            total_additions += 1
-                        elif line.startswith("-") and not line.startswith("---"):
-                            total_deletions += 1
+    def _extract_from_archive(
+        self, repo_url: str, version: str, version_type: str, paths: list[str]
+    ) -> dict[str, ItemContent]:
+        """
+        Baixa como zip a árvore do menor diretório comum aos `paths` em uma versão
+        O corpo é lido em blocos para memória, até `max_archive_bytes` (SkippedFile acima
+        disso); só as entradas de `paths` são descomprimidas
+        """
+        scope = archive_scope(paths)
+        params = {
+            "scopePath": scope,
+            "recursionLevel": "full",
+            "$format": "zip",
+            "versionDescriptor.version": version,
+            "versionDescriptor.versionType": version_type,
+            "api-version": self.azure_config.api_version,
+        }
 
-                    # Trunca se necessário
-                    truncated = self.truncate_diff(diff_lines, self.limits.max_diff_lines_per_file)
+        try:
+            body = self.api.get_zip(f"{repo_url}/items", params, self.limits.max_archive_bytes)
+        except SkippedFile as e:
+            raise SkippedFile(f"zip de {scope} {e.reason}") from e
 
-                    diff_text += "```diff\n"
-                    diff_text += "".join(truncated)
+        wanted: dict[str, str] = {}
+        for path in paths:
+            for name in _archive_names(path, scope):
+                wanted.setdefault(name, path)
 
-                    if len(diff_lines) > self.limits.max_diff_lines_per_file:
-                        omitted = len(diff_lines) - self.limits.max_diff_lines_per_file
-                        diff_text += f"\n... ({omitted} linhas omitidas)\n"
+        contents: dict[str, ItemContent] = {}
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            for info in archive.infolist():
+                match = wanted.get(info.filename.lstrip("/"))
+                if match is None or info.is_dir() or match in contents:
+                    continue
+                contents[match] = read_zip_entry(archive, info, self.limits.max_file_bytes)
+        return contents
 
-                    diff_text += "\n```\n\n"
-                    files_included += 1
+    def _fetch_archive(self, repo_url: str, refs: list[VersionRef]) -> list[ItemContent]:
+        """
+        Modo archive: um zip por versão (commit/branch) em vez de uma requisição por arquivo
+        Compensa em PRs que tocam muitos arquivos de uma mesma região da árvore. Todas as
+        versões, inclusive nos fallbacks, vêm por commit + path (sem o objectId da
+        iteração): as duas metades do diff saem do mesmo snapshot
+        """
+        groups: dict[tuple[str, str], list[int]] = {}
+        for index, ref in enumerate(refs):
+            groups.setdefault((ref.version, ref.version_type), []).append(index)
 
+        contents: list[ItemContent] = [FileNotFoundError(ref.path) for ref in refs]
+        scattered: list[int] = []
+        for (version, version_type), indexes in groups.items():
+            paths = sorted({refs[i].path for i in indexes})
+            if archive_scope(paths) == "/":
+                # Arquivos espalhados pela árvore: o zip seria o repositório inteiro
+                scattered.extend(indexes)
+                continue
+            try:
+                found = self._extract_from_archive(repo_url, version, version_type, paths)
+            except SkippedFile:
+                # Árvore grande demais para o zip (scope amplo): baixa arquivo a arquivo
+                fallback = self.item_fetcher(
+                    [
+                        self._version_request(repo_url, replace(refs[i], object_id=None))
+                        for i in indexes
+                    ]
+                )
+                for index, item in zip(indexes, fallback, strict=True):
+                    contents[index] = item
+                continue
             except Exception as e:
-                diff_text += f"⚠️ Erro lendo arquivo: {e}\n\n"
+                found = dict.fromkeys(paths, e)
+
+            for index in indexes:
+                path = refs[index].path
+                missing = FileNotFoundError(f"{path} não existe em {version}")
+                contents[index] = found.get(path, missing)
+
+        if scattered:
+            # Modo batch para todas as versões de uma vez: itemsbatch resolve os blobs
+            # por commit + path e só eles são baixados
+            batch = self._fetch_batch(
+                repo_url, [replace(refs[i], object_id=None) for i in scattered]
+            )
+            for index, item in zip(scattered, batch, strict=True):
+                contents[index] = item
+        return contents
+
+    def _download(
+        self, repo_url: str, refs: list[VersionRef], fetch_mode: str | None = None
+    ) -> list[ItemContent]:
+        """Baixa as versões pelo modo escolhido (por arquivo, em lote ou zip da árvore)"""
+        if not refs:
+            return []
+        fetch_mode = fetch_mode or self.behavior.fetch_mode
+        if fetch_mode == "archive":
+            return self._fetch_archive(repo_url, refs)
+        if fetch_mode == "batch":
+            return self._fetch_batch(repo_url, refs)
+        return self.item_fetcher([self._version_request(repo_url, ref) for ref in refs])
+
+    def _fetch_with_cache(
+        self, repo_url: str, refs: list[VersionRef], fetch_mode: str | None = None
+    ) -> list[ItemContent]:
+        """
+        Serve blobs já conhecidos do cache e baixa apenas os novos
+        O modo archive não usa o cache: o conteúdo vem por commit + path (ex: merge base)
+        e pode não ser o blob do objectId, nem na leitura nem na gravação
+        """
+        cache = self.blob_cache
+        if cache is None or (fetch_mode or self.behavior.fetch_mode) == "archive":
+            return self._download(repo_url, refs, fetch_mode)
+
+        cached: dict[int, str] = {}
+        for index, ref in enumerate(refs):
+            content = cache.get(ref.object_id)
+            if content is not None:
+                cached[index] = content
+
+        missing = [index for index in range(len(refs)) if index not in cached]
+        downloaded = self._download(repo_url, [refs[i] for i in missing], fetch_mode)
+        fetched = dict(zip(missing, downloaded, strict=True))
+
+        for index, item in fetched.items():
+            key = refs[index].object_id
+            if key is not None and cache.is_cacheable(key) and isinstance(item, str):
+                cache.put(key, item)
+
+        return [cached[i] if i in cached else fetched[i] for i in range(len(refs))]
+
+    def _fetch_all_versions(
+        self,
+        repo_url: str,
+        selected: list[SelectedFile],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        fetch_mode: str | None = None,
+        base_commit: str | None = None,
+    ) -> list[FileVersions]:
+        """
+        Baixa base (merge base com o target) e source de todos os arquivos, na ordem de `selected`
+        Arquivos adicionados não têm base e removidos não têm source: viram conteúdo vazio
+        `base_commit` (review incremental: origem da iteração comparada) substitui o merge
+        base, como o originalObjectId do $compareTo
+        """
+        selected = self._skip_by_metadata(
+            repo_url,
+            selected,
+            (source_commit, source_branch),
+            (base_commit or target_commit, target_branch),
+            fetch_mode,
+        )
+        refs: list[VersionRef] = []
+        slots: list[tuple[int | None, int | None] | SkippedFile] = []
+
+        def enqueue(ref: VersionRef) -> int:
+            refs.append(ref)
+            return len(refs) - 1
+
+        for file in selected:
+            if file.skip_reason is not None:
+                slots.append(SkippedFile(file.skip_reason))
+                continue
+            base_slot = None
+            if not file.is_added:
+                file_base = base_commit or target_commit
+                if (
+                    not base_commit
+                    and source_commit
+                    and target_commit
+                    and (not file.base_object_id or fetch_mode == "archive")
+                ):
+                    # Sem o blob base da iteração (ou no modo archive, que baixa por commit),
+                    # a base é o merge base e não o topo do destino: o que só mudou no
+                    # destino depois do fork fica fora do diff
+                    file_base = (
+                        self.resolve_merge_base(repo_url, source_commit, target_commit)
+                        or target_commit
+                    )
+                base_slot = enqueue(
+                    self._version_ref(
+                        file.original_path, file.base_object_id, file_base, target_branch
+                    )
+                )
+            source_slot = None
+            if not file.is_deleted:
+                source_slot = enqueue(
+                    self._version_ref(
+                        file.path, file.source_object_id, source_commit, source_branch
+                    )
+                )
+            slots.append((base_slot, source_slot))
+
+        contents = self._fetch_with_cache(repo_url, refs, fetch_mode)
+
+        versions: list[FileVersions] = []
+        for slot in slots:
+            if isinstance(slot, SkippedFile):
+                versions.append(slot)
+                continue
+            base_slot, source_slot = slot
+            base_content = "" if base_slot is None else contents[base_slot]
+            source_content = "" if source_slot is None else contents[source_slot]
+            if isinstance(base_content, Exception):
+                versions.append(base_content)
+            elif isinstance(source_content, Exception):
+                versions.append(source_content)
+            else:
+                versions.append((base_content, source_content))
+        return versions
+
+    def _select_file(self, file: FileChange) -> SelectedFile | None:
+        """
+        Converte changeEntry em SelectedFile, ou None se o arquivo for ignorado
+        Pastas somem do diff; submódulos (e binários/arquivos grandes, quando o entry traz
+        size ou contentMetadata) ficam com `skip_reason`: aparecem como ignorados, sem download
+        """
+        item = file.get("item", {})
+        path = item.get("path", "")
+        if item.get("isFolder") or item.get("gitObjectType") == "tree":
+            return None
+        if not self.should_include_file(path):
+            return None
+
+        return SelectedFile(
+            path=path,
+            change_type=file.get("changeType", ""),
+            original_path=file.get("originalPath") or path,
+            base_object_id=item.get("originalObjectId"),
+            source_object_id=item.get("objectId"),
+            skip_reason=metadata_skip_reason(item, self.limits.max_file_bytes),
+            metadata_known="size" in item or "contentMetadata" in item,
+        )
+
+    def select_files(self, files: Iterable[FileChange]) -> list[SelectedFile]:
+        """Filtra arquivos irrelevantes e extrai os objectIds de cada versão"""
+        return list(self._iter_selected(files))
+
+    def _iter_selected(self, files: Iterable[FileChange]) -> Iterator[SelectedFile]:
+        """
+        Consome `files` sob demanda, descartando arquivos ignorados
+        Só os primeiros `max_files_to_analyze` entries são lidos do iterador
+        """
+        for file in islice(files, self.limits.max_files_to_analyze):
+            chosen = self._select_file(file)
+            if chosen is not None:
+                yield chosen
+
+    def _choose_fetch_mode(
+        self, selected: Iterator[SelectedFile]
+    ) -> tuple[str, Iterator[SelectedFile]]:
+        """
+        Troca para o modo archive quando a PR tem `archive_threshold_files` arquivos ou mais
+        Só lê até o limiar antes de decidir; retorna o modo e os arquivos (nada é perdido)
+        """
+        fetch_mode = self.behavior.fetch_mode
+        threshold = self.limits.archive_threshold_files
+        if fetch_mode == "archive" or threshold <= 0:
+            return fetch_mode, selected
+
+        head = list(islice(selected, threshold))
+        if len(head) >= threshold:
+            fetch_mode = "archive"
+        return fetch_mode, chain(head, selected)
+
+    def _iter_selected_chunks(
+        self, selected: Iterator[SelectedFile], fetch_mode: str
+    ) -> Iterator[list[SelectedFile]]:
+        """Agrupa os arquivos selecionados em lotes de download conforme o modo"""
+        if fetch_mode == "archive":
+            # Um único zip por versão cobre todos os arquivos
+            chunk_size = self.limits.max_files_to_analyze
+        elif fetch_mode == "batch":
+            chunk_size = self.limits.batch_chunk_size // 2  # 2 versões por arquivo
+        else:
+            chunk_size = self.limits.fetch_concurrency
+
+        chunk_size = max(1, chunk_size)
+        while chunk := list(islice(selected, chunk_size)):
+            yield chunk
+
+    def iter_file_diffs(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> Iterator[FileDiffChunk]:
+        """
+        Gera o diff de cada arquivo na ordem de `files`, lote a lote
+        Um lote é entregue assim que termina de baixar, sem esperar o restante da PR
+        """
+        repo_url = f"{self.azure_config.project_url()}/_apis/git/repositories/{repo_id}"
+
+        # Filtra arquivos irrelevantes antes de qualquer download; cada lote começa a ser
+        # baixado assim que é montado, enquanto as próximas páginas de `files` carregam
+        selected = self._skip_attributed(
+            self._iter_selected(files),
+            lambda: self.load_gitattributes(repo_url, source_commit, source_branch),
+        )
+        fetch_mode, candidates = self._choose_fetch_mode(selected)
+        pending: deque[tuple[list[SelectedFile], Future[list[FileVersions]]]] = deque()
+        with ThreadPoolExecutor(max_workers=1) as downloader:
+            for chunk in self._iter_selected_chunks(candidates, fetch_mode):
+                future = downloader.submit(
+                    self._fetch_all_versions,
+                    repo_url,
+                    chunk,
+                    source_branch,
+                    target_branch,
+                    source_commit,
+                    target_commit,
+                    fetch_mode,
+                    base_commit,
+                )
+                pending.append((chunk, future))
+                # No máximo um lote baixando à frente do que já foi entregue: a memória
+                # fica limitada a dois lotes, seja qual for o tamanho da PR
+                while pending and (len(pending) > 1 or pending[0][1].done()):
+                    yield from self._chunk_diffs(*pending.popleft())
+            while pending:
+                yield from self._chunk_diffs(*pending.popleft())
+
+    def _chunk_diffs(
+        self, selected: list[SelectedFile], future: Future[list[FileVersions]]
+    ) -> Iterator[FileDiffChunk]:
+        """Diffs de um lote baixado, na ordem dos arquivos"""
+        for file, versions in zip(selected, future.result(), strict=True):
+            versions = self._detect_generated(versions)
+            yield self.build_chunk(file, self._diff_versions(file.path, versions))
+
+    def generate_diff(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> tuple[str, int, int]:
+        """
+        Gera diff completo formatado para LLM
+        Retorna (diff_text, total_additions, total_deletions)
+        """
+        return self.render_diff(
+            self.iter_file_diffs(
+                repo_id,
+                files,
+                source_branch,
+                target_branch,
+                source_commit,
+                target_commit,
+                base_commit,
+            )
+        )
+
+    def _diff_versions(self, path: str, versions: FileVersions) -> FileDiff:
+        """Diff unificado entre base e source de um arquivo, no algoritmo do tamanho dele"""
+        if isinstance(versions, Exception):
+            return versions
+        base_lines = versions[0].splitlines(keepends=True)
+        source_lines = versions[1].splitlines(keepends=True)
+        engine = self.diff_engines.select(max(len(base_lines), len(source_lines)))
+        return engine.unified_diff(base_lines, source_lines, f"a/{path}", f"b/{path}")
+
+    def build_chunk(self, file: SelectedFile, diff_lines: FileDiff) -> FileDiffChunk:
+        """Chunk do arquivo, truncado em `max_diff_lines_per_file`"""
+        if isinstance(diff_lines, SkippedFile):
+            return FileDiffChunk(
+                path=file.path, change_type=file.change_type, skipped_reason=diff_lines.reason
+            )
+        if isinstance(diff_lines, Exception):
+            return FileDiffChunk(
+                path=file.path, change_type=file.change_type, error=str(diff_lines)
+            )
+        return FileDiffChunk.from_diff_lines(
+            file.path,
+            file.change_type,
+            diff_lines,
+            self.truncate_diff(diff_lines, self.limits.max_diff_lines_per_file),
+        )
 
-        return diff_text, total_additions, total_deletions
+    def render_diff(self, chunks: Iterable[FileDiffChunk]) -> tuple[str, int, int]:
+        """Formata os chunks para o LLM; retorna (diff_text, total_additions, total_deletions)"""
+        return format_diff_chunks(chunks)
@@ -0,0 +1,189 @@
+"""
+Adapter que gera o diff a partir de um clone local ou de um mirror bare
+Implementa DiffPort sem nenhuma requisição por arquivo
+"""
+
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from typing import Any
+
+from src.adapters.diff_adapter import (
+    DiffAdapter,
+    FileDiff,
+    SelectedFile,
+    SkippedFile,
+    oversize_reason,
+)
+from src.core.domain.file_diff import FileDiffChunk
+from src.core.ports.diff_port import FileChange
+from src.infrastructure.config.settings import AzureDevOpsConfig, ReviewBehavior, ReviewLimits
+from src.infrastructure.diff.generated import GitAttributes
+from src.infrastructure.git.mirror import GitMirrorStore
+from src.infrastructure.git.repository import GitError, GitFileDiff, GitRepository
+
+
+class GitDiffAdapter(DiffAdapter):
+    """
+    Roda `git diff` entre o merge base (ou, no review incremental, a origem da iteração
+    comparada) e o commit de origem da PR, com detecção de renomeação
+    Usa a working copy em `repository` ou, sem ela, o mirror bare do repositório em `mirrors`
+    Se os commits da PR ou o merge base não estão disponíveis (checkout raso, outro
+    repositório), cai para o download via API do DiffAdapter
+    """
+
+    def __init__(
+        self,
+        behavior: ReviewBehavior,
+        limits: ReviewLimits,
+        azure_config: AzureDevOpsConfig,
+        repository: GitRepository | None = None,
+        mirrors: GitMirrorStore | None = None,
+        **kwargs: Any,
+    ):
+        if repository is None and mirrors is None:
+            raise ValueError("GitDiffAdapter precisa de `repository` ou `mirrors`")
+        super().__init__(behavior, limits, azure_config, **kwargs)
+        self.repository = repository
+        self.mirrors = mirrors
+
+    def repository_for(self, repo_id: str) -> GitRepository:
+        """Working copy configurada ou o mirror do repositório da PR"""
+        if self.repository is not None:
+            return self.repository
+        assert self.mirrors is not None
+        return self.mirrors.get(repo_id)
+
+    def iter_file_diffs(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> Iterator[FileDiffChunk]:
+        repository = self.repository_for(repo_id)
+        # No review incremental a base é a origem da iteração comparada: só o que mudou
+        # desde o último review entra no diff, como no originalObjectId do $compareTo
+        commits = [source_commit, target_commit, base_commit]
+        if not (
+            source_commit
+            and target_commit
+            and self._ensure_commits(
+                repository,
+                [commit for commit in commits if commit],
+                [source_branch, target_branch],
+            )
+        ):
+            print("  • Commits da PR ausentes no clone local, baixando arquivos pela API")
+            yield from super().iter_file_diffs(
+                repo_id,
+                files,
+                source_branch,
+                target_branch,
+                source_commit,
+                target_commit,
+                base_commit,
+            )
+            return
+
+        # Sem o merge base (histórico raso, fetchDepth do pipeline), diffar contra o topo
+        # do destino mostraria as mudanças só do destino como revertidas: usa a API
+        base = base_commit or repository.merge_base(target_commit, source_commit)
+        if base is None:
+            print("  • Merge base fora do histórico local (clone raso?), baixando pela API")
+            yield from super().iter_file_diffs(
+                repo_id,
+                files,
+                source_branch,
+                target_branch,
+                source_commit,
+                target_commit,
+                base_commit,
+            )
+            return
+
+        gitattributes = repository.read_file(source_commit, ".gitattributes")
+        attributes = GitAttributes.parse(gitattributes or "")
+        selected = self._skip_oversized(
+            repository,
+            list(self._skip_attributed(self._iter_selected(files), lambda: attributes)),
+            base,
+            source_commit,
+        )
+
+        paths = {
+            path.lstrip("/")
+            for file in selected
+            if file.skip_reason is None
+            for path in (file.path, file.original_path)
+        }
+        diffs = repository.diff(base, source_commit, sorted(paths)) if paths else {}
+
+        for file in selected:
+            yield self.build_chunk(file, self._file_diff(file, diffs))
+
+    @staticmethod
+    def _ensure_commits(repository: GitRepository, commits: list[str], branches: list[str]) -> bool:
+        """Disponibiliza os commits no repositório; falha de rede/git vira fallback p/ API"""
+        try:
+            return repository.ensure_commits(commits, branches)
+        except (GitError, OSError) as e:
+            print(f"  • Falha ao preparar repositório local: {e}")
+            return False
+
+    def _skip_oversized(
+        self,
+        repository: GitRepository,
+        selected: list[SelectedFile],
+        base: str,
+        source_commit: str,
+    ) -> list[SelectedFile]:
+        """
+        Marca arquivos acima de `max_file_bytes` (em qualquer das versões) pelo tamanho dos
+        blobs, antes do `git diff`: a saída deles nem chega a ser gerada
+        """
+        max_bytes = self.limits.max_file_bytes
+        pending = [file for file in selected if file.skip_reason is None]
+        if not max_bytes or not pending:
+            return selected
+
+        source_sizes = repository.blob_sizes(
+            source_commit, sorted({file.path.lstrip("/") for file in pending})
+        )
+        base_sizes = repository.blob_sizes(
+            base, sorted({file.original_path.lstrip("/") for file in pending})
+        )
+
+        marked: list[SelectedFile] = []
+        for file in selected:
+            size = max(
+                source_sizes.get(file.path.lstrip("/"), 0),
+                base_sizes.get(file.original_path.lstrip("/"), 0),
+            )
+            reason = file.skip_reason is None and oversize_reason(size, max_bytes)
+            marked.append(replace(file, skip_reason=reason) if reason else file)
+        return marked
+
+    def _file_diff(self, file: SelectedFile, diffs: dict[str, GitFileDiff]) -> FileDiff:
+        """
+        Linhas do git diff do arquivo; vazio se não mudou desde a base
+        Sem o conteúdo completo, a detecção de arquivo gerado olha as linhas novas do diff
+        """
+        if file.skip_reason is not None:
+            return SkippedFile(file.skip_reason)
+        diff = diffs.get(file.path.lstrip("/"))
+        if diff is None:
+            return []
+        if diff.binary:
+            return SkippedFile("binário")
+        if self.generated is not None:
+            new_text = "".join(
+                line[1:]
+                for line in diff.lines
+                if line[:1] in ("+", " ") and not line.startswith("+++ ")
+            )
+            if reason := self.generated.detect(new_text):
+                return SkippedFile(reason)
+        return diff.lines
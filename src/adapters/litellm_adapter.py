@@ -81,7 +81,7 @@ class LiteLLMAdapter:
             pr_title=pr_info.title,
             source_branch=pr_info.source_branch,
             target_branch=pr_info.target_branch,
-            changed_files=pr_info.changed_files_count,
+            changed_files=pr_info.changed_files_label,
             custom_rules=rules_content,
             diff_content=diff_text,
         )
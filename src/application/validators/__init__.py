@@ -1,6 +1,7 @@
 """Validators module - business rules validation"""
 
 from .cost_validator import CostValidator
+from .line_validator import LineValidator
 from .pr_validator import PRValidator
 
-__all__ = ["PRValidator", "CostValidator"]
+__all__ = ["PRValidator", "CostValidator", "LineValidator"]
@@ -0,0 +1,66 @@
+"""
+Validador das linhas citadas pelo LLM - confere contra os hunks do diff enviado
+"""
+
+from collections.abc import Mapping
+
+from src.core.domain.file_diff import LineIndex
+from src.core.domain.file_review import FileReview, Issue
+
+
+class LineValidator:
+    """
+    O LLM conta as linhas do diff sozinho e às vezes erra: linha fora de qualquer hunk
+    vira a linha alterada mais próxima; sem linhas alteradas no arquivo, fica sem linha.
+    Em ambos os casos o texto ganha a linha original, que a mensagem pode estar citando
+    """
+
+    def validate(
+        self, file_reviews: list[FileReview], line_indexes: Mapping[str, LineIndex]
+    ) -> tuple[list[FileReview], int]:
+        """
+        Retorna (reviews com as linhas corrigidas, quantidade de linhas corrigidas)
+        `line_indexes` é indexado pelo path sem a barra inicial; arquivos sem índice
+        (path desconhecido) ficam como vieram
+        """
+        validated: list[FileReview] = []
+        fixed = 0
+
+        for file_review in file_reviews:
+            line_index = line_indexes.get(file_review.filepath.lstrip("/"))
+            if line_index is None:
+                validated.append(file_review)
+                continue
+
+            def anchor(issues: list[Issue], index: LineIndex = line_index) -> list[Issue]:
+                nonlocal fixed
+                anchored: list[Issue] = []
+                for issue in issues:
+                    if issue.line is not None and not index.in_hunk(issue.line):
+                        # O texto pode citar a linha que o LLM viu: ela fica registrada
+                        issue = issue.model_copy(
+                            update={
+                                "line": index.nearest_changed(issue.line),
+                                "text": f"{issue.text} (linha {issue.line} original)",
+                            }
+                        )
+                        fixed += 1
+                    anchored.append(issue)
+                return anchored
+
+            critical = anchor(file_review.critical_issues)
+            important = anchor(file_review.important_issues)
+            suggestions = anchor(file_review.suggestions)
+            referenced = {issue.line for issue in critical + important + suggestions if issue.line}
+            validated.append(
+                file_review.model_copy(
+                    update={
+                        "critical_issues": critical,
+                        "important_issues": important,
+                        "suggestions": suggestions,
+                        "referenced_lines": sorted(referenced),
+                    }
+                )
+            )
+
+        return validated, fixed
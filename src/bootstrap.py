@@ -3,17 +3,32 @@ Bootstrap - centraliza criação de dependências
 Usa Ports (interfaces) para desacoplar core de implementações
 """
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
 # Adapters (implementações) - injetados via DI
-from src.adapters import AzureDevOpsAdapter, DiffAdapter, LiteLLMAdapter
+from src.adapters import (
+    AzureDevOpsAdapter,
+    DiffAdapter,
+    GitDiffAdapter,
+    LiteLLMAdapter,
+    PooledAzureDevOpsAdapter,
+)
 from src.application.parsers.review_parser import ReviewParser
 from src.application.validators.cost_validator import CostValidator
+from src.application.validators.line_validator import LineValidator
 from src.application.validators.pr_validator import PRValidator
 
 # Ports (interfaces) - o que o core precisa
 from src.core.ports import DiffPort, LLMPort, VCSPort
+from src.infrastructure.cache.blob_cache import BlobCache
+from src.infrastructure.cache.http_cache import HttpValidatorCache
 from src.infrastructure.config.settings import Config, load_config
+from src.infrastructure.git import GitMirrorStore, GitRepository
+from src.infrastructure.http.rate_limiter import RateLimiter
+from src.infrastructure.http.transport import HttpTransport
 
 # Application layer
 from src.infrastructure.rules_service import RulesService
@@ -33,6 +48,17 @@ class AppContainer:
     parser: ReviewParser
     pr_validator: PRValidator
     cost_validator: CostValidator
+    line_validator: LineValidator
+    blob_cache: BlobCache | None = None  # Cache de conteúdo de arquivos (None = desativado)
+    http_cache: HttpValidatorCache | None = None  # ETags de PR/iterações/mudanças
+    http: HttpTransport | None = None  # Transporte compartilhado (pool + métricas)
+    # Liberam recursos dos adapters (pool assíncrono, thread do event loop) no fim do review
+    closers: list[Callable[[], None]] = field(default_factory=list)
+
+    def close(self) -> None:
+        """Fecha os recursos registrados, na ordem inversa da criação"""
+        while self.closers:
+            self.closers.pop()()
 
 
 def create_app(project: str | None = None) -> AppContainer:
@@ -49,13 +75,110 @@ def create_app(project: str | None = None) -> AppContainer:
     if project:
         config.azure.project = project
 
+    blob_cache = None
+    http_cache = None
+    if config.cache.enabled:
+        cache_dir = Path(config.cache.dir).expanduser()
+        blob_cache = BlobCache(
+            cache_dir / "blobs",
+            max_bytes=config.cache.max_size_mb * 1024 * 1024,
+        )
+        http_cache = HttpValidatorCache(cache_dir / "http", config.cache.http_max_entries)
+
+    # Um bucket por organização; com cache ativo o estado fica em disco e é
+    # compartilhado por todos os reviews rodando em paralelo na mesma máquina
+    rate_limiter = None
+    if config.azure.rate_limit_per_second > 0:
+        rate_limiter = RateLimiter(
+            config.azure.rate_limit_per_second,
+            config.azure.rate_limit_burst,
+            state_path=(
+                Path(config.cache.dir).expanduser() / "rate_limit.sqlite"
+                if config.cache.enabled
+                else None
+            ),
+            name=config.azure.org,
+        )
+
+    # Uma só sessão/pool para todos os adapters: sem conexões paralelas ao mesmo host
+    http = HttpTransport(config.http, config.azure.get_token(), rate_limiter)
+
+    azure: VCSPort
+    diff_service: DiffPort
+    closers: list[Callable[[], None]] = []
+    # Clientes HTTP do diff via API (o do git cai nela sem os commits locais)
+    diff_io: dict[str, Any] = {}
+    if config.azure.async_client:
+        # Um único pool assíncrono atende VCS e diff
+        pooled = PooledAzureDevOpsAdapter(
+            config.azure,
+            config.behavior,
+            config.limits,
+            blob_cache=blob_cache,
+            http_cache=http_cache,
+            rate_limiter=rate_limiter,
+            http=http,
+        )
+        azure, diff_service = pooled, pooled
+        diff_io = {"item_fetcher": pooled.fetch_items, "api": pooled.diff_transport}
+        closers.append(pooled.close)
+    else:
+        # Implementação Azure DevOps
+        azure = AzureDevOpsAdapter(
+            config.azure, http_cache=http_cache, rate_limiter=rate_limiter, http=http
+        )
+        diff_service = DiffAdapter(
+            config.behavior,
+            config.limits,
+            config.azure,
+            blob_cache=blob_cache,
+            rate_limiter=rate_limiter,
+            http=http,
+        )
+
+    # Checkout local (ex: pipeline da PR): diff via git, sem baixar arquivos
+    repo_path = config.git.get_repo_path()
+    if repo_path and GitRepository.is_repository(repo_path, config.git.executable):
+        diff_service = GitDiffAdapter(
+            config.behavior,
+            config.limits,
+            config.azure,
+            GitRepository(repo_path, config.git.executable),
+            blob_cache=blob_cache,
+            rate_limiter=rate_limiter,
+            http=http,
+            **diff_io,
+        )
+    elif mirror_dir := config.git.get_mirror_dir(config.cache.dir):
+        # Sem checkout (daemon/lote): mirror bare por repositório, só busca objetos novos
+        diff_service = GitDiffAdapter(
+            config.behavior,
+            config.limits,
+            config.azure,
+            mirrors=GitMirrorStore(
+                mirror_dir,
+                f"{config.azure.project_url()}/_git/{{repo_id}}",
+                config.azure.get_token(),
+                config.git.executable,
+            ),
+            blob_cache=blob_cache,
+            rate_limiter=rate_limiter,
+            http=http,
+            **diff_io,
+        )
+
     return AppContainer(
         config=config,
-        azure=AzureDevOpsAdapter(config.azure),  # Implementação Azure DevOps
+        azure=azure,
         llm=LiteLLMAdapter(config.llm),  # Implementação LiteLLM
-        diff_service=DiffAdapter(config.behavior, config.limits, config.azure),
+        diff_service=diff_service,
         rules_service=RulesService(rules_base_path="review_rules"),
         parser=ReviewParser(),
         pr_validator=PRValidator(config.behavior, config.limits),
         cost_validator=CostValidator(config.limits, model_cost_per_1k=config.llm.model_cost_per_1k),
+        line_validator=LineValidator(),
+        blob_cache=blob_cache,
+        http_cache=http_cache,
+        http=http,
+        closers=closers,
     )
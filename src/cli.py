@@ -64,3 +64,78 @@ def run_tests_cov(argv: Sequence[str] | None = None) -> None:
         raise SystemExit(pytest.main(defaults))
     # Se tiver argumentos, adiciona aos defaults
     raise SystemExit(pytest.main(defaults + args))
+
+
+def fake_azure_devops(argv: Sequence[str] | None = None) -> None:
+    """Sobe o servidor fake do Azure DevOps com repositórios sintéticos."""
+    from src.infrastructure.fakes import (
+        FakeAzureDevOpsServer,
+        FakeServerConfig,
+        SyntheticRepository,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="fake-azdo",
+        description="Servidor REST local que imita o Azure DevOps para testes de carga.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--repos", type=int, default=1, help="Repositórios (repo-0, repo-1...)")
+    parser.add_argument("--files", type=int, default=50, help="Arquivos alterados por PR")
+    parser.add_argument("--lines", type=int, default=200, help="Linhas médias por arquivo")
+    parser.add_argument("--binary-files", type=int, default=0, help="Binários por PR")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Requisições/s antes do 429 (0 = sem)"
+    )
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument(
+        "--window", type=float, default=10.0, help="Janela (s) do orçamento em X-RateLimit-*"
+    )
+    parser.add_argument("--max-page-size", type=int, default=2000)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    repositories = [
+        SyntheticRepository.generate(
+            f"repo-{index}", args.files, args.lines, args.seed, args.binary_files
+        )
+        for index in range(args.repos)
+    ]
+    config = FakeServerConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_per_second=args.rate_limit,
+        rate_limit_burst=args.burst,
+        rate_limit_window_seconds=args.window,
+        max_page_size=args.max_page_size,
+        seed=args.seed,
+    )
+    server = FakeAzureDevOpsServer(repositories, config, args.host, args.port)
+    print(f"Fake Azure DevOps em {server.base_url} (AZDO_BASE_URL)")
+    print(f"Repositórios: {', '.join(repo.repo_id for repo in repositories)} - PR 1")
+    print(f"Estatísticas: {server.base_url}/_stats")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+def benchmark_diff(argv: Sequence[str] | None = None) -> None:
+    """Compara os algoritmos de diff (tempo e qualidade dos hunks) em um corpus fixo."""
+    from src.infrastructure.diff.benchmark import build_corpus, format_results, run_benchmark
+
+    parser = argparse.ArgumentParser(
+        prog="bench-diff",
+        description="Benchmark dos algoritmos de diff disponíveis.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplica o tamanho do corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (vale o melhor tempo)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = run_benchmark(build_corpus(args.seed, args.scale), repeat=args.repeat)
+    print(format_results(results))
@@ -2,13 +2,18 @@
 Domain models - Entidades do negócio
 """
 
+from src.core.domain.file_diff import DiffHunk, FileDiffChunk, LineIndex
 from src.core.domain.file_review import FileReview, Issue
-from src.core.domain.pull_request import PullRequestInfo
+from src.core.domain.pull_request import PullRequestInfo, PullRequestSnapshot
 from src.core.domain.review_result import ReviewResult
 
 __all__ = [
     "PullRequestInfo",
+    "PullRequestSnapshot",
     "Issue",
     "FileReview",
     "ReviewResult",
+    "DiffHunk",
+    "FileDiffChunk",
+    "LineIndex",
 ]
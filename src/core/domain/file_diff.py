@@ -0,0 +1,181 @@
+"""
+Models para o diff de cada arquivo, gerado sob demanda (um chunk por arquivo)
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# Cabeçalho de hunk do diff unificado: @@ -início,tamanho +início,tamanho @@
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class DiffHunk(BaseModel):
+    """Intervalos de um hunk nas versões base (old) e source (new)"""
+
+    model_config = ConfigDict(frozen=True)
+
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+
+    @classmethod
+    def parse(cls, header: str) -> "DiffHunk | None":
+        """Lê o cabeçalho "@@ -a,b +c,d @@"; None se a linha não for um cabeçalho"""
+        match = _HUNK_HEADER.match(header)
+        if match is None:
+            return None
+        old_start, old_lines, new_start, new_lines = match.groups()
+        return cls(
+            old_start=int(old_start),
+            old_lines=1 if old_lines is None else int(old_lines),
+            new_start=int(new_start),
+            new_lines=1 if new_lines is None else int(new_lines),
+        )
+
+
+class LineIndex:
+    """
+    Mapa das linhas do diff para o arquivo novo, em arrays compactos (int32)
+    Gerado uma vez a partir das linhas enviadas ao LLM; as consultas por número de linha
+    do arquivo novo são buscas binárias, O(log n)
+    """
+
+    __slots__ = ("new_lines", "changed", "hunk_starts", "hunk_ends")
+
+    def __init__(self) -> None:
+        self.new_lines = array("i")  # Linha no arquivo novo de cada linha do diff (0 = nenhuma)
+        self.changed = array("i")  # Linhas adicionadas e pontos de remoção, ordenados
+        self.hunk_starts = array("i")  # Primeira linha (arquivo novo) de cada hunk
+        self.hunk_ends = array("i")  # Última linha emitida de cada hunk
+
+    @classmethod
+    def build(cls, diff_lines: Iterable[str]) -> "LineIndex":
+        """Percorre o diff uma vez; cabeçalhos, remoções e "\\ No newline" não têm linha nova"""
+        index = cls()
+        current = 0
+        for line in diff_lines:
+            if line.startswith("@@"):
+                hunk = DiffHunk.parse(line)
+                if hunk is not None:
+                    current = max(1, hunk.new_start)
+                    index.hunk_starts.append(current)
+                    index.hunk_ends.append(current)
+                index.new_lines.append(0)
+            elif not index.hunk_starts or line.startswith("\\"):
+                index.new_lines.append(0)  # Cabeçalhos ---/+++ antes do primeiro hunk
+            elif line.startswith("-"):
+                # Remoção ancora na linha nova seguinte (onde o trecho removido estava)
+                index._mark_changed(current)
+                index.new_lines.append(0)
+            else:
+                if line.startswith("+"):
+                    index._mark_changed(current)
+                index.new_lines.append(current)
+                index.hunk_ends[-1] = current
+                current += 1
+        return index
+
+    def _mark_changed(self, line: int) -> None:
+        if not self.changed or self.changed[-1] != line:
+            self.changed.append(line)
+
+    def __len__(self) -> int:
+        return len(self.new_lines)
+
+    def new_line_at(self, position: int) -> int | None:
+        """Linha no arquivo novo da linha `position` (0-based) do diff"""
+        line = self.new_lines[position]
+        return line or None
+
+    def hunk_range(self, line: int) -> tuple[int, int] | None:
+        """(início, fim) do hunk que contém `line`, ou None se a linha está fora do diff"""
+        i = bisect_right(self.hunk_starts, line) - 1
+        if i < 0 or line > self.hunk_ends[i]:
+            return None
+        return self.hunk_starts[i], self.hunk_ends[i]
+
+    def in_hunk(self, line: int) -> bool:
+        return self.hunk_range(line) is not None
+
+    def is_changed(self, line: int) -> bool:
+        i = bisect_left(self.changed, line)
+        return i < len(self.changed) and self.changed[i] == line
+
+    def nearest_changed(self, line: int) -> int | None:
+        """Linha alterada mais próxima de `line` (empate fica com a anterior)"""
+        if not self.changed:
+            return None
+        i = bisect_left(self.changed, line)
+        if i == len(self.changed):
+            return self.changed[-1]
+        if i == 0 or self.changed[i] == line:
+            return self.changed[i]
+        before, after = self.changed[i - 1], self.changed[i]
+        return before if line - before <= after - line else after
+
+
+class FileDiffChunk(BaseModel):
+    """
+    Diff de um arquivo pronto para o LLM, já truncado
+    Arquivos ignorados (binários, grandes) ou com erro de download vêm sem linhas
+    """
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    path: str
+    change_type: str
+    lines: list[str] = Field(default_factory=list)  # Linhas enviadas (após o truncamento)
+    hunks: list[DiffHunk] = Field(default_factory=list)  # Todos os hunks do diff completo
+    additions: int = 0
+    deletions: int = 0
+    total_lines: int = 0  # Linhas do diff completo, antes do truncamento
+    skipped_reason: str | None = None  # "binário", "maior que N bytes"...
+    error: str | None = None
+    line_index: LineIndex = Field(default_factory=LineIndex, exclude=True, repr=False)
+
+    @classmethod
+    def from_diff_lines(
+        cls, path: str, change_type: str, diff_lines: list[str], kept_lines: list[str]
+    ) -> "FileDiffChunk":
+        """Conta adições/remoções e lê os hunks do diff completo; guarda só `kept_lines`"""
+        additions = deletions = 0
+        for line in diff_lines:
+            if line.startswith("+") and not line.startswith("+++"):
+                additions += 1
+            elif line.startswith("-") and not line.startswith("---"):
+                deletions += 1
+
+        return cls(
+            path=path,
+            change_type=change_type,
+            lines=kept_lines,
+            hunks=_parse_hunks(diff_lines),
+            additions=additions,
+            deletions=deletions,
+            total_lines=len(diff_lines),
+            line_index=LineIndex.build(kept_lines),
+        )
+
+    @property
+    def omitted_lines(self) -> int:
+        """Linhas do diff que ficaram fora por truncamento"""
+        return self.total_lines - len(self.lines)
+
+    @property
+    def is_truncated(self) -> bool:
+        return self.omitted_lines > 0
+
+    @property
+    def has_diff(self) -> bool:
+        """Tem linhas para o LLM (arquivo sem mudança, ignorado ou com erro não tem)"""
+        return bool(self.lines)
+
+
+def _parse_hunks(diff_lines: Iterable[str]) -> list[DiffHunk]:
+    hunks = (DiffHunk.parse(line) for line in diff_lines if line.startswith("@@"))
+    return [hunk for hunk in hunks if hunk is not None]
@@ -2,7 +2,9 @@
 Model para informações da Pull Request
 """
 
-from pydantic import BaseModel, Field
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PullRequestInfo(BaseModel):
@@ -16,14 +18,49 @@ class PullRequestInfo(BaseModel):
     additions: int
     deletions: int
     changed_files_count: int
+    # Páginas de mudanças não lidas até o fim: a contagem é só um piso
+    changed_files_is_floor: bool = False
     labels: list[str] = Field(default_factory=list)
+    source_commit: str | None = None  # lastMergeSourceCommit: versão imutável da origem
+    target_commit: str | None = None  # lastMergeTargetCommit: versão imutável do destino
 
     @property
     def total_changes(self) -> int:
         """Total de linhas modificadas"""
         return self.additions + self.deletions
 
+    @property
+    def changed_files_label(self) -> str:
+        """Contagem de arquivos para exibição ("N+" quando é um piso)"""
+        return f"{self.changed_files_count}{'+' if self.changed_files_is_floor else ''}"
+
     @property
     def should_skip(self) -> bool:
         """Verificação rápida se deve pular (lógica completa no validator)"""
         return self.is_draft or "skip-review" in self.labels
+
+
+class PullRequestSnapshot(BaseModel):
+    """
+    Estado da PR lido no início do review, buscado de uma vez pelo VCS
+    Imutável: as demais etapas derivam cópias em vez de alterar o snapshot
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    pr_info: PullRequestInfo
+    iteration_id: int | None  # Última iteração (None = PR sem iterações)
+    last_reviewed_iteration: int | None = None  # Só preenchido no modo incremental
+    changes: tuple[Any, ...] = ()  # Primeira página de mudanças (estrutura do VCS)
+    next_skip: int = 0  # Onde continuar a paginação das mudanças (0 = sem mais páginas)
+    # Commit de origem da iteração revisada por último: base do diff incremental
+    compare_commit: str | None = None
+
+    @property
+    def already_reviewed(self) -> bool:
+        """Nada novo desde o último review incremental"""
+        return (
+            self.iteration_id is not None
+            and self.last_reviewed_iteration is not None
+            and self.last_reviewed_iteration >= self.iteration_id
+        )
@@ -3,30 +3,66 @@ Port (Interface) para serviços de geração de diff
 Define o contrato que qualquer diff adapter deve implementar
 """
 
-from typing import Protocol, TypedDict
+from collections.abc import Iterable, Iterator
+from typing import Any, NotRequired, Protocol, TypedDict
+
+from src.core.domain.file_diff import FileDiffChunk
 
 
 class FileChange(TypedDict):
     """Representa uma mudança em um arquivo"""
 
-    item: dict[str, str]
+    # path, objectId (blob novo), originalObjectId (blob base) e metadados opcionais
+    # (isFolder, gitObjectType, size, contentMetadata) usados para ignorar sem baixar
+    item: dict[str, Any]
     changeType: str
+    originalPath: NotRequired[str]  # Path anterior em renomeações
 
 
 class DiffPort(Protocol):
     """Interface para serviços de geração de diff"""
 
+    def iter_file_diffs(
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
+    ) -> Iterator[FileDiffChunk]:
+        """
+        Gera o diff arquivo por arquivo, na ordem de `files`, à medida que os downloads terminam
+        Mesmos argumentos de `generate_diff`; cada chunk já vem truncado e com as contagens
+
+        Yields:
+            FileDiffChunk de cada arquivo selecionado (ignorados pelos filtros não aparecem)
+        """
+        ...
+
     def generate_diff(
-        self, repo_id: str, files: list[FileChange], source_branch: str, target_branch: str
+        self,
+        repo_id: str,
+        files: Iterable[FileChange],
+        source_branch: str,
+        target_branch: str,
+        source_commit: str | None = None,
+        target_commit: str | None = None,
+        base_commit: str | None = None,
     ) -> tuple[str, int, int]:
         """
-        Gera diff unificado para review
+        Gera diff unificado para review (texto de `iter_file_diffs` concatenado)
 
         Args:
             repo_id: Identificador do repositório
-            files: Lista de arquivos modificados
+            files: Arquivos modificados (pode ser um iterador consumido sob demanda)
             source_branch: Branch de origem
             target_branch: Branch de destino
+            source_commit: Commit de origem (preferido à branch quando informado)
+            target_commit: Commit de destino; com os dois commits a base do diff é o merge base
+            base_commit: Base explícita no review incremental (origem da iteração comparada),
+                no lugar do merge base
 
         Returns:
             Tupla (diff_text, additions, deletions)
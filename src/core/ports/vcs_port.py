@@ -3,9 +3,10 @@ Port (Interface) para serviços de controle de versão (VCS)
 Define o contrato que qualquer VCS adapter deve implementar
 """
 
+from collections.abc import Iterator
 from typing import Any, Protocol
 
-from src.core.domain.pull_request import PullRequestInfo
+from src.core.domain.pull_request import PullRequestInfo, PullRequestSnapshot
 
 
 class VCSPort(Protocol):
@@ -24,19 +25,103 @@ class VCSPort(Protocol):
         """
         ...
 
-    def get_pr_files(self, repo_id: str, pr_id: int) -> list[Any]:
+    def get_latest_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """
+        Busca o identificador da última iteração (push) da PR
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+
+        Returns:
+            ID da iteração ou None se a PR não tiver iterações
+        """
+        ...
+
+    def iter_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+        skip: int = 0,
+    ) -> Iterator[Any]:
+        """
+        Itera sobre os arquivos modificados da PR, buscando as páginas sob demanda
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+            iteration_id: Iteração a consultar (padrão: a última)
+            compare_to: Se informado, só arquivos alterados desde esta iteração
+            skip: Posição inicial da paginação (continua um snapshot)
+
+        Returns:
+            Iterador de arquivos modificados (estrutura específica do VCS)
+        """
+        ...
+
+    def get_pr_files(
+        self,
+        repo_id: str,
+        pr_id: int,
+        iteration_id: int | None = None,
+        compare_to: int | None = None,
+    ) -> list[Any]:
         """
         Busca lista de arquivos modificados na PR
 
         Args:
             repo_id: Identificador do repositório
             pr_id: ID da Pull Request
+            iteration_id: Iteração a consultar (padrão: a última)
+            compare_to: Se informado, só arquivos alterados desde esta iteração
 
         Returns:
             Lista de arquivos modificados (estrutura específica do VCS)
         """
         ...
 
+    def fetch_pr_snapshot(
+        self, repo_id: str, pr_id: int, incremental: bool = False
+    ) -> PullRequestSnapshot:
+        """
+        Busca de uma vez, com requisições em paralelo, o estado inicial da PR
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+            incremental: Se True, inclui a última iteração revisada e compara com ela
+
+        Returns:
+            Snapshot com dados da PR, iterações e a primeira página de mudanças
+        """
+        ...
+
+    def get_last_reviewed_iteration(self, repo_id: str, pr_id: int) -> int | None:
+        """
+        Busca a última iteração já revisada pelo bot (modo incremental)
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+
+        Returns:
+            ID da iteração ou None se a PR nunca foi revisada
+        """
+        ...
+
+    def set_last_reviewed_iteration(self, repo_id: str, pr_id: int, iteration_id: int) -> None:
+        """
+        Registra a iteração revisada para que o próximo review seja incremental
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+            iteration_id: Iteração revisada
+        """
+        ...
+
     def post_comment(
         self, repo_id: str, pr_id: int, file_path: str, start_line: int, end_line: int, comment: str
     ) -> bool:
@@ -69,3 +154,18 @@ class VCSPort(Protocol):
             True se postado com sucesso
         """
         ...
+
+    def post_pr_comment(self, repo_id: str, pr_id: int, key: str, comment: str) -> bool:
+        """
+        Posta comentário geral da PR (não ancorado em arquivo)
+
+        Args:
+            repo_id: Identificador do repositório
+            pr_id: ID da Pull Request
+            key: Identifica a thread entre execuções (re-execuções atualizam a mesma thread)
+            comment: Texto do comentário (pode conter Markdown)
+
+        Returns:
+            True se postado com sucesso
+        """
+        ...
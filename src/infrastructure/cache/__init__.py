@@ -0,0 +1,6 @@
+"""Cache module - persistent caches"""
+
+from .blob_cache import BlobCache, CacheStats
+from .http_cache import CachedResponse, HttpValidatorCache
+
+__all__ = ["BlobCache", "CacheStats", "CachedResponse", "HttpValidatorCache"]
@@ -0,0 +1,120 @@
+"""
+Cache em disco endereçado por conteúdo (objectId do blob no Azure DevOps)
+"""
+
+import os
+import re
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+# objectIds são SHA-1 (ou SHA-256) em hexadecimal; qualquer outra coisa não é cacheada
+_OBJECT_ID_RE = re.compile(r"[0-9a-fA-F]{40,64}")
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso do cache durante a execução"""
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+
+class BlobCache:
+    """
+    Guarda o conteúdo dos blobs comprimido com zlib em `<directory>/<aa>/<objectId>.z`
+    Tamanho total limitado a `max_bytes`, com remoção dos menos usados (LRU por mtime)
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Reconstrói o índice LRU a partir dos arquivos existentes (mais antigo primeiro)"""
+        if not self.directory.exists():
+            return
+
+        found: list[tuple[float, str, int]] = []
+        for path in self.directory.glob("*/*.z"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.z"
+
+    @staticmethod
+    def is_cacheable(key: str | None) -> bool:
+        """Só objectIds hexadecimais viram chave (evita path traversal)"""
+        return key is not None and _OBJECT_ID_RE.fullmatch(key) is not None
+
+    def get(self, key: str | None) -> str | None:
+        """Retorna conteúdo do blob ou None; um hit renova a posição no LRU"""
+        if key is None or not self.is_cacheable(key):
+            return None
+
+        key = key.lower()
+        path = self._path(key)
+        try:
+            content = zlib.decompress(path.read_bytes()).decode("utf-8")
+            os.utime(path)
+        except (FileNotFoundError, zlib.error, UnicodeDecodeError):
+            self._forget(key)
+            self.stats.misses += 1
+            return None
+
+        if key not in self._entries:
+            self._entries[key] = path.stat().st_size
+            self._total_bytes += self._entries[key]
+        self._entries.move_to_end(key)
+
+        self.stats.hits += 1
+        self.stats.bytes_saved += len(content.encode("utf-8"))
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """Grava blob de forma atômica e aplica o limite de tamanho"""
+        key = key.lower()
+        data = zlib.compress(content.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        self._forget(key)
+        self._entries[key] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self) -> None:
+        """Remove os blobs menos usados até caber em `max_bytes`"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._path(key).unlink(missing_ok=True)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
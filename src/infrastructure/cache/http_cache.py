@@ -0,0 +1,115 @@
+"""
+Cache persistente de validadores HTTP (ETag) para GETs condicionais
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .blob_cache import CacheStats
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Última resposta 200 de um GET: ETag e corpo JSON"""
+
+    etag: str
+    body: Any
+
+
+class HttpValidatorCache:
+    """
+    Guarda ETag + corpo JSON por (url, params) em `<directory>/<aa>/<chave>.json`
+    O adapter envia If-None-Match e, num 304, reaproveita o corpo guardado
+    Limitado a `max_entries` respostas, com remoção das menos usadas (LRU por mtime)
+    Seguro entre threads (o snapshot da PR busca PR, iterações e mudanças em paralelo)
+    """
+
+    def __init__(self, directory: str | Path, max_entries: int = 2000):
+        self.directory = Path(directory).expanduser()
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Reconstrói o índice LRU a partir dos arquivos existentes (mais antigo primeiro)"""
+        if not self.directory.exists():
+            return
+
+        found: list[tuple[float, str]] = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                found.append((path.stat().st_mtime, path.stem))
+            except FileNotFoundError:
+                continue
+
+        for _, key in sorted(found):
+            self._entries[key] = None
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any] | None = None) -> str:
+        """Chave estável para a requisição (parâmetros em ordem canônica)"""
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, url: str, params: dict[str, Any] | None = None) -> CachedResponse | None:
+        """Retorna a última resposta guardada para a requisição, se houver"""
+        key = self.key(url, params)
+        with self._lock:
+            try:
+                data = json.loads(self._path(key).read_text(encoding="utf-8"))
+                return CachedResponse(etag=data["etag"], body=data["body"])
+            except (FileNotFoundError, ValueError, KeyError, TypeError):
+                self._entries.pop(key, None)
+                return None
+
+    def revalidated(self, url: str, params: dict[str, Any] | None, cached: CachedResponse) -> Any:
+        """Registra um 304: renova a entrada no LRU e devolve o corpo guardado"""
+        key = self.key(url, params)
+        size = len(json.dumps(cached.body).encode("utf-8"))
+        with self._lock:
+            try:
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                pass
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+
+            self.stats.hits += 1
+            self.stats.bytes_saved += size
+        return cached.body
+
+    def put(self, url: str, params: dict[str, Any] | None, etag: str, body: Any) -> None:
+        """Grava a resposta de forma atômica e aplica o limite de entradas"""
+        key = self.key(url, params)
+        data = json.dumps({"etag": etag, "body": body})
+        path = self._path(key)
+        with self._lock:
+            self.stats.misses += 1
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            os.replace(tmp_path, path)
+
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove as respostas menos usadas até caber em `max_entries` (com o lock)"""
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._path(key).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -2,6 +2,7 @@
 
 from .settings import (
     AzureDevOpsConfig,
+    CacheConfig,
     Config,
     LLMConfig,
     ReviewBehavior,
@@ -12,6 +13,7 @@ from .settings import (
 __all__ = [
     "Config",
     "AzureDevOpsConfig",
+    "CacheConfig",
     "LLMConfig",
     "ReviewLimits",
     "ReviewBehavior",
@@ -3,8 +3,10 @@ Configurações centralizadas usando Pydantic Settings
 """
 
 import os
+from pathlib import Path
+from typing import Literal
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,15 +15,42 @@ class AzureDevOpsConfig(BaseSettings):
 
     model_config = SettingsConfigDict(env_prefix="AZDO_", case_sensitive=False)
 
+    base_url: str = Field(default="https://dev.azure.com")  # Ex: servidor fake local
     org: str = Field(default="finnetbrasil")
     project: str = Field(default="")
     pat: str = Field(default="")
     api_version: str = Field(default="7.0")
+    async_client: bool = Field(default=False)  # Cliente assíncrono com pool compartilhado
+    max_connections: int = Field(default=10)  # Tamanho do pool do cliente assíncrono
+    changes_page_size: int = Field(default=100)  # $top das páginas de changeEntries (máx 2000)
+    # Agendador opcional (0 = desligado): o Azure DevOps limita por custo (TSTU), não por
+    # requisições/s, e avisa com Retry-After/X-RateLimit-*; sem agendador, 429 é repetido
+    # respeitando o Retry-After. Vale ligar quando vários processos dividem o mesmo token
+    rate_limit_per_second: float = Field(default=0.0)  # Requisições/s à API
+    rate_limit_burst: int = Field(default=20)  # Rajada permitida antes de aplicar o ritmo
 
     def get_token(self) -> str:
         """Prioriza SYSTEM_ACCESSTOKEN (pipeline), fallback para PAT"""
         return os.getenv("SYSTEM_ACCESSTOKEN") or self.pat
 
+    def project_url(self) -> str:
+        """URL do projeto (org/projeto) no servidor configurado"""
+        return f"{self.base_url.rstrip('/')}/{self.org}/{self.project}"
+
+
+class HttpConfig(BaseSettings):
+    """Transporte HTTP compartilhado pelos clientes do Azure DevOps"""
+
+    model_config = SettingsConfigDict(env_prefix="AZDO_HTTP_", case_sensitive=False)
+
+    pool_size: int = Field(default=16)  # Conexões mantidas por host (keep-alive)
+    max_retries: int = Field(default=3)  # Tentativas em 5xx (e 429 sem agendador)
+    backoff_factor: float = Field(default=1.0)  # Espera exponencial entre tentativas
+    connect_timeout: float = Field(default=10.0)  # Segundos para abrir a conexão
+    timeout: float = Field(default=30.0)  # Leitura das chamadas comuns da API
+    bulk_timeout: float = Field(default=300.0)  # Leitura de downloads em lote (zip)
+    gzip: bool = Field(default=True)  # Pede respostas comprimidas (Accept-Encoding)
+
 
 class LLMConfig(BaseSettings):
     """Configurações do LLM"""
@@ -48,6 +77,26 @@ class ReviewLimits(BaseSettings):
     max_pr_size_lines: int = Field(default=2000)
     max_diff_lines_per_file: int = Field(default=400)
     max_comment_length: int = Field(default=150000)
+    fetch_concurrency: int = Field(default=8)  # Downloads simultâneos de arquivos no diff
+    batch_chunk_size: int = Field(default=100)  # Itens por requisição no modo batch
+    post_concurrency: int = Field(default=4)  # Comentários postados simultaneamente
+    # Arquivos para trocar p/ archive (0 = off); até max_files_to_analyze, que é o que é lido
+    archive_threshold_files: int = Field(default=0)
+    # Zip do modo archive maior que isso volta ao download por arquivo (0 = off)
+    max_archive_bytes: int = Field(default=50_000_000)
+    # Arquivo maior fica fora do diff: pelo size do itemsbatch ou no download (0 = off)
+    max_file_bytes: int = Field(default=1_000_000)
+    diff_large_file_lines: int = Field(default=2000)  # A partir daqui usa o histogram (0 = off)
+
+    @model_validator(mode="after")
+    def _check_archive_threshold(self) -> "ReviewLimits":
+        """Limiar acima de max_files_to_analyze nunca seria atingido"""
+        if self.archive_threshold_files > self.max_files_to_analyze:
+            raise ValueError(
+                f"archive_threshold_files ({self.archive_threshold_files}) maior que "
+                f"max_files_to_analyze ({self.max_files_to_analyze})"
+            )
+        return self
 
 
 class ReviewBehavior(BaseSettings):
@@ -59,6 +108,25 @@ class ReviewBehavior(BaseSettings):
     skip_label: str = Field(default="skip-review")
     context_lines: int = Field(default=6)
     post_summary_comment: bool = Field(default=True)
+    incremental: bool = Field(default=False)  # Revisa só o que mudou desde o último review
+    # Download de conteúdo: "per_file" (GET por versão), "batch" (itemsbatch + blobs zip)
+    # ou "archive" (zip da árvore em cada commit, extraindo só os arquivos alterados)
+    fetch_mode: Literal["per_file", "batch", "archive"] = Field(default="per_file")
+    # Consulta o itemsbatch (um POST por REVIEW_BATCH_CHUNK_SIZE arquivos) antes de baixar:
+    # binários e arquivos grandes são ignorados pelos metadados, sem GET de conteúdo
+    metadata_prefetch: bool = Field(default=True)
+    # Postagem: "per_file" (thread por arquivo), "single" (uma thread geral com tudo)
+    # ou "per_directory" (uma thread geral por diretório)
+    post_mode: Literal["per_file", "single", "per_directory"] = Field(default="per_file")
+    # Algoritmo de diff: "auto" (difflib até REVIEW_DIFF_LARGE_FILE_LINES, histogram acima),
+    # "difflib", "histogram" ou "accelerated" (requer o pacote opcional cydifflib)
+    diff_engine: Literal["auto", "difflib", "histogram", "accelerated"] = Field(default="auto")
+    # Arquivos gerados/vendorizados ficam fora do diff: .gitattributes (linguist-generated,
+    # linguist-vendored), marcador no cabeçalho e heurísticas de conteúdo (0 = off)
+    skip_generated: bool = Field(default=True)
+    generated_header_bytes: int = Field(default=2048)
+    generated_max_line_length: int = Field(default=300)  # Média de caracteres por linha
+    generated_max_entropy: float = Field(default=5.8)  # Bits por caractere (linhas ASCII)
 
     ignored_extensions: list[str] = Field(
         default=[
@@ -90,13 +158,51 @@ class ReviewBehavior(BaseSettings):
     )
 
 
+class CacheConfig(BaseSettings):
+    """Caches locais persistidos entre execuções"""
+
+    model_config = SettingsConfigDict(env_prefix="REVIEW_CACHE_", case_sensitive=False)
+
+    enabled: bool = Field(default=True)
+    dir: str = Field(default="~/.cache/code-review-bot")
+    max_size_mb: int = Field(default=512)  # Limite do cache de blobs (LRU)
+    http_max_entries: int = Field(default=2000)  # Respostas com ETag guardadas (LRU)
+
+
+class GitConfig(BaseSettings):
+    """Repositório git local usado para gerar o diff sem baixar arquivos"""
+
+    model_config = SettingsConfigDict(env_prefix="REVIEW_GIT_", case_sensitive=False)
+
+    enabled: bool = Field(default=True)  # Usa o checkout local quando disponível
+    repo_path: str = Field(default="")  # Vazio = BUILD_SOURCESDIRECTORY (checkout do pipeline)
+    executable: str = Field(default="git")
+    mirror_enabled: bool = Field(default=False)  # Mirrors bare sem checkout (daemon/lote)
+    mirror_dir: str = Field(default="")  # Vazio = <REVIEW_CACHE_DIR>/mirrors
+
+    def get_repo_path(self) -> str | None:
+        """Prioriza o caminho configurado, fallback para o checkout do pipeline"""
+        if not self.enabled:
+            return None
+        return self.repo_path or os.getenv("BUILD_SOURCESDIRECTORY") or None
+
+    def get_mirror_dir(self, cache_dir: str) -> Path | None:
+        """Diretório dos mirrors bare (None se desabilitados)"""
+        if not (self.enabled and self.mirror_enabled):
+            return None
+        return Path(self.mirror_dir or Path(cache_dir) / "mirrors").expanduser()
+
+
 class Config(BaseSettings):
     """Configuração principal - agrega todas as configs"""
 
     azure: AzureDevOpsConfig = Field(default_factory=AzureDevOpsConfig)
-    llm: LLMConfig = Field(default_factory=LLMConfig) # pyright: ignore[reportUnknownVariableType, reportArgumentType]
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    llm: LLMConfig = Field(default_factory=LLMConfig)  # pyright: ignore[reportUnknownVariableType, reportArgumentType]
     limits: ReviewLimits = Field(default_factory=ReviewLimits)
     behavior: ReviewBehavior = Field(default_factory=ReviewBehavior)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    git: GitConfig = Field(default_factory=GitConfig)
 
 
 def load_config() -> Config:
@@ -0,0 +1,24 @@
+"""Diff module - algoritmos de diff plugáveis"""
+
+from .engines import (
+    ACCELERATED_AVAILABLE,
+    DiffEngine,
+    DiffEngineSelector,
+    DifflibEngine,
+    EngineName,
+    HistogramEngine,
+    available_engines,
+)
+from .generated import GeneratedFileDetector, GitAttributes
+
+__all__ = [
+    "ACCELERATED_AVAILABLE",
+    "DiffEngine",
+    "DiffEngineSelector",
+    "DifflibEngine",
+    "EngineName",
+    "GeneratedFileDetector",
+    "GitAttributes",
+    "HistogramEngine",
+    "available_engines",
+]
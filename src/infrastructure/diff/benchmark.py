@@ -0,0 +1,151 @@
+"""
+Benchmark dos algoritmos de diff em um corpus fixo (gerado com semente)
+Compara tempo e qualidade dos hunks: menos hunks e menos linhas +/- = diff mais enxuto
+"""
+
+import random
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .engines import DiffEngine, available_engines
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Par de versões de um arquivo do corpus"""
+
+    name: str
+    base: list[str]
+    source: list[str]
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    case: str
+    engine: str
+    lines: int  # Linhas da maior versão
+    seconds: float  # Melhor tempo entre as repetições
+    hunks: int
+    changed_lines: int  # Linhas + e - do diff
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else float("inf")
+
+
+def _sql_dump(rng: random.Random, rows: int) -> BenchmarkCase:
+    """Dump SQL: milhares de INSERTs quase iguais, com linhas alteradas e inseridas"""
+    base = [
+        f"INSERT INTO pagamentos VALUES ({i}, 'cliente_{i % 500}', {i % 97}.00, 'ok');\n"
+        for i in range(rows)
+    ]
+    source = list(base)
+    for _ in range(rows // 100):
+        index = rng.randrange(len(source))
+        source[index] = source[index].replace("'ok'", "'estornado'")
+    for _ in range(rows // 200):
+        index = rng.randrange(len(source))
+        source.insert(index, f"INSERT INTO pagamentos VALUES ({rows + index}, 'novo', 0, 'ok');\n")
+    return BenchmarkCase("sql_dump", base, source)
+
+
+def _generated_config(rng: random.Random, blocks: int) -> BenchmarkCase:
+    """Config gerada: blocos repetitivos (muitas linhas idênticas) reordenados"""
+    block = ["  enabled: true\n", "  retries: 3\n", "  timeout: 30\n", "  tags: []\n"]
+    sections = [[f"service_{i}:\n", *block] for i in range(blocks)]
+    base = [line for section in sections for line in section]
+    shuffled = list(sections)
+    for _ in range(blocks // 20):
+        first, second = rng.randrange(blocks), rng.randrange(blocks)
+        shuffled[first], shuffled[second] = shuffled[second], shuffled[first]
+    source = [line for section in shuffled for line in section]
+    return BenchmarkCase("generated_config", base, source)
+
+
+def _php_class(rng: random.Random, methods: int) -> BenchmarkCase:
+    """Classe PHP grande: um método movido de lugar e alguns corpos editados"""
+    bodies = [
+        [
+            f"    public function metodo{i}($valor)\n",
+            "    {\n",
+            "        if ($valor === null) {\n",
+            "            return null;\n",
+            "        }\n",
+            f"        $resultado = $this->calcular($valor, {i});\n",
+            "        return $resultado;\n",
+            "    }\n",
+            "\n",
+        ]
+        for i in range(methods)
+    ]
+    header, footer = ["<?php\n", "class Servico\n", "{\n"], ["}\n"]
+    base = [*header, *(line for body in bodies for line in body), *footer]
+    moved = list(bodies)
+    moved.insert(rng.randrange(methods), moved.pop(rng.randrange(methods)))
+    for _ in range(methods // 10):
+        index = rng.randrange(methods)
+        body = list(moved[index])
+        body[5] = body[5].replace("calcular", "calcularComTaxa")
+        moved[index] = body
+    source = [*header, *(line for body in moved for line in body), *footer]
+    return BenchmarkCase("php_class", base, source)
+
+
+def _small_edit(rng: random.Random, lines: int) -> BenchmarkCase:
+    """Arquivo comum com poucas edições (caso mais frequente nas PRs)"""
+    base = [f"linha {i}: {rng.random():.6f}\n" for i in range(lines)]
+    source = list(base)
+    for _ in range(3):
+        source[rng.randrange(lines)] = "linha editada\n"
+    return BenchmarkCase("small_edit", base, source)
+
+
+def build_corpus(seed: int = 0, scale: float = 1.0) -> list[BenchmarkCase]:
+    """Corpus fixo: a mesma semente e escala geram sempre os mesmos arquivos"""
+    rng = random.Random(seed)
+    return [
+        _small_edit(rng, max(10, int(300 * scale))),
+        _php_class(rng, max(10, int(400 * scale))),
+        _generated_config(rng, max(20, int(2000 * scale))),
+        _sql_dump(rng, max(200, int(20000 * scale))),
+    ]
+
+
+def _hunk_stats(diff: list[str]) -> tuple[int, int]:
+    hunks = sum(1 for line in diff if line.startswith("@@"))
+    changed = sum(1 for line in diff if line[:1] in "+-" and not line.startswith(("+++ ", "--- ")))
+    return hunks, changed
+
+
+def run_benchmark(
+    cases: Iterable[BenchmarkCase],
+    engines: dict[str, DiffEngine] | None = None,
+    repeat: int = 3,
+) -> list[BenchmarkResult]:
+    """Roda cada algoritmo em cada caso `repeat` vezes e guarda o melhor tempo"""
+    engines = engines or available_engines()
+    results: list[BenchmarkResult] = []
+    for case in cases:
+        for name, engine in engines.items():
+            best = float("inf")
+            diff: list[str] = []
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                diff = engine.unified_diff(case.base, case.source, "a/file", "b/file")
+                best = min(best, time.perf_counter() - started)
+            hunks, changed = _hunk_stats(diff)
+            lines = max(len(case.base), len(case.source))
+            results.append(BenchmarkResult(case.name, name, lines, best, hunks, changed))
+    return results
+
+
+def format_results(results: list[BenchmarkResult]) -> str:
+    """Tabela de texto com tempo e qualidade por caso/algoritmo"""
+    header = f"{'caso':<18}{'algoritmo':<13}{'linhas':>8}{'ms':>10}{'hunks':>8}{'+/-':>8}"
+    rows = [
+        f"{r.case:<18}{r.engine:<13}{r.lines:>8}{r.seconds * 1000:>10.1f}"
+        f"{r.hunks:>8}{r.changed_lines:>8}"
+        for r in results
+    ]
+    return "\n".join([header, "-" * len(header), *rows])
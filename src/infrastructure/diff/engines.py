@@ -0,0 +1,269 @@
+"""
+Algoritmos de diff plugáveis, escolhidos por arquivo conforme o tamanho
+- difflib: SequenceMatcher da stdlib (padrão, saída de referência)
+- histogram: variante do patience diff usada pelo git; ancora nas linhas raras,
+  então arquivos grandes com muitas linhas parecidas (dumps SQL, configs geradas) não degradam
+- accelerated: difflib compilado (pacote opcional `cydifflib`), mesma saída mais rápida
+"""
+
+import difflib
+import importlib
+import importlib.util
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal, Protocol
+
+# Nome de um algoritmo ("auto" escolhe pelo tamanho do arquivo)
+EngineName = Literal["auto", "difflib", "histogram", "accelerated"]
+
+# Bloco em comum entre as versões: (início em a, início em b, tamanho), como no difflib
+Block = tuple[int, int, int]
+
+# Operação de edição: (tag, i1, i2, j1, j2), como SequenceMatcher.get_opcodes
+Opcode = tuple[str, int, int, int, int]
+
+# `cydifflib` é opcional; sem ele "accelerated" usa o difflib da stdlib
+ACCELERATED_AVAILABLE = importlib.util.find_spec("cydifflib") is not None
+
+# Linhas que aparecem mais vezes que isso não servem de âncora no histogram (como no git)
+HISTOGRAM_MAX_CHAIN = 64
+
+
+class DiffEngine(Protocol):
+    """Gera o diff unificado entre duas versões (linhas com o terminador)"""
+
+    name: str
+
+    def unified_diff(
+        self, a: Sequence[str], b: Sequence[str], fromfile: str, tofile: str, n: int = 3
+    ) -> list[str]: ...
+
+
+class DifflibEngine:
+    """difflib.unified_diff da stdlib"""
+
+    name = "difflib"
+
+    def unified_diff(
+        self, a: Sequence[str], b: Sequence[str], fromfile: str, tofile: str, n: int = 3
+    ) -> list[str]:
+        return list(difflib.unified_diff(a, b, fromfile=fromfile, tofile=tofile, n=n, lineterm=""))
+
+
+class AcceleratedEngine:
+    """Mesma API e saída do difflib, em código compilado (`cydifflib`)"""
+
+    name = "accelerated"
+
+    def __init__(self) -> None:
+        self._module: Any = importlib.import_module("cydifflib")
+
+    def unified_diff(
+        self, a: Sequence[str], b: Sequence[str], fromfile: str, tofile: str, n: int = 3
+    ) -> list[str]:
+        return list(
+            self._module.unified_diff(a, b, fromfile=fromfile, tofile=tofile, n=n, lineterm="")
+        )
+
+
+def histogram_blocks(
+    a: Sequence[str], b: Sequence[str], max_chain: int = HISTOGRAM_MAX_CHAIN
+) -> list[Block]:
+    """
+    Blocos em comum pelo histogram diff: em cada região, o trecho em comum ancorado na
+    linha com menos ocorrências vira match, e as regiões à esquerda e à direita são
+    processadas do mesmo jeito (pilha explícita, sem recursão)
+    Retorna os blocos ordenados, terminando no sentinela (len(a), len(b), 0)
+    """
+    blocks: list[Block] = []
+    regions = [(0, len(a), 0, len(b))]
+
+    while regions:
+        a_lo, a_hi, b_lo, b_hi = regions.pop()
+
+        # Prefixo e sufixo iguais são match direto (caso comum em edições pontuais)
+        start = 0
+        while a_lo + start < a_hi and b_lo + start < b_hi and a[a_lo + start] == b[b_lo + start]:
+            start += 1
+        if start:
+            blocks.append((a_lo, b_lo, start))
+            a_lo, b_lo = a_lo + start, b_lo + start
+        end = 0
+        while a_hi - end > a_lo and b_hi - end > b_lo and a[a_hi - end - 1] == b[b_hi - end - 1]:
+            end += 1
+        if end:
+            blocks.append((a_hi - end, b_hi - end, end))
+            a_hi, b_hi = a_hi - end, b_hi - end
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        positions: dict[str, list[int]] = {}
+        for i in range(a_lo, a_hi):
+            positions.setdefault(a[i], []).append(i)
+
+        # Melhor âncora: menos ocorrências em `a`, desempate pelo trecho mais longo
+        best: tuple[int, int, int, int] | None = None  # (ocorrências, -tamanho, i, j)
+        j = b_lo
+        while j < b_hi:
+            occurrences = positions.get(b[j])
+            if not occurrences or len(occurrences) > max_chain:
+                j += 1
+                continue
+            next_j = j + 1
+            for i in occurrences:
+                si, sj = i, j
+                while si > a_lo and sj > b_lo and a[si - 1] == b[sj - 1]:
+                    si, sj = si - 1, sj - 1
+                ei, ej = i + 1, j + 1
+                while ei < a_hi and ej < b_hi and a[ei] == b[ej]:
+                    ei, ej = ei + 1, ej + 1
+                candidate = (len(occurrences), si - ei, si, sj)
+                if best is None or candidate < best:
+                    best = candidate
+                next_j = max(next_j, ej)
+            j = next_j
+
+        if best is None:
+            continue  # Nada em comum com poucas ocorrências: a região inteira é substituída
+        _, negative_size, si, sj = best
+        size = -negative_size
+        blocks.append((si, sj, size))
+        regions.append((a_lo, si, b_lo, sj))
+        regions.append((si + size, a_hi, sj + size, b_hi))
+
+    # Blocos adjacentes viram um só, como em SequenceMatcher.get_matching_blocks
+    merged: list[Block] = []
+    for i, j, size in sorted(blocks):
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+def blocks_to_opcodes(blocks: list[Block]) -> list[Opcode]:
+    """Converte blocos em comum em opcodes (mesma regra de SequenceMatcher.get_opcodes)"""
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for ai, bj, size in blocks:
+        tag = ""
+        if i < ai and j < bj:
+            tag = "replace"
+        elif i < ai:
+            tag = "delete"
+        elif j < bj:
+            tag = "insert"
+        if tag:
+            opcodes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(("equal", ai, i, bj, j))
+    return opcodes
+
+
+def group_opcodes(opcodes: list[Opcode], n: int = 3) -> Iterator[list[Opcode]]:
+    """Agrupa opcodes em hunks com `n` linhas de contexto (SequenceMatcher.get_grouped_opcodes)"""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        _, i1, i2, j1, j2 = codes[0]
+        codes[0] = ("equal", max(i1, i2 - n), i2, max(j1, j2 - n), j2)
+    if codes[-1][0] == "equal":
+        _, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = ("equal", i1, min(i2, i1 + n), j1, min(j2, j1 + n))
+
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        # Trecho igual longo fecha o hunk atual e abre o próximo
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Intervalo do cabeçalho @@ no formato unificado (igual ao difflib)"""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def format_unified(
+    a: Sequence[str],
+    b: Sequence[str],
+    opcodes: list[Opcode],
+    fromfile: str,
+    tofile: str,
+    n: int = 3,
+) -> list[str]:
+    """Diff unificado a partir de opcodes, no mesmo formato do difflib (lineterm="")"""
+    lines: list[str] = []
+    for group in group_opcodes(opcodes, n):
+        if not lines:
+            lines += [f"--- {fromfile}", f"+++ {tofile}"]
+        first, last = group[0], group[-1]
+        old_range = _format_range(first[1], last[2])
+        new_range = _format_range(first[3], last[4])
+        lines.append(f"@@ -{old_range} +{new_range} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines += [f" {line}" for line in a[i1:i2]]
+                continue
+            if tag in ("replace", "delete"):
+                lines += [f"-{line}" for line in a[i1:i2]]
+            if tag in ("replace", "insert"):
+                lines += [f"+{line}" for line in b[j1:j2]]
+    return lines
+
+
+class HistogramEngine:
+    """Histogram diff (estilo `git diff --histogram`), linear na prática em arquivos grandes"""
+
+    name = "histogram"
+
+    def __init__(self, max_chain: int = HISTOGRAM_MAX_CHAIN):
+        self.max_chain = max_chain
+
+    def unified_diff(
+        self, a: Sequence[str], b: Sequence[str], fromfile: str, tofile: str, n: int = 3
+    ) -> list[str]:
+        opcodes = blocks_to_opcodes(histogram_blocks(a, b, self.max_chain))
+        return format_unified(a, b, opcodes, fromfile, tofile, n)
+
+
+def available_engines() -> dict[str, DiffEngine]:
+    """Algoritmos utilizáveis neste ambiente, por nome"""
+    engines: dict[str, DiffEngine] = {
+        "difflib": DifflibEngine(),
+        "histogram": HistogramEngine(),
+    }
+    if ACCELERATED_AVAILABLE:
+        engines["accelerated"] = AcceleratedEngine()
+    return engines
+
+
+class DiffEngineSelector:
+    """
+    Escolhe o algoritmo de cada arquivo
+    "auto": até `large_file_lines` linhas usa o difflib (compilado, se instalado);
+    acima disso, o histogram. Nome fixo indisponível cai para o difflib
+    """
+
+    def __init__(self, preference: EngineName = "auto", large_file_lines: int = 2000):
+        self.preference = preference
+        self.large_file_lines = large_file_lines
+        self.engines = available_engines()
+
+    def select(self, line_count: int) -> DiffEngine:
+        if self.preference != "auto":
+            return self.engines.get(self.preference, self.engines["difflib"])
+        if self.large_file_lines > 0 and line_count >= self.large_file_lines:
+            return self.engines["histogram"]
+        return self.engines.get("accelerated", self.engines["difflib"])
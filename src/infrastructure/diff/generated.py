@@ -0,0 +1,202 @@
+"""
+Detecção de arquivos gerados e vendorizados, que não valem o custo de review
+- .gitattributes do repositório: linguist-generated / linguist-vendored (como no GitHub)
+- Cabeçalho de gerador no comentário inicial (protoc, sqlc, .NET, snapshots do Jest...)
+- Heurísticas de conteúdo: linhas muito longas (bundles minificados) e entropia alta
+  nas linhas ASCII (dados embutidos, base64)
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# Atributos do linguist e o motivo exibido no diff
+LINGUIST_ATTRIBUTES = {
+    "linguist-generated": "gerado (linguist-generated)",
+    "linguist-vendored": "vendorizado (linguist-vendored)",
+}
+
+# Cabeçalhos deixados por geradores de código, procurados linha a linha só no bloco de
+# comentário do início do arquivo (sem diferenciar maiúsculas):
+# - "Code generated ... DO NOT EDIT." (Go, sqlc) e "Generated by ... DO NOT EDIT!" (protoc)
+# - A tag "@generated" (Meta, Relay) e o "<auto-generated>" do .NET
+# - "Jest Snapshot v1" dos snapshots do Jest
+# Menções soltas ("do not modify", "generated by the invoice module") não contam
+GENERATED_MARKERS = re.compile(
+    r"@generated\b"
+    r"|<auto-generated\b"
+    r"|\b(?:code )?generated\b.*\bdo not edit\b"
+    r"|^jest snapshot v\d",
+    re.IGNORECASE,
+)
+
+# Preâmbulos que podem vir antes do comentário de cabeçalho (abertura do PHP, declaração
+# XML, DOCTYPE); são removidos do começo da linha antes de procurar o comentário
+PREAMBLE = re.compile(r"^(?:<\?php\b|<\?xml\b.*?\?>|<!doctype\b[^>]*>)\s*", re.IGNORECASE)
+
+# Comentários de linha e de bloco (abertura, fechamento) reconhecidos no cabeçalho
+LINE_COMMENTS = ("#", "//", "--", ";")
+BLOCK_COMMENTS = (("/*", "*/"), ("<!--", "-->"), ('"""', '"""'), ("'''", "'''"))
+
+# Tamanho máximo do trecho do cabeçalho exibido no motivo
+MARKER_REASON_CHARS = 60
+
+# Conteúdo menor que isso não passa pelas heurísticas (amostra pequena demais)
+HEURISTIC_MIN_CHARS = 1024
+
+# Caracteres analisados no cálculo da entropia
+ENTROPY_SAMPLE_CHARS = 64 * 1024
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern[str]:
+    """
+    Converte um padrão do .gitattributes (mesma sintaxe do .gitignore) em regex
+    Sem "/" o padrão vale para o nome em qualquer pasta; com "/" é relativo à raiz
+    """
+    anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.strip("/")
+    parts: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 1)) > i:
+            parts.append("[" + pattern[i + 1 : end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(f"{prefix}{''.join(parts)}")
+
+
+@dataclass(frozen=True)
+class GitAttributes:
+    """Regras do .gitattributes que mexem nos atributos do linguist, na ordem do arquivo"""
+
+    rules: tuple[tuple[re.Pattern[str], dict[str, bool]], ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> "GitAttributes":
+        """
+        Lê `padrão attr attr=true -attr attr=false !attr`; linhas sem atributos do
+        linguist são descartadas
+        """
+        rules: list[tuple[re.Pattern[str], dict[str, bool]]] = []
+        for line in text.splitlines():
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            values: dict[str, bool] = {}
+            for attribute in fields[1:]:
+                name, _, value = attribute.lstrip("-!").partition("=")
+                if name in LINGUIST_ATTRIBUTES:
+                    enabled = not attribute.startswith(("-", "!"))
+                    values[name] = enabled and value.lower() not in ("false", "0")
+            if values:
+                rules.append((_glob_to_regex(fields[0]), values))
+        return cls(tuple(rules))
+
+    def linguist_reason(self, path: str) -> str | None:
+        """Motivo para ignorar `path` (a última regra que casa vence), ou None"""
+        relative = path.lstrip("/")
+        values: dict[str, bool] = {}
+        for pattern, rule in self.rules:
+            if pattern.fullmatch(relative):
+                values.update(rule)
+        for name, reason in LINGUIST_ATTRIBUTES.items():
+            if values.get(name):
+                return reason
+        return None
+
+
+def leading_comment(text: str) -> Iterator[str]:
+    """
+    Linhas do bloco de comentário no início do arquivo, já sem os marcadores de
+    comentário; termina na primeira linha de código (linhas em branco, shebang e
+    preâmbulos como `<?php` e `<?xml ...?>` são pulados)
+    """
+    closing: str | None = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if closing is not None:
+            body, found, _ = stripped.partition(closing)
+            if found:
+                closing = None
+            yield body.lstrip("*").strip()
+            continue
+        stripped = PREAMBLE.sub("", stripped, count=1)
+        if not stripped:
+            continue
+        for opening, end in BLOCK_COMMENTS:
+            if stripped.startswith(opening):
+                body, found, _ = stripped[len(opening) :].partition(end)
+                if not found:
+                    closing = end
+                yield body.lstrip("*").strip()
+                break
+        else:
+            if not stripped.startswith(LINE_COMMENTS):
+                return
+            yield stripped.lstrip("#/-;!").strip()
+
+
+def ascii_lines(text: str) -> str:
+    """
+    Só as linhas ASCII do texto: dados embutidos (base64, hex) são ASCII, e linhas com
+    texto em outros alfabetos (recursos de i18n em CJK, traduções) ficam fora da entropia
+    """
+    return "".join(line for line in text.splitlines(keepends=True) if line.isascii())
+
+
+def shannon_entropy(text: str) -> float:
+    """Entropia de Shannon em bits por caractere"""
+    if not text:
+        return 0.0
+    total = len(text)
+    return -sum(count / total * math.log2(count / total) for count in Counter(text).values())
+
+
+@dataclass
+class GeneratedFileDetector:
+    """
+    Decide pelo conteúdo se um arquivo é gerado; retorna o motivo exibido no diff
+    `max_average_line_length` e `max_entropy` em 0 desligam a heurística correspondente
+    """
+
+    header_bytes: int = 2048  # Início do arquivo onde o marcador é procurado
+    max_average_line_length: int = 300
+    max_entropy: float = 5.8
+
+    def detect(self, text: str) -> str | None:
+        for line in leading_comment(text[: self.header_bytes]):
+            if GENERATED_MARKERS.search(line):
+                return f'gerado (cabeçalho "{line[:MARKER_REASON_CHARS]}")'
+
+        if len(text) < HEURISTIC_MIN_CHARS:
+            return None
+
+        if self.max_average_line_length:
+            average = len(text) / max(1, text.count("\n"))
+            if average > self.max_average_line_length:
+                return f"gerado (linhas com média de {average:.0f} caracteres)"
+
+        if self.max_entropy:
+            sample = ascii_lines(text[:ENTROPY_SAMPLE_CHARS])
+            entropy = shannon_entropy(sample) if len(sample) >= HEURISTIC_MIN_CHARS else 0.0
+            if entropy > self.max_entropy:
+                return f"gerado (entropia de {entropy:.1f} bits por caractere)"
+
+        return None
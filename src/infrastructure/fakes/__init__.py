@@ -0,0 +1,15 @@
+"""Fakes module - substitutos locais de serviços externos (testes e benchmarks)"""
+
+from .azure_devops_server import (
+    FakeAzureDevOpsServer,
+    FakeServerConfig,
+    FakeServerStats,
+    SyntheticRepository,
+)
+
+__all__ = [
+    "FakeAzureDevOpsServer",
+    "FakeServerConfig",
+    "FakeServerStats",
+    "SyntheticRepository",
+]
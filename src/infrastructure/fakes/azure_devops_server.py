@@ -0,0 +1,597 @@
+"""
+Servidor REST local que imita o Azure DevOps (PR, iterações, mudanças, items, threads e lote)
+Repositórios sintéticos e determinísticos, com latência, throttling (429 + Retry-After)
+e paginação configuráveis: benchmarks de concorrência, cache e rate limit sem rede
+"""
+
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import zipfile
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+# Commits sintéticos: o que a PR altera, o topo do destino (que avançou) e o merge base
+BASE_COMMIT = "base"
+TARGET_COMMIT = "target"
+SOURCE_COMMIT = "source"
+
+
+def git_object_id(content: bytes) -> str:
+    """objectId de um blob, calculado como o git (sha1 de "blob <tamanho>\\0<conteúdo>")"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _commit_id(repo_id: str, name: str) -> str:
+    return hashlib.sha1(f"{repo_id}:{name}".encode()).hexdigest()
+
+
+def _synthetic_lines(rng: random.Random, count: int) -> list[str]:
+    return [
+        f"    value_{rng.randrange(10_000)} = compute({rng.randrange(100)}, {rng.random():.4f})\n"
+        for _ in range(count)
+    ]
+
+
+@dataclass
+class SyntheticRepository:
+    """
+    Repositório com três árvores: merge base, topo do destino e origem da PR
+    O destino avança depois do fork, então diffs contra o topo dele ficam inflados
+    """
+
+    repo_id: str
+    trees: dict[str, dict[str, bytes]]  # commit -> {path: conteúdo}
+    changes: list[dict[str, Any]]  # changeEntries da PR (estrutura da API)
+    pr_id: int = 1
+    source_branch: str = "feature"
+    target_branch: str = "main"
+
+    @classmethod
+    def generate(
+        cls,
+        repo_id: str,
+        files: int = 50,
+        lines: int = 200,
+        seed: int = 0,
+        binary_files: int = 0,
+        pr_id: int = 1,
+    ) -> "SyntheticRepository":
+        """
+        Gera `files` arquivos alterados (edições, adições, remoções e renomeações)
+        de ~`lines` linhas; a mesma semente gera sempre o mesmo repositório
+        """
+        rng = random.Random(f"{repo_id}:{seed}")
+        base: dict[str, bytes] = {}
+        source: dict[str, bytes] = {}
+        changes: list[dict[str, Any]] = []
+
+        for index in range(files):
+            path = f"/src/pkg_{index % 10}/module_{index}.py"
+            content = _synthetic_lines(rng, max(1, lines + rng.randint(-lines // 4, lines // 4)))
+            kind = rng.choices(["edit", "add", "delete", "rename"], weights=[70, 15, 10, 5])[0]
+
+            edited = list(content)
+            for _ in range(max(1, len(edited) // 20)):
+                position = rng.randrange(len(edited))
+                if rng.random() < 0.5:
+                    edited[position] = _synthetic_lines(rng, 1)[0]
+                else:
+                    edited.insert(position, _synthetic_lines(rng, 1)[0])
+
+            entry: dict[str, Any] = {"changeType": kind, "item": {"path": path}}
+            if kind == "edit":
+                base[path], source[path] = "".join(content).encode(), "".join(edited).encode()
+            elif kind == "add":
+                source[path] = "".join(edited).encode()
+            elif kind == "delete":
+                base[path] = "".join(content).encode()
+            else:
+                original = path.replace("module_", "old_module_")
+                base[original], source[path] = "".join(content).encode(), "".join(edited).encode()
+                entry["originalPath"] = original
+            changes.append(entry)
+
+        for index in range(binary_files):
+            path = f"/assets/blob_{index}.dat"
+            source[path] = b"\x89PNG\r\n\x1a\n\0" + rng.randbytes(4096)
+            changes.append({"changeType": "add", "item": {"path": path}})
+
+        # O destino avança depois do fork em arquivos que a PR também toca
+        target = dict(base)
+        for path in list(base)[::7]:
+            target[path] = b"# alterado no destino\n" + base[path]
+
+        for entry in changes:
+            item = entry["item"]
+            original = entry.get("originalPath", item["path"])
+            if item["path"] in source:
+                item["objectId"] = git_object_id(source[item["path"]])
+            if original in base:
+                item["originalObjectId"] = git_object_id(base[original])
+
+        return cls(
+            repo_id=repo_id,
+            trees={
+                _commit_id(repo_id, BASE_COMMIT): base,
+                _commit_id(repo_id, TARGET_COMMIT): target,
+                _commit_id(repo_id, SOURCE_COMMIT): source,
+            },
+            changes=changes,
+            pr_id=pr_id,
+        )
+
+    def commit(self, name: str) -> str:
+        """Id do commit sintético (BASE_COMMIT, TARGET_COMMIT ou SOURCE_COMMIT)"""
+        return _commit_id(self.repo_id, name)
+
+    def resolve(self, version: str, version_type: str = "branch") -> dict[str, bytes] | None:
+        """Árvore de uma versão (branch ou commit); None se não existe"""
+        if version_type == "branch":
+            version = {
+                self.source_branch: self.commit(SOURCE_COMMIT),
+                self.target_branch: self.commit(TARGET_COMMIT),
+            }.get(version.removeprefix("refs/heads/"), "")
+        return self.trees.get(version)
+
+    def blobs(self) -> dict[str, bytes]:
+        """Todos os blobs do repositório por objectId"""
+        return {git_object_id(data): data for tree in self.trees.values() for data in tree.values()}
+
+
+@dataclass(frozen=True)
+class FakeServerConfig:
+    """Comportamento do servidor fake"""
+
+    latency_ms: float = 0.0  # Atraso fixo por requisição
+    jitter_ms: float = 0.0  # Atraso extra aleatório (0..jitter)
+    rate_limit_per_second: float = 0.0  # Acima disso responde 429 (0 = sem throttling)
+    rate_limit_burst: int = 20
+    # Janela deslizante do orçamento informado em X-RateLimit-Limit/Remaining (como o
+    # limite de TSTUs do Azure DevOps): rate_limit_per_second * janela requisições
+    rate_limit_window_seconds: float = 10.0
+    max_page_size: int = 2000  # Teto do $top das páginas de mudanças (como a API)
+    seed: int = 0  # Semente do jitter
+
+
+@dataclass
+class FakeServerStats:
+    """Contadores do servidor, por endpoint (ex: "changes", "blob", "items_batch")"""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    throttled: int = 0
+    bytes_sent: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "total": sum(self.requests.values()),
+            "throttled": self.throttled,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class HttpError(Exception):
+    """Erro devolvido ao cliente com o status informado"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Response:
+    """Resposta montada por um endpoint"""
+
+    body: bytes
+    content_type: str = "application/json"
+    status: int = 200
+    etag: bool = False  # Respostas JSON de leitura aceitam If-None-Match
+
+
+def _json(data: Any, etag: bool = True) -> Response:
+    return Response(json.dumps(data).encode(), etag=etag)
+
+
+def _zip(entries: dict[str, bytes]) -> Response:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return Response(buffer.getvalue(), content_type="application/zip")
+
+
+class FakeAzureDevOps:
+    """Estado e rotas do servidor: repositórios, threads e propriedades das PRs"""
+
+    def __init__(self, repositories: list[SyntheticRepository], config: FakeServerConfig):
+        self.repositories = {repo.repo_id: repo for repo in repositories}
+        self.blobs = {repo.repo_id: repo.blobs() for repo in repositories}
+        self.config = config
+        self.stats = FakeServerStats()
+        self.threads: dict[tuple[str, int], list[dict[str, Any]]] = {}
+        self.properties: dict[tuple[str, int], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        self._tokens = float(config.rate_limit_burst)
+        self._updated = time.monotonic()
+        self._accepted: deque[float] = deque()  # Requisições aceitas dentro da janela
+        self._routes: list[tuple[str, re.Pattern[str], Any]] = [
+            ("GET", re.compile(r"pullrequests/(\d+)"), self._pull_request),
+            ("GET", re.compile(r"pullrequests/(\d+)/iterations"), self._iterations),
+            ("GET", re.compile(r"pullrequests/(\d+)/iterations/(\d+)/changes"), self._changes),
+            ("GET", re.compile(r"pullrequests/(\d+)/properties"), self._get_properties),
+            ("PATCH", re.compile(r"pullrequests/(\d+)/properties"), self._patch_properties),
+            ("GET", re.compile(r"pullrequests/(\d+)/threads"), self._get_threads),
+            ("POST", re.compile(r"pullrequests/(\d+)/threads"), self._post_thread),
+            ("PATCH", re.compile(r"pullrequests/(\d+)/threads/(\d+)"), self._patch_thread),
+            (
+                "PATCH",
+                re.compile(r"pullrequests/(\d+)/threads/(\d+)/comments/(\d+)"),
+                self._patch_comment,
+            ),
+            ("GET", re.compile(r"items"), self._items),
+            ("POST", re.compile(r"itemsbatch"), self._items_batch),
+            ("GET", re.compile(r"blobs/([0-9a-fA-F]+)"), self._blob),
+            ("POST", re.compile(r"blobs"), self._blobs_zip),
+            ("GET", re.compile(r"diffs/commits"), self._diff_commits),
+        ]
+
+    # Infra: latência, throttling e roteamento
+
+    def delay(self) -> None:
+        """Latência simulada (fora da trava: requisições concorrentes se sobrepõem)"""
+        with self._lock:
+            jitter = self._rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0
+        seconds = (self.config.latency_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def throttle(self) -> tuple[float | None, dict[str, str]]:
+        """
+        Token bucket do servidor: retorna (Retry-After, cabeçalhos X-RateLimit-*)
+        Retry-After None = requisição aceita. Os cabeçalhos descrevem o orçamento da
+        janela deslizante, não a rajada do bucket
+        """
+        rate = self.config.rate_limit_per_second
+        if rate <= 0:
+            return None, {}
+        with self._lock:
+            now = time.monotonic()
+            burst = self.config.rate_limit_burst
+            self._tokens = min(burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+
+            window = self.config.rate_limit_window_seconds
+            while self._accepted and self._accepted[0] <= now - window:
+                self._accepted.popleft()
+            budget = max(burst, round(rate * window))
+            accepted = self._tokens >= 1
+            if accepted:
+                self._tokens -= 1
+                self._accepted.append(now)
+            headers = {
+                "X-RateLimit-Limit": str(budget),
+                "X-RateLimit-Remaining": str(max(0, budget - len(self._accepted))),
+            }
+            if accepted:
+                return None, headers
+            self.stats.throttled += 1
+            return (1 - self._tokens) / rate, headers
+
+    def handle(self, method: str, url: str, body: bytes) -> Response:
+        """Roteia `<org>/<projeto>/_apis/git/repositories/<repo>/<recurso>`"""
+        parts = urlsplit(url)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if parts.path == "/_stats":
+            return _json(self.stats.as_dict(), etag=False)
+
+        match = re.fullmatch(r"/[^/]+/[^/]+/_apis/git/repositories/([^/]+)/(.+)", parts.path)
+        if match is None:
+            raise HttpError(404, f"rota desconhecida: {parts.path}")
+        repo = self.repositories.get(match.group(1))
+        if repo is None:
+            raise HttpError(404, f"repositório {match.group(1)} não existe")
+
+        resource = match.group(2).lower()
+        for route_method, pattern, endpoint in self._routes:
+            args = pattern.fullmatch(resource)
+            if route_method == method and args is not None:
+                with self._lock:
+                    self.stats.requests[endpoint.__name__.lstrip("_")] += 1
+                payload = json.loads(body) if body else None
+                return endpoint(repo, query, payload, *args.groups())
+        raise HttpError(405 if method != "GET" else 404, f"{method} {resource} não suportado")
+
+    def _pr(self, repo: SyntheticRepository, pr_id: str) -> int:
+        if int(pr_id) != repo.pr_id:
+            raise HttpError(404, f"PR {pr_id} não existe")
+        return repo.pr_id
+
+    # Pull request
+
+    def _pull_request(self, repo: SyntheticRepository, query: Any, body: Any, pr: str) -> Response:
+        return _json(
+            {
+                "pullRequestId": self._pr(repo, pr),
+                "title": f"PR sintética de {repo.repo_id}",
+                "sourceRefName": f"refs/heads/{repo.source_branch}",
+                "targetRefName": f"refs/heads/{repo.target_branch}",
+                "isDraft": False,
+                "labels": [],
+                "lastMergeSourceCommit": {"commitId": repo.commit(SOURCE_COMMIT)},
+                "lastMergeTargetCommit": {"commitId": repo.commit(TARGET_COMMIT)},
+            }
+        )
+
+    def _iterations(self, repo: SyntheticRepository, query: Any, body: Any, pr: str) -> Response:
+        self._pr(repo, pr)
+        iteration = {
+            "id": 1,
+            "sourceRefCommit": {"commitId": repo.commit(SOURCE_COMMIT)},
+            "targetRefCommit": {"commitId": repo.commit(TARGET_COMMIT)},
+            "commonRefCommit": {"commitId": repo.commit(BASE_COMMIT)},
+        }
+        return _json({"value": [iteration], "count": 1})
+
+    def _changes(
+        self, repo: SyntheticRepository, query: dict[str, str], body: Any, pr: str, it: str
+    ) -> Response:
+        """Página de changeEntries com $top/$skip; nextSkip = 0 na última página"""
+        self._pr(repo, pr)
+        if int(it) != 1:
+            raise HttpError(404, f"iteração {it} não existe")
+        # Única iteração: comparada a ela mesma, nada mudou
+        entries = [] if query.get("$compareTo") == it else repo.changes
+
+        top = min(int(query.get("$top", 100)), self.config.max_page_size)
+        skip = int(query.get("$skip", 0))
+        page = entries[skip : skip + top]
+        next_skip = skip + top if skip + top < len(entries) else 0
+        return _json({"changeEntries": page, "nextSkip": next_skip, "nextTop": top})
+
+    def _get_properties(
+        self, repo: SyntheticRepository, query: Any, body: Any, pr: str
+    ) -> Response:
+        properties = self.properties.get((repo.repo_id, self._pr(repo, pr)), {})
+        return _json({"value": properties, "count": len(properties)}, etag=False)
+
+    def _patch_properties(
+        self, repo: SyntheticRepository, query: Any, body: list[dict[str, Any]], pr: str
+    ) -> Response:
+        with self._lock:
+            properties = self.properties.setdefault((repo.repo_id, self._pr(repo, pr)), {})
+            for operation in body:
+                name = operation["path"].lstrip("/")
+                properties[name] = {"$type": "System.String", "$value": operation["value"]}
+        return _json({"value": properties, "count": len(properties)}, etag=False)
+
+    # Threads
+
+    def _get_threads(self, repo: SyntheticRepository, query: Any, body: Any, pr: str) -> Response:
+        threads = self.threads.get((repo.repo_id, self._pr(repo, pr)), [])
+        return _json({"value": threads, "count": len(threads)}, etag=False)
+
+    def _post_thread(
+        self, repo: SyntheticRepository, query: Any, body: dict[str, Any], pr: str
+    ) -> Response:
+        with self._lock:
+            threads = self.threads.setdefault((repo.repo_id, self._pr(repo, pr)), [])
+            thread = {
+                **body,
+                "id": len(threads) + 1,
+                "comments": [
+                    {**comment, "id": index + 1}
+                    for index, comment in enumerate(body.get("comments", []))
+                ],
+                "isDeleted": False,
+            }
+            threads.append(thread)
+        return _json(thread, etag=False)
+
+    def _find_thread(self, repo: SyntheticRepository, pr: str, thread_id: str) -> dict[str, Any]:
+        for thread in self.threads.get((repo.repo_id, self._pr(repo, pr)), []):
+            if thread["id"] == int(thread_id):
+                return thread
+        raise HttpError(404, f"thread {thread_id} não existe")
+
+    def _patch_thread(
+        self, repo: SyntheticRepository, query: Any, body: dict[str, Any], pr: str, tid: str
+    ) -> Response:
+        with self._lock:
+            thread = self._find_thread(repo, pr, tid)
+            if "status" in body:
+                thread["status"] = body["status"]
+            thread["properties"] = {**thread.get("properties", {}), **body.get("properties", {})}
+        return _json(thread, etag=False)
+
+    def _patch_comment(
+        self,
+        repo: SyntheticRepository,
+        query: Any,
+        body: dict[str, Any],
+        pr: str,
+        tid: str,
+        cid: str,
+    ) -> Response:
+        with self._lock:
+            thread = self._find_thread(repo, pr, tid)
+            for comment in thread["comments"]:
+                if comment["id"] == int(cid):
+                    comment["content"] = body["content"]
+                    return _json(comment, etag=False)
+        raise HttpError(404, f"comentário {cid} não existe")
+
+    # Conteúdo
+
+    def _tree(self, repo: SyntheticRepository, version: str, version_type: str) -> dict[str, bytes]:
+        tree = repo.resolve(version, version_type)
+        if tree is None:
+            raise HttpError(404, f"versão {version} não existe")
+        return tree
+
+    def _items(self, repo: SyntheticRepository, query: dict[str, str], body: Any) -> Response:
+        """Conteúdo de um arquivo, ou zip da árvore sob scopePath com $format=zip"""
+        tree = self._tree(
+            repo,
+            query.get("versionDescriptor.version", repo.target_branch),
+            query.get("versionDescriptor.versionType", "branch"),
+        )
+        if query.get("$format") == "zip":
+            scope = query.get("scopePath", "/").rstrip("/")
+            return _zip(
+                {
+                    path.removeprefix(scope).lstrip("/"): data
+                    for path, data in tree.items()
+                    if path.startswith(f"{scope}/")
+                }
+            )
+
+        path = query.get("path", "")
+        if path not in tree:
+            raise HttpError(404, f"{path} não existe")
+        return Response(tree[path], content_type="application/octet-stream")
+
+    def _items_batch(self, repo: SyntheticRepository, query: Any, body: dict[str, Any]) -> Response:
+        """objectId (e metadados) de cada descritor; lista vazia se o item não existe"""
+        value: list[list[dict[str, Any]]] = []
+        for descriptor in body.get("itemDescriptors", []):
+            tree = repo.resolve(descriptor["version"], descriptor.get("versionType", "branch"))
+            data = tree.get(descriptor["path"]) if tree is not None else None
+            if data is None:
+                value.append([])
+                continue
+            value.append(
+                [
+                    {
+                        "objectId": git_object_id(data),
+                        "gitObjectType": "blob",
+                        "path": descriptor["path"],
+                        "contentMetadata": {"isBinary": b"\0" in data[:8000]},
+                    }
+                ]
+            )
+        return _json({"value": value, "count": len(value)}, etag=False)
+
+    def _blob(self, repo: SyntheticRepository, query: Any, body: Any, object_id: str) -> Response:
+        data = self.blobs[repo.repo_id].get(object_id.lower())
+        if data is None:
+            raise HttpError(404, f"blob {object_id} não existe")
+        return Response(data, content_type="application/octet-stream")
+
+    def _blobs_zip(self, repo: SyntheticRepository, query: Any, body: list[str]) -> Response:
+        blobs = self.blobs[repo.repo_id]
+        return _zip({oid: blobs[oid.lower()] for oid in body if oid.lower() in blobs})
+
+    def _diff_commits(
+        self, repo: SyntheticRepository, query: dict[str, str], body: Any
+    ) -> Response:
+        """Só o commonCommit (merge base) é relevante para o bot"""
+        versions = {repo.commit(SOURCE_COMMIT), repo.commit(TARGET_COMMIT)}
+        if {query.get("baseVersion"), query.get("targetVersion")} != versions:
+            raise HttpError(404, "commits desconhecidos")
+        return _json({"commonCommit": repo.commit(BASE_COMMIT), "changes": []})
+
+
+def _handler(app: FakeAzureDevOps) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive: o pool do cliente reaproveita conexões
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return None
+
+        def _serve(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            retry_after: float | None = None
+            headers: dict[str, str] = {}
+            if not self.path.startswith("/_stats"):
+                app.delay()
+                retry_after, headers = app.throttle()
+            try:
+                if retry_after is not None:
+                    headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                    raise HttpError(429, "limite de requisições excedido")
+                response = app.handle(self.command, self.path, body)
+            except HttpError as e:
+                response = _json({"message": str(e)}, etag=False)
+                response.status = e.status
+            except (KeyError, ValueError, TypeError) as e:
+                response = _json({"message": f"requisição inválida: {e}"}, etag=False)
+                response.status = 400
+
+            if response.etag:
+                etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    response = Response(b"", status=304)
+
+            self.send_response(response.status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", response.content_type)
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+            with app._lock:
+                app.stats.bytes_sent += len(response.body)
+
+        do_GET = do_POST = do_PATCH = _serve
+
+    return Handler
+
+
+class FakeAzureDevOpsServer:
+    """
+    Servidor HTTP em thread própria; `base_url` vai em AZDO_BASE_URL
+    Uso: `with FakeAzureDevOpsServer([SyntheticRepository.generate("repo")]) as server: ...`
+    """
+
+    def __init__(
+        self,
+        repositories: list[SyntheticRepository],
+        config: FakeServerConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.app = FakeAzureDevOps(repositories, config or FakeServerConfig())
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self.app))
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def stats(self) -> FakeServerStats:
+        return self.app.stats
+
+    def start(self) -> "FakeAzureDevOpsServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="fake-azdo", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeAzureDevOpsServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
@@ -0,0 +1,13 @@
+"""Git module - acesso a repositórios git locais"""
+
+from .mirror import GitMirror, GitMirrorStore
+from .repository import GitError, GitFileDiff, GitRepository, parse_git_diff
+
+__all__ = [
+    "GitError",
+    "GitFileDiff",
+    "GitMirror",
+    "GitMirrorStore",
+    "GitRepository",
+    "parse_git_diff",
+]
@@ -0,0 +1,115 @@
+"""
+Mirrors bare persistentes por repositório, para workers sem checkout (daemon/lote)
+Cada review busca só os objetos novos das branches da PR; o diff lê do object store
+"""
+
+import base64
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+from .repository import GitError, GitRepository
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: sem trava entre processos
+    fcntl = None  # type: ignore[assignment]
+
+# Caracteres permitidos no nome do diretório do mirror
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class GitMirror(GitRepository):
+    """
+    Mirror bare de um repositório remoto em `<path>`
+    Branches buscadas ficam em refs/remotes/origin/*; a autenticação vai por
+    variáveis de ambiente (GIT_CONFIG_*), nunca gravada em disco nem na linha de comando
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        remote_url: str,
+        token: str = "",
+        executable: str = "git",
+        timeout: float = 600,
+    ):
+        env = {"GIT_TERMINAL_PROMPT": "0"}
+        if token:
+            auth = base64.b64encode(f":{token}".encode()).decode()
+            env |= {
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {auth}",
+            }
+        super().__init__(path, executable, timeout, env)
+        self.remote_url = remote_url
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serializa criação e fetch do mirror entre processos (workers em paralelo)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _init(self) -> None:
+        """Cria o repositório bare na primeira utilização"""
+        if (self.path / "HEAD").exists():
+            return
+        GitRepository(self.path.parent, self.executable, self.timeout, self.env).run(
+            "init", "--bare", "--quiet", self.path.name
+        )
+        self.run("remote", "add", "origin", self.remote_url)
+
+    def fetch(self, refspecs: list[str]) -> None:
+        """Busca os refspecs do remoto (só objetos que o mirror ainda não tem)"""
+        self.run("fetch", "--quiet", "--no-tags", "origin", *refspecs)
+
+    def ensure_commits(self, commits: list[str], branches: list[str]) -> bool:
+        """
+        Busca as branches da PR se algum commit falta; se ainda faltar
+        (branch já avançou), tenta buscar os commits diretamente
+        """
+        with self._locked():
+            self._init()
+            if all(self.has_commit(commit) for commit in commits):
+                return True
+
+            refspecs = [f"+refs/heads/{b}:refs/remotes/origin/{b}" for b in dict.fromkeys(branches)]
+            self.fetch(refspecs)
+            missing = [commit for commit in commits if not self.has_commit(commit)]
+            if missing:
+                try:
+                    self.fetch(missing)
+                except GitError:
+                    return False
+            return all(self.has_commit(commit) for commit in missing)
+
+
+class GitMirrorStore:
+    """Um GitMirror por repositório em `<root>/<repo_id>.git`"""
+
+    def __init__(
+        self,
+        root: str | Path,
+        url_template: str,
+        token: str = "",
+        executable: str = "git",
+    ):
+        self.root = Path(root).expanduser()
+        self.url_template = url_template  # Ex: https://dev.azure.com/org/proj/_git/{repo_id}
+        self.token = token
+        self.executable = executable
+
+    def get(self, repo_id: str) -> GitMirror:
+        name = _UNSAFE_NAME.sub("_", repo_id)
+        return GitMirror(
+            self.root / f"{name}.git",
+            self.url_template.format(repo_id=quote(repo_id, safe="")),
+            self.token,
+            self.executable,
+        )
@@ -0,0 +1,173 @@
+"""
+Acesso a repositórios git locais (checkout do pipeline)
+Executa o binário `git` via subprocess, apenas com comandos de leitura
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+class GitError(RuntimeError):
+    """Falha ao executar um comando git"""
+
+
+@dataclass
+class GitFileDiff:
+    """Diff de um arquivo na saída do `git diff`"""
+
+    path: str  # Caminho novo (antigo, se removido), relativo à raiz do repositório
+    old_path: str
+    lines: list[str] = field(default_factory=list)  # A partir de "--- a/..."
+    binary: bool = False
+
+
+def _header_path(header: str) -> str:
+    """
+    Caminho em "diff --git a/X b/X" (sem renomeação os dois lados são iguais,
+    então o corte pelo meio funciona mesmo com espaços no nome)
+    """
+    rest = header.removeprefix("diff --git a/")
+    return rest[: (len(rest) - 3) // 2]
+
+
+def parse_git_diff(output: str) -> dict[str, GitFileDiff]:
+    """
+    Separa a saída de `git diff` por arquivo, indexada pelo caminho novo
+    O cabeçalho estendido (index, mode, similarity...) fica de fora das linhas
+    """
+    files: list[GitFileDiff] = []
+    in_body = False
+
+    for line in output.splitlines(keepends=True):
+        text = line.rstrip("\n")
+        if text.startswith("diff --git "):
+            path = _header_path(text)
+            files.append(GitFileDiff(path=path, old_path=path))
+            in_body = False
+        elif not files:
+            continue
+        elif in_body:
+            files[-1].lines.append(line)
+        elif text.startswith("rename from "):
+            files[-1].old_path = text.removeprefix("rename from ")
+        elif text.startswith("rename to "):
+            files[-1].path = text.removeprefix("rename to ")
+        elif text.startswith(("Binary files ", "GIT binary patch")):
+            files[-1].binary = True
+        elif text.startswith("--- "):
+            in_body = True
+            files[-1].lines.append(line)
+
+    return {file.path: file for file in files}
+
+
+class GitRepository:
+    """Repositório git local (working copy ou bare)"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        executable: str = "git",
+        timeout: float = 120,
+        env: dict[str, str] | None = None,
+    ):
+        self.path = Path(path).expanduser()
+        self.executable = executable
+        self.timeout = timeout
+        self.env = env or {}
+
+    @classmethod
+    def is_repository(cls, path: str | Path, executable: str = "git") -> bool:
+        """Verifica se `path` é um repositório git (sem lançar exceção)"""
+        try:
+            cls(path, executable).run("rev-parse", "--git-dir")
+        except (GitError, OSError):
+            return False
+        return True
+
+    def run(self, *args: str) -> str:
+        """Executa `git <args>` no repositório e retorna a saída padrão"""
+        # Caminhos de arquivo nunca são interpretados como glob
+        try:
+            result = subprocess.run(
+                [self.executable, "-C", str(self.path), "-c", "core.quotePath=false", *args],
+                env={**os.environ, "GIT_LITERAL_PATHSPECS": "1", **self.env},
+                capture_output=True,
+                timeout=self.timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired as e:
+            raise GitError(f"git {args[0]}: sem resposta em {self.timeout:g}s") from e
+        if result.returncode != 0:
+            message = result.stderr.decode("utf-8", errors="replace").strip()
+            raise GitError(f"git {args[0]}: {message or f'código {result.returncode}'}")
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def has_commit(self, commit: str) -> bool:
+        """Verifica se o commit está no repositório local"""
+        try:
+            self.run("cat-file", "-e", f"{commit}^{{commit}}")
+        except GitError:
+            return False
+        return True
+
+    def ensure_commits(self, commits: list[str], branches: list[str]) -> bool:
+        """
+        Garante que os commits estão disponíveis para o diff
+        Numa working copy só verifica (nada é buscado); mirrors buscam o que falta
+        """
+        return all(self.has_commit(commit) for commit in commits)
+
+    def merge_base(self, first: str, second: str) -> str | None:
+        """Ancestral comum dos dois commits (None se o histórico local não alcança)"""
+        try:
+            return self.run("merge-base", first, second).strip() or None
+        except GitError:
+            return None
+
+    def read_file(self, commit: str, path: str) -> str | None:
+        """Conteúdo de `path` (relativo à raiz) no commit; None se o arquivo não existe"""
+        try:
+            return self.run("show", f"{commit}:{path}")
+        except GitError:
+            return None
+
+    def blob_sizes(self, commit: str, paths: list[str]) -> dict[str, int]:
+        """
+        Tamanho em bytes dos blobs de `paths` no commit (`git ls-tree -l`), sem ler o
+        conteúdo; caminhos ausentes (ou falha do git) ficam de fora
+        """
+        if not paths:
+            return {}
+        try:
+            output = self.run("ls-tree", "-l", "-z", commit, "--", *paths)
+        except GitError:
+            return {}
+        sizes: dict[str, int] = {}
+        for entry in output.split("\0"):
+            info, _, path = entry.partition("\t")
+            fields = info.split()
+            if len(fields) == 4 and fields[1] == "blob" and fields[3].isdigit():
+                sizes[path] = int(fields[3])
+        return sizes
+
+    def diff(self, base: str, head: str, paths: list[str]) -> dict[str, GitFileDiff]:
+        """
+        `git diff base head` com detecção de renomeação, restrito a `paths`
+        Retorna os diffs por caminho novo (relativo à raiz)
+        """
+        if not paths:
+            return {}
+        output = self.run(
+            "diff",
+            "--no-color",
+            "--no-ext-diff",
+            "--find-renames",
+            base,
+            head,
+            "--",
+            *paths,
+        )
+        return parse_git_diff(output)
@@ -0,0 +1,13 @@
+"""HTTP module - componentes compartilhados pelos clientes da API"""
+
+from .rate_limiter import THROTTLE_RETRIES, RateLimitedHTTPAdapter, RateLimiter
+from .transport import HttpTransport, RequestRecord, TransportMetrics
+
+__all__ = [
+    "THROTTLE_RETRIES",
+    "HttpTransport",
+    "RateLimitedHTTPAdapter",
+    "RateLimiter",
+    "RequestRecord",
+    "TransportMetrics",
+]
@@ -0,0 +1,223 @@
+"""
+Agendador de requisições com token bucket, ciente dos limites do Azure DevOps
+O estado pode ser compartilhado entre processos (reviews paralelos) via SQLite
+"""
+
+import email.utils
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+# Ritmo mínimo (fração da taxa configurada) quando o orçamento do servidor está no fim
+MIN_RATE_FACTOR = 0.25
+
+# Peso de cada resposta na média móvel (EWMA) do ritmo: uma resposta isolada com pouco
+# orçamento não derruba a taxa de uma vez
+RATE_FACTOR_SMOOTHING = 0.2
+
+# Quantas vezes uma resposta 429 é repetida depois de esperar a pausa do servidor
+THROTTLE_RETRIES = 3
+
+# (tokens, blocked_until, factor) de um bucket
+BucketState = tuple[float, float, float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    factor REAL NOT NULL
+)
+"""
+
+
+def parse_retry_after(value: str | None, now: float) -> float | None:
+    """Converte Retry-After (segundos ou data HTTP) em segundos de espera"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - now)
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket: até `burst` requisições seguidas, depois `rate` por segundo
+    - Retry-After e X-RateLimit-Delay pausam todos os clientes do mesmo bucket
+    - X-RateLimit-Remaining/X-RateLimit-Limit reduzem a taxa (média móvel das respostas)
+      quando o orçamento encolhe; reservas já na fila mantêm o horário prometido
+    Com `state_path`, o bucket vive em um arquivo SQLite compartilhado entre processos
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        state_path: str | Path | None = None,
+        name: str = "default",
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.name = name
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+        database = ":memory:"
+        if state_path is not None:
+            path = Path(state_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            database = str(path)
+
+        # Autocommit: as transações são abertas manualmente com BEGIN IMMEDIATE,
+        # que trava o arquivo entre processos durante a leitura + escrita do bucket
+        self._db = sqlite3.connect(
+            database, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._db.execute(_SCHEMA)
+
+    def _update(self, change: Callable[[float, float, float, float], BucketState]) -> None:
+        """
+        Lê o bucket, aplica `change(now, tokens, blocked_until, factor)` e grava o resultado
+        `change` retorna (tokens, blocked_until, factor); tudo numa única transação
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                now = self.clock()
+                row = self._db.execute(
+                    "SELECT tokens, updated, blocked_until, factor FROM buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                tokens, updated, blocked_until, factor = row or (self.burst, now, 0.0, 1.0)
+
+                # Reabastece pelo tempo decorrido, no ritmo atual
+                elapsed = max(0.0, now - updated)
+                tokens = min(float(self.burst), tokens + elapsed * self.rate * factor)
+
+                tokens, blocked_until, factor = change(now, tokens, blocked_until, factor)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)",
+                    (self.name, tokens, now, blocked_until, factor),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def reserve(self) -> float:
+        """Reserva uma vaga e retorna quantos segundos esperar antes de enviar"""
+        wait = 0.0
+
+        def take(now: float, tokens: float, blocked_until: float, factor: float) -> BucketState:
+            nonlocal wait
+            # Saldo negativo = fila: cada reserva ocupa o próximo slot livre
+            tokens -= 1
+            wait = max(0.0, blocked_until - now)
+            if tokens < 0:
+                wait = max(wait, -tokens / (self.rate * factor))
+            return tokens, blocked_until, factor
+
+        if self.rate > 0:
+            self._update(take)
+        return wait
+
+    def acquire(self) -> None:
+        """Bloqueia até a requisição poder ser enviada"""
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Ajusta o bucket a partir dos headers de limite da resposta"""
+        if self.rate <= 0:
+            return
+
+        def adjust(now: float, tokens: float, blocked_until: float, factor: float) -> BucketState:
+            delay = parse_retry_after(headers.get("Retry-After"), now)
+            if delay is None and status_code == 429:
+                delay = 1.0 / self.rate
+            server_delay = _header_float(headers, "X-RateLimit-Delay")
+            for pause in (delay, server_delay):
+                if pause:
+                    blocked_until = max(blocked_until, now + pause)
+
+            remaining = _header_float(headers, "X-RateLimit-Remaining")
+            limit = _header_float(headers, "X-RateLimit-Limit")
+            target = None
+            if remaining is not None and limit:
+                # Velocidade plena até metade do orçamento, depois cai linearmente
+                target = min(1.0, max(MIN_RATE_FACTOR, 2 * remaining / limit))
+            elif status_code < 400:
+                target = 1.0
+            if target is None:
+                return tokens, blocked_until, factor
+
+            smoothed = factor + RATE_FACTOR_SMOOTHING * (target - factor)
+            if tokens < 0:
+                # Saldo negativo é fila já reservada: reescala para que ela termine no
+                # mesmo instante; só as próximas reservas seguem o novo ritmo
+                tokens *= smoothed / factor
+            return min(tokens, self.burst * smoothed), blocked_until, smoothed
+
+        self._update(adjust)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RateLimitedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter do requests que passa cada envio pelo RateLimiter
+    Respostas 429 são repetidas aqui (até `throttle_retries`), após a pausa indicada
+    pelo servidor, para que a espera valha para todos os clientes do bucket
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        throttle_retries: int = THROTTLE_RETRIES,
+        **kwargs: Any,
+    ):
+        self.limiter = limiter
+        self.throttle_retries = throttle_retries
+        super().__init__(**kwargs)
+
+    def send(self, request: PreparedRequest, *args: Any, **kwargs: Any) -> Response:
+        if self.limiter is None:
+            return super().send(request, *args, **kwargs)
+
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            response = super().send(request, *args, **kwargs)
+            self.limiter.observe(response.status_code, response.headers)
+            if response.status_code != 429 or attempt >= self.throttle_retries:
+                return response
+            response.close()
+            attempt += 1
@@ -0,0 +1,235 @@
+"""
+Transporte HTTP compartilhado por todos os adapters do Azure DevOps
+Centraliza pool de conexões, retry, timeouts, gzip, autenticação e métricas
+"""
+
+import base64
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import requests
+from requests import PreparedRequest, Response
+from urllib3.util.retry import Retry
+
+from src.infrastructure.config.settings import HttpConfig
+from src.infrastructure.http.rate_limiter import RateLimitedHTTPAdapter, RateLimiter
+
+# Falhas transitórias do servidor repetidas em métodos idempotentes
+RETRY_STATUSES = (500, 502, 503, 504)
+RETRY_METHODS = ("GET", "PATCH")
+
+# Teto da espera entre tentativas (o mesmo do urllib3)
+RETRY_BACKOFF_MAX = 120.0
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """Dados de uma requisição concluída, entregues aos hooks do transporte"""
+
+    method: str
+    url: str
+    status_code: int
+    elapsed: float  # segundos
+    bytes_received: int  # Content-Length (0 se ausente)
+
+
+ResponseHook = Callable[[RequestRecord], None]
+
+
+@dataclass
+class TransportMetrics:
+    """Contadores agregados de todas as requisições do transporte"""
+
+    requests: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+    # Soma das durações: requisições concorrentes contam cada uma o seu tempo
+    request_seconds: float = 0.0
+    first_started: float | None = None  # time.monotonic()
+    last_finished: float | None = None
+
+    @property
+    def wall_seconds(self) -> float:
+        """Tempo de relógio entre o início da primeira e o fim da última requisição"""
+        if self.first_started is None or self.last_finished is None:
+            return 0.0
+        return self.last_finished - self.first_started
+
+
+def _content_length(headers: Any) -> int:
+    try:
+        return int(headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+class TransportHTTPAdapter(RateLimitedHTTPAdapter):
+    """HTTPAdapter com timeout padrão e hooks chamados a cada resposta"""
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None,
+        default_timeout: tuple[float, float],
+        on_response: ResponseHook,
+        **kwargs: Any,
+    ):
+        self.default_timeout = default_timeout
+        self.on_response = on_response
+        super().__init__(limiter, **kwargs)
+
+    def send(self, request: PreparedRequest, *args: Any, **kwargs: Any) -> Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+
+        started = time.monotonic()
+        response = super().send(request, *args, **kwargs)
+        self.on_response(
+            RequestRecord(
+                method=request.method or "",
+                url=request.url or "",
+                status_code=response.status_code,
+                elapsed=time.monotonic() - started,
+                bytes_received=_content_length(response.headers),
+            )
+        )
+        return response
+
+
+class HttpTransport:
+    """
+    Cliente HTTP único injetado pelo bootstrap em todos os adapters
+    Uma só sessão (e pool) por processo evita conexões TCP/TLS paralelas ao mesmo host
+    """
+
+    def __init__(
+        self,
+        config: HttpConfig,
+        token: str,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.metrics = TransportMetrics()
+        self._hooks: list[ResponseHook] = []
+        self._lock = threading.Lock()
+
+        auth = base64.b64encode(f":{token}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {auth}", "Content-Type": "application/json"}
+        if config.gzip:
+            self.headers["Accept-Encoding"] = "gzip, deflate"
+
+        self.session = self._build_session()
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        """(conexão, leitura) para chamadas comuns da API"""
+        return (self.config.connect_timeout, self.config.timeout)
+
+    @property
+    def bulk_timeout(self) -> tuple[float, float]:
+        """(conexão, leitura) para downloads em lote (zip, itemsbatch)"""
+        return (self.config.connect_timeout, self.config.bulk_timeout)
+
+    def retry_policy(self) -> Retry:
+        """
+        Retry para falhas transitórias do servidor
+        POST não é repetido: um 5xx após criar a thread geraria comentário duplicado.
+        Com agendador, 429 fica com ele (pausa compartilhada entre processos)
+        """
+        status_forcelist = list(RETRY_STATUSES)
+        if self.rate_limiter is None:
+            status_forcelist.insert(0, 429)
+
+        return Retry(
+            total=self.config.max_retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=list(RETRY_METHODS),
+        )
+
+    def retry_delay(self, attempt: int) -> float:
+        """
+        Espera antes da `attempt`-ésima repetição (1, 2...), no mesmo backoff exponencial
+        do urllib3: a primeira é imediata, depois backoff_factor * 2^(attempt - 1)
+        """
+        if attempt <= 1:
+            return 0.0
+        return min(RETRY_BACKOFF_MAX, self.config.backoff_factor * 2 ** (attempt - 1))
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+
+        pool_size = max(1, self.config.pool_size)
+        adapter = TransportHTTPAdapter(
+            self.rate_limiter,
+            default_timeout=self.timeout,
+            on_response=self._record,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=self.retry_policy(),
+        )
+        # http:// também (servidor fake, proxies locais): sem isso o requests usaria o
+        # HTTPAdapter padrão, sem agendador, retry, timeout nem métricas
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def add_hook(self, hook: ResponseHook) -> None:
+        """Registra função chamada após cada resposta (métricas, logs, tracing)"""
+        self._hooks.append(hook)
+
+    def _record(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.metrics.requests += 1
+            self.metrics.errors += record.status_code >= 400
+            self.metrics.bytes_received += record.bytes_received
+            self.metrics.request_seconds += record.elapsed
+            finished = time.monotonic()
+            started = finished - record.elapsed
+            if self.metrics.first_started is None or started < self.metrics.first_started:
+                self.metrics.first_started = started
+            self.metrics.last_finished = finished
+        for hook in self._hooks:
+            hook(record)
+
+    def async_client(
+        self,
+        max_connections: int,
+        transport: httpx.AsyncBaseTransport | None = None,
+        http2: bool = False,
+    ) -> httpx.AsyncClient:
+        """Cliente httpx com os mesmos headers, timeouts e hooks da sessão síncrona"""
+        started: dict[int, float] = {}
+
+        async def on_request(request: httpx.Request) -> None:
+            started[id(request)] = time.monotonic()
+
+        async def on_response(response: httpx.Response) -> None:
+            request = response.request
+            self._record(
+                RequestRecord(
+                    method=request.method,
+                    url=str(request.url),
+                    status_code=response.status_code,
+                    elapsed=time.monotonic() - started.pop(id(request), time.monotonic()),
+                    bytes_received=_content_length(response.headers),
+                )
+            )
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            ),
+            headers=self.headers,
+            timeout=httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+            transport=transport,
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
@@ -2,26 +2,92 @@
 Utilities para formatação de comentários e output
 """
 
+import posixpath
+from collections.abc import Iterable
+from urllib.parse import quote
+
+from src.core.domain.file_diff import FileDiffChunk, LineIndex
 from src.core.domain.file_review import FileReview
 
 
-def calculate_line_range(referenced_lines: list[int], context: int = 6) -> tuple[int, int]:
+def calculate_line_range(
+    referenced_lines: list[int], context: int = 6, line_index: LineIndex | None = None
+) -> tuple[int, int]:
     """
     Calcula intervalo de linhas para postar comentário
     Usa mediana das linhas referenciadas como centro
+    Com o `line_index` do arquivo, o intervalo fica dentro do hunk do centro e, sem
+    linhas referenciadas, ancora na primeira linha alterada
     """
-    if not referenced_lines:
+    sorted_lines = sorted(referenced_lines)
+    if not sorted_lines and line_index is not None:
+        first_changed = line_index.nearest_changed(1)
+        sorted_lines = [] if first_changed is None else [first_changed]
+
+    if not sorted_lines:
         return (1, context)
 
-    sorted_lines = sorted(referenced_lines)
     mid = sorted_lines[len(sorted_lines) // 2]
 
     start = max(1, mid - context)
     end = mid + context
 
+    hunk = line_index.hunk_range(mid) if line_index is not None else None
+    if hunk is not None:
+        start, end = max(start, hunk[0]), min(end, hunk[1])
+
     return (start, end)
 
 
+def format_diff_chunk(chunk: FileDiffChunk, number: int) -> str:
+    """Seção markdown de um arquivo no diff enviado ao LLM"""
+    parts = [f"\n## Arquivo {number}: `{chunk.path}`\n**Tipo:** {chunk.change_type}\n\n"]
+    if chunk.skipped_reason is not None:
+        parts.append(f"⏭️ Ignorado: arquivo {chunk.skipped_reason}\n\n")
+    elif chunk.error is not None:
+        parts.append(f"⚠️ Erro lendo arquivo: {chunk.error}\n\n")
+    elif chunk.has_diff:
+        parts += ["```diff\n", *chunk.lines]
+        if chunk.is_truncated:
+            parts.append(f"\n... ({chunk.omitted_lines} linhas omitidas)\n")
+        parts.append("\n```\n\n")
+    return "".join(parts)
+
+
+def format_diff_chunks(chunks: Iterable[FileDiffChunk]) -> tuple[str, int, int]:
+    """
+    Junta as seções de todos os arquivos num único texto, montado uma vez no final
+    Arquivos ignorados (binários, grandes) são listados também no cabeçalho do diff
+    Retorna (diff_text, total_additions, total_deletions)
+    """
+    parts: list[str] = []
+    skipped: list[FileDiffChunk] = []
+    total_additions = 0
+    total_deletions = 0
+    files_included = 0
+
+    for chunk in chunks:
+        total_additions += chunk.additions
+        total_deletions += chunk.deletions
+        parts.append(format_diff_chunk(chunk, files_included + 1))
+        if chunk.has_diff:
+            files_included += 1
+        elif chunk.skipped_reason is not None:
+            skipped.append(chunk)
+
+    if skipped:
+        parts.insert(0, format_skipped_header(skipped))
+
+    return "".join(parts), total_additions, total_deletions
+
+
+def format_skipped_header(skipped: list[FileDiffChunk]) -> str:
+    """Cabeçalho do diff com os arquivos que ficaram de fora e o motivo"""
+    lines = [f"⏭️ **Arquivos ignorados ({len(skipped)}):**"]
+    lines += [f"- `{chunk.path}`: {chunk.skipped_reason}" for chunk in skipped]
+    return "\n".join(lines) + "\n"
+
+
 def format_file_comment(file_review: FileReview) -> str:
     """
     Formata um FileReview em comentário markdown para Azure DevOps
@@ -47,3 +113,72 @@ def format_file_comment(file_review: FileReview) -> str:
             lines.append(f"- {issue.text}")
 
     return "\n".join(lines)
+
+
+def pr_file_url(pr_url: str, path: str, line: int | None = None) -> str:
+    """Link para o arquivo (e opcionalmente a linha) na aba Files da PR"""
+    url = f"{pr_url}?_a=files&path={quote(path)}"
+    if line is not None:
+        url += f"&line={line}&lineEnd={line}&lineStartColumn=1&lineEndColumn=1"
+    return url
+
+
+def group_by_directory(file_reviews: list[FileReview]) -> dict[str, list[FileReview]]:
+    """Agrupa reviews pelo diretório do arquivo, preservando a ordem de chegada"""
+    groups: dict[str, list[FileReview]] = {}
+    for file_review in file_reviews:
+        directory = posixpath.dirname(file_review.filepath) or "/"
+        groups.setdefault(directory, []).append(file_review)
+    return groups
+
+
+def format_consolidated_comment(
+    title: str,
+    file_reviews: list[FileReview],
+    pr_url: str,
+    stats: dict[str, int] | None = None,
+) -> str:
+    """
+    Formata vários FileReviews em um único comentário markdown
+    Índice no topo e, por arquivo, issues com link direto para a linha na PR
+    """
+    lines = [f"🤖 **{title}**\n"]
+
+    if stats is not None:
+        lines.append(
+            f"📊 Arquivos analisados: {stats['files_reviewed']} | "
+            f"Comentários: {stats['critical']}🔴 {stats['important']}🟡 "
+            f"{stats['suggestions']}🟢\n"
+        )
+
+    # Índice
+    for file_review in file_reviews:
+        url = pr_file_url(pr_url, file_review.filepath)
+        counts = (
+            f"{len(file_review.critical_issues)}🔴 {len(file_review.important_issues)}🟡 "
+            f"{len(file_review.suggestions)}🟢"
+        )
+        lines.append(f"- [`{file_review.filepath}`]({url}) — {counts}")
+
+    sections = [
+        ("🔴 Crítico:", "critical_issues"),
+        ("🟡 Importante:", "important_issues"),
+        ("🟢 Sugestão:", "suggestions"),
+    ]
+    for file_review in file_reviews:
+        url = pr_file_url(pr_url, file_review.filepath)
+        lines.append(f"\n---\n#### [`{file_review.filepath}`]({url})")
+
+        for label, field in sections:
+            issues = getattr(file_review, field)
+            if not issues:
+                continue
+            lines.append(f"\n{label}")
+            for issue in issues:
+                line_link = ""
+                if issue.line is not None:
+                    line_url = pr_file_url(pr_url, file_review.filepath, issue.line)
+                    line_link = f" ([L{issue.line}]({line_url}))"
+                lines.append(f"- {issue.text}{line_link}")
+
+    return "\n".join(lines)
@@ -5,15 +5,24 @@ Utilitários para output e resumo
 import re
 
 from src.core.domain.review_result import ReviewResult
+from src.infrastructure.cache.blob_cache import CacheStats
+from src.infrastructure.http.transport import TransportMetrics
 
 
-def print_summary(result: ReviewResult, show_details: bool = False) -> None:
+def print_summary(
+    result: ReviewResult,
+    show_details: bool = False,
+    cache_stats: CacheStats | None = None,
+    http_metrics: TransportMetrics | None = None,
+) -> None:
     """
     Imprime resumo do review no console
 
     Args:
         result: Resultado do review
         show_details: Se True, mostra os comentários detalhados (modo --no-post)
+        cache_stats: Contadores do cache de blobs (omitido se None)
+        http_metrics: Contadores do transporte HTTP (omitido se None)
     """
     print("\n" + "=" * 60)
     print("📊 RESUMO DO REVIEW")
@@ -32,6 +41,20 @@ def print_summary(result: ReviewResult, show_details: bool = False) -> None:
     print(f"\n💰 Custo estimado: ${result.estimated_cost_usd:.4f}")
     print(f"   Tokens usados: {result.total_tokens_used:,}")
 
+    if cache_stats is not None:
+        print(
+            f"\n📦 Cache de blobs: {cache_stats.hits} hits, {cache_stats.misses} misses, "
+            f"{cache_stats.bytes_saved / 1024:.1f} KB economizados"
+        )
+
+    if http_metrics is not None:
+        print(
+            f"🌐 HTTP: {http_metrics.requests} requisições, {http_metrics.errors} erros, "
+            f"{http_metrics.bytes_received / 1024:.1f} KB recebidos, "
+            f"{http_metrics.wall_seconds:.1f}s decorridos "
+            f"({http_metrics.request_seconds:.1f}s somando as requisições)"
+        )
+
     # Se show_details=True, mostra os comentários que seriam postados
     if show_details and result.files:
         print("\n" + "=" * 60)
@@ -4,12 +4,24 @@ Code Review Bot
 """
 
 import sys
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any
 
 from dotenv import load_dotenv
 
 from src.bootstrap import AppContainer, create_app
+from src.core.domain.file_diff import FileDiffChunk, LineIndex
+from src.core.domain.file_review import FileReview
 from src.core.domain.review_result import ReviewResult
-from src.infrastructure.utils.formatting import calculate_line_range, format_file_comment
+from src.infrastructure.utils.formatting import (
+    calculate_line_range,
+    format_consolidated_comment,
+    format_diff_chunks,
+    format_file_comment,
+    group_by_directory,
+)
 from src.infrastructure.utils.output import print_summary
 
 load_dotenv()
@@ -26,30 +38,102 @@ def main(repo_id: str, pr_id: int, project: str, post_comments: bool = True) ->
 
     # Bootstrap - cria todas as dependências via DI
     app = create_app(project=project)
+    try:
+        review_pull_request(app, repo_id, pr_id, project, post_comments)
+    finally:
+        # Pool assíncrono e thread do event loop não sobrevivem ao review
+        app.close()
 
-    # 1. Buscar informações da PR
-    pr_info = app.azure.get_pr_info(repo_id, pr_id)
 
-    # 2. Buscar arquivos modificados da PR
-    print("→ Buscando mudanças da PR...")
-    files = app.azure.get_pr_files(repo_id, pr_id)
+def review_pull_request(
+    app: AppContainer, repo_id: str, pr_id: int, project: str, post_comments: bool
+) -> None:
+    """Etapas do review com as dependências já criadas"""
 
-    if not files:
+    # 1-2. Buscar PR, iterações e primeira página de mudanças (em paralelo)
+    print("→ Buscando PR e mudanças...")
+    snapshot = app.azure.fetch_pr_snapshot(
+        repo_id, pr_id, incremental=app.config.behavior.incremental
+    )
+    pr_info = snapshot.pr_info
+    iteration_id = snapshot.iteration_id
+    if iteration_id is None:
         print("✗ Nenhum arquivo modificado encontrado")
         return
 
-    print(f"  • {len(files)} arquivos modificados")
-
-    # 3. Gerar diff completo para calcular linhas
+    last_reviewed = snapshot.last_reviewed_iteration
+    if snapshot.already_reviewed:
+        print(f"✓ Iteração {iteration_id} já revisada, nada novo para analisar")
+        return
+    if last_reviewed is not None:
+        print(f"  • Incremental: mudanças desde a iteração {last_reviewed}")
+
+    # Demais páginas de mudanças são consumidas pelo diff à medida que chegam
+    remaining: Iterator[Any] = iter(())
+    if snapshot.next_skip:
+        remaining = app.azure.iter_pr_files(
+            repo_id,
+            pr_id,
+            iteration_id=iteration_id,
+            compare_to=last_reviewed,
+            skip=snapshot.next_skip,
+        )
+    pages = chain(snapshot.changes, remaining)
+    file_count = 0
+    all_pages_read = False
+
+    def count_files() -> Iterator[Any]:
+        nonlocal file_count, all_pages_read
+        for entry in pages:
+            file_count += 1
+            yield entry
+        all_pages_read = True
+
+    # 3. Gerar diff completo para calcular linhas; de cada arquivo fica só o índice de
+    # linhas, usado para validar as linhas citadas pelo LLM e ancorar os comentários
     print("→ Gerando diff...")
-    diff_text, additions, deletions = app.diff_service.generate_diff(
-        repo_id, files, pr_info.source_branch, pr_info.target_branch
+    line_indexes: dict[str, LineIndex] = {}
+
+    def index_lines(chunks: Iterator[FileDiffChunk]) -> Iterator[FileDiffChunk]:
+        for chunk in chunks:
+            if chunk.has_diff:
+                line_indexes[chunk.path.lstrip("/")] = chunk.line_index
+            yield chunk
+
+    diff_text, additions, deletions = format_diff_chunks(
+        index_lines(
+            app.diff_service.iter_file_diffs(
+                repo_id,
+                count_files(),
+                pr_info.source_branch,
+                pr_info.target_branch,
+                source_commit=pr_info.source_commit,
+                target_commit=pr_info.target_commit,
+                base_commit=snapshot.compare_commit,
+            )
+        )
     )
 
-    # Atualiza estatísticas da PR
-    pr_info.additions = additions
-    pr_info.deletions = deletions
-    pr_info.changed_files_count = len(files)
+    # O diff lê só os primeiros arquivos; as páginas seguintes não são buscadas só para
+    # contar: a primeira página já está em memória e, havendo mais, a contagem é um piso
+    file_count = max(file_count, len(snapshot.changes))
+    count_is_floor = bool(snapshot.next_skip) and not all_pages_read
+
+    if not file_count:
+        print("✗ Nenhum arquivo modificado encontrado")
+        return
+
+    # Estatísticas da PR numa cópia: o snapshot não é alterado
+    pr_info = pr_info.model_copy(
+        update={
+            "additions": additions,
+            "deletions": deletions,
+            "changed_files_count": file_count,
+            "changed_files_is_floor": count_is_floor,
+        }
+    )
+
+    print(f"  • {pr_info.changed_files_label} arquivos modificados")
 
     print(f"  • +{additions} -{deletions} linhas")
 
@@ -83,6 +167,10 @@ def main(repo_id: str, pr_id: int, project: str, post_comments: bool = True) ->
     file_reviews = app.parser.parse(review_text)
     print(f"  • {len(file_reviews)} arquivo(s) com comentários")
 
+    file_reviews, fixed_lines = app.line_validator.validate(file_reviews, line_indexes)
+    if fixed_lines:
+        print(f"  • {fixed_lines} linha(s) fora do diff ajustada(s) para a alteração mais próxima")
+
     result = ReviewResult(
         pr_info=pr_info,
         files=file_reviews,
@@ -93,19 +181,38 @@ def main(repo_id: str, pr_id: int, project: str, post_comments: bool = True) ->
 
     # 9. Postar comentários
     if post_comments:
-        post_review_comments(app, repo_id, pr_id, result)
+        post_review_comments(app, repo_id, pr_id, result, line_indexes)
+
+        # Marca a iteração como revisada para o próximo review incremental
+        if app.config.behavior.incremental:
+            app.azure.set_last_reviewed_iteration(repo_id, pr_id, iteration_id)
 
     # 10. Mostrar resumo (com detalhes se for --no-post)
-    print_summary(result, show_details=not post_comments)
+    cache_stats = app.blob_cache.stats if app.blob_cache else None
+    http_metrics = app.http.metrics if app.http else None
+    print_summary(
+        result,
+        show_details=not post_comments,
+        cache_stats=cache_stats,
+        http_metrics=http_metrics,
+    )
 
 
 def post_review_comments(
-    app: AppContainer, repo_id: str, pr_id: int, result: ReviewResult
+    app: AppContainer,
+    repo_id: str,
+    pr_id: int,
+    result: ReviewResult,
+    line_indexes: Mapping[str, LineIndex] | None = None,
 ) -> None:
-    """Posta comentários na PR"""
+    """Posta comentários na PR; com `line_indexes`, os intervalos ficam dentro dos hunks"""
 
     print("\n→ Postando comentários no Azure DevOps...")
 
+    if app.config.behavior.post_mode != "per_file":
+        post_consolidated_comments(app, repo_id, pr_id, result)
+        return
+
     # Posta resumo inicial
     if app.config.behavior.post_summary_comment and result.files:
         try:
@@ -114,25 +221,93 @@ def post_review_comments(
         except Exception as e:
             print(f"  ✗ Erro ao postar resumo: {e}")
 
-    # Posta comentários por arquivo
-    success = 0
-    for file_review in result.files:
+    # Posta comentários por arquivo, até `post_concurrency` em paralelo
+    def post(file_review: FileReview) -> bool | Exception:
         try:
             # Calcula intervalo de linhas
             start, end = calculate_line_range(
-                file_review.referenced_lines, app.config.behavior.context_lines
+                file_review.referenced_lines,
+                app.config.behavior.context_lines,
+                (line_indexes or {}).get(file_review.filepath.lstrip("/")),
             )
 
             # Formata comentário
             comment = format_file_comment(file_review)
 
             # Posta
-            if app.azure.post_comment(repo_id, pr_id, file_review.filepath, start, end, comment):
-                success += 1
-                print(f"  • {file_review.filepath}")
+            return app.azure.post_comment(repo_id, pr_id, file_review.filepath, start, end, comment)
+        except Exception as e:
+            return e
+
+    workers = max(1, min(app.config.limits.post_concurrency, len(result.files)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(post, result.files))
+
+    # Resultado agregado na ordem original dos arquivos
+    success = 0
+    for file_review, outcome in zip(result.files, outcomes, strict=True):
+        if isinstance(outcome, Exception):
+            print(f"  ✗ Erro: {file_review.filepath}: {outcome}")
+        elif outcome:
+            success += 1
+            print(f"  • {file_review.filepath}")
+
+    print(f"\n✓ {success}/{len(result.files)} comentários postados")
+
 
+def post_consolidated_comments(
+    app: AppContainer, repo_id: str, pr_id: int, result: ReviewResult
+) -> None:
+    """
+    Posta os reviews em threads gerais da PR em vez de uma por arquivo
+    "single": uma única thread (com o resumo); "per_directory": resumo + uma por diretório
+    """
+    behavior = app.config.behavior
+    azure_config = app.config.azure
+    pr_url = f"{azure_config.project_url()}/_git/{repo_id}/pullrequest/{pr_id}"
+
+    threads: list[tuple[str, list[FileReview], str]] = []
+    if behavior.post_mode == "single" and result.files:
+        stats = result.stats if behavior.post_summary_comment else None
+        comment = format_consolidated_comment(
+            "Code Review Automático", result.files, pr_url, stats=stats
+        )
+        threads = [("review", result.files, comment)]
+    elif behavior.post_mode == "per_directory":
+        if behavior.post_summary_comment and result.files:
+            try:
+                app.azure.post_summary_comment(repo_id, pr_id, result.stats)
+                print("  • Resumo postado")
+            except Exception as e:
+                print(f"  ✗ Erro ao postar resumo: {e}")
+
+        threads = [
+            (
+                f"review:{directory}",
+                file_reviews,
+                format_consolidated_comment(f"Review: `{directory}`", file_reviews, pr_url),
+            )
+            for directory, file_reviews in group_by_directory(result.files).items()
+        ]
+
+    def post(thread: tuple[str, list[FileReview], str]) -> bool | Exception:
+        key, _, comment = thread
+        try:
+            return app.azure.post_pr_comment(repo_id, pr_id, key, comment)
         except Exception as e:
-            print(f"  ✗ Erro: {file_review.filepath}: {e}")
+            return e
+
+    workers = max(1, min(app.config.limits.post_concurrency, len(threads)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(post, threads))
+
+    success = 0
+    for (key, file_reviews, _), outcome in zip(threads, outcomes, strict=True):
+        if isinstance(outcome, Exception):
+            print(f"  ✗ Erro: {key}: {outcome}")
+        elif outcome:
+            success += len(file_reviews)
+            print(f"  • {key} ({len(file_reviews)} arquivo(s))")
 
     print(f"\n✓ {success}/{len(result.files)} comentários postados")
 
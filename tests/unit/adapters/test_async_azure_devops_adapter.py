@@ -0,0 +1,480 @@
+"""
+Testes para AsyncAzureDevOpsAdapter e PooledAzureDevOpsAdapter
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from src.adapters.async_azure_devops_adapter import (
+    AsyncAzureDevOpsAdapter,
+    PooledAzureDevOpsAdapter,
+)
+from src.infrastructure.cache.http_cache import HttpValidatorCache
+from src.infrastructure.config.settings import (
+    AzureDevOpsConfig,
+    HttpConfig,
+    ReviewBehavior,
+    ReviewLimits,
+)
+from src.infrastructure.http.rate_limiter import RateLimiter
+from src.infrastructure.http.transport import HttpTransport
+
+
+class FakeAzureServer:
+    """Handler para httpx.MockTransport que simula a API do Azure DevOps."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files: dict[tuple[str, str], str] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self._route(request)
+        finally:
+            self.in_flight -= 1
+
+    def _route(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/pullrequests/42"):
+            return httpx.Response(
+                200,
+                json={
+                    "pullRequestId": 42,
+                    "title": "Async",
+                    "sourceRefName": "refs/heads/feature",
+                    "targetRefName": "refs/heads/main",
+                    "labels": [{"name": "bug"}],
+                },
+            )
+        if path.endswith("/iterations"):
+            if request.headers.get("If-None-Match") == '"it-3"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                json={"value": [{"id": 1, "sourceRefCommit": {"commitId": "c1"}}, {"id": 3}]},
+                headers={"ETag": '"it-3"'},
+            )
+        if path.endswith("/iterations/3/changes"):
+            entries = [{"item": {"path": "/a.py"}, "changeType": "edit"}]
+            if request.url.params.get("$compareTo") == "1":
+                entries = entries[:0]
+            return httpx.Response(200, json={"changeEntries": entries})
+        if path.endswith("/iterations/9/changes"):
+            skip = int(request.url.params["$skip"])
+            page = [{"item": {"path": f"/p{skip}.py"}}]
+            return httpx.Response(200, json={"changeEntries": page, "nextSkip": (skip + 1) % 3})
+        if path.endswith("/properties"):
+            if request.method == "PATCH":
+                return httpx.Response(200, json={})
+            value = {"CodeReviewBot.LastReviewedIteration": {"$value": "1"}}
+            return httpx.Response(200, json={"value": value})
+        if path.endswith("/diffs/commits"):
+            return httpx.Response(200, json={"commonCommit": "c-base"})
+        if path.endswith("/itemsbatch"):
+            value = []
+            for descriptor in json.loads(request.content)["itemDescriptors"]:
+                key = (descriptor["path"], descriptor["version"])
+                value.append([{"objectId": object_id(*key)}] if key in self.files else [])
+            return httpx.Response(200, json={"value": value})
+        if path.endswith("/blobs"):
+            wanted = set(json.loads(request.content))
+            blobs = {object_id(*key): text for key, text in self.files.items()}
+            return httpx.Response(200, content=make_zip({oid: blobs[oid] for oid in wanted}))
+        if path.endswith("/items") and request.url.params.get("$format") == "zip":
+            version = request.url.params["versionDescriptor.version"]
+            scope = request.url.params["scopePath"]
+            tree = {
+                name.removeprefix(scope).lstrip("/"): text
+                for (name, tree_version), text in self.files.items()
+                if tree_version == version and name.startswith(scope)
+            }
+            return httpx.Response(200, content=make_zip(tree))
+        if path.endswith("/items"):
+            key = (request.url.params["path"], request.url.params["versionDescriptor.version"])
+            if key not in self.files:
+                return httpx.Response(404)
+            return httpx.Response(200, text=self.files[key])
+        if path.endswith("/threads") and request.method == "GET":
+            return httpx.Response(200, json={"value": []})
+        if path.endswith("/threads") and request.method == "POST":
+            return httpx.Response(200, json={"id": len(self.requests)})
+        return httpx.Response(404)
+
+
+def object_id(path: str, version: str) -> str:
+    return hashlib.sha1(f"{path}@{version}".encode()).hexdigest()
+
+
+def make_zip(entries: dict[str, str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in entries.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+def make_config() -> AzureDevOpsConfig:
+    return AzureDevOpsConfig(org="org", project="proj", pat="token", max_connections=4)
+
+
+@pytest.fixture
+def server() -> FakeAzureServer:
+    return FakeAzureServer()
+
+
+@pytest.fixture
+def pooled(
+    server: FakeAzureServer, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[PooledAzureDevOpsAdapter]:
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    adapter = PooledAzureDevOpsAdapter(
+        make_config(),
+        ReviewBehavior(),
+        ReviewLimits(max_diff_lines_per_file=50),
+        transport=httpx.MockTransport(server),
+    )
+    yield adapter
+    adapter.close()
+
+
+def test_pooled_get_pr_info_and_files(pooled: PooledAzureDevOpsAdapter, server: FakeAzureServer):
+    """Testa que a fachada síncrona retorna os mesmos dados do adapter síncrono."""
+    pr_info = pooled.get_pr_info("repo", 42)
+    files = pooled.get_pr_files("repo", 42)
+
+    assert pr_info.source_branch == "feature"
+    assert pr_info.target_branch == "main"
+    assert pr_info.labels == ["bug"]
+    assert files == [{"item": {"path": "/a.py"}, "changeType": "edit"}]
+    assert server.requests[0].headers["Authorization"].startswith("Basic ")
+
+
+def test_pooled_pagination(pooled: PooledAzureDevOpsAdapter):
+    """Testa que iter_pr_files e get_pr_files seguem nextSkip até a última página."""
+    expected = [{"item": {"path": f"/p{i}.py"}} for i in range(3)]
+
+    assert list(pooled.iter_pr_files("repo", 42, iteration_id=9)) == expected
+    assert pooled.get_pr_files("repo", 42, iteration_id=9) == expected
+
+
+def test_pooled_incremental_iteration_tracking(
+    pooled: PooledAzureDevOpsAdapter, server: FakeAzureServer
+):
+    """Testa as operações do modo incremental pela fachada síncrona."""
+    assert pooled.get_latest_iteration("repo", 42) == 3
+    assert pooled.get_last_reviewed_iteration("repo", 42) == 1
+    assert pooled.get_pr_files("repo", 42, iteration_id=3, compare_to=1) == []
+
+    pooled.set_last_reviewed_iteration("repo", 42, 3)
+
+    patch = server.requests[-1]
+    assert patch.method == "PATCH"
+    assert patch.headers["Content-Type"] == "application/json-patch+json"
+    assert json.loads(patch.content)[0]["value"] == "3"
+
+
+def test_pooled_fetch_pr_snapshot(pooled: PooledAzureDevOpsAdapter, server: FakeAzureServer):
+    """Testa que o snapshot dispara PR e iterações juntos e traz a primeira página."""
+    snapshot = pooled.fetch_pr_snapshot("repo", 42, incremental=True)
+
+    assert snapshot.pr_info.title == "Async"
+    assert (snapshot.iteration_id, snapshot.last_reviewed_iteration) == (3, 1)
+    assert snapshot.compare_commit == "c1"
+    assert snapshot.changes == ()
+    assert server.max_in_flight >= 2
+    changes = [r for r in server.requests if r.url.path.endswith("/changes")]
+    assert changes[0].url.params["$compareTo"] == "1"
+
+
+def test_pooled_generate_diff_fetches_concurrently(
+    pooled: PooledAzureDevOpsAdapter, server: FakeAzureServer
+):
+    """Testa que o diff baixa arquivos em paralelo, limitado pelo pool."""
+    files: list[Any] = []
+    for i in range(5):
+        path = f"/src/f{i}.py"
+        server.files[(path, "main")] = "x\n"
+        server.files[(path, "feature")] = "x\ny\n"
+        files.append({"item": {"path": path}, "changeType": "edit"})
+    files.append({"item": {"path": "/src/missing.py"}, "changeType": "edit"})
+
+    diff_text, additions, deletions = pooled.generate_diff("repo", files, "feature", "main")
+
+    assert additions == 5
+    assert deletions == 0
+    assert "Erro lendo arquivo" in diff_text
+    assert diff_text.index("`/src/f0.py`") < diff_text.index("`/src/f4.py`")
+    assert 1 < server.max_in_flight <= 4
+
+
+def test_pooled_generate_diff_skips_binary_and_large_files(
+    server: FakeAzureServer, monkeypatch: pytest.MonkeyPatch
+):
+    """Testa que o download em stream aborta binários e arquivos acima do limite."""
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    server.files[("/logo.dat", "main")] = "\0\1\2"
+    server.files[("/logo.dat", "feature")] = "\0\1\3"
+    server.files[("/big.py", "main")] = "a\n" * 200
+    server.files[("/big.py", "feature")] = "b\n" * 200
+    files: list[Any] = [
+        {"item": {"path": "/logo.dat"}, "changeType": "edit"},
+        {"item": {"path": "/big.py"}, "changeType": "edit"},
+    ]
+    adapter = PooledAzureDevOpsAdapter(
+        make_config(),
+        ReviewBehavior(),
+        ReviewLimits(max_diff_lines_per_file=50, max_file_bytes=100),
+        transport=httpx.MockTransport(server),
+    )
+    try:
+        diff_text, additions, _ = adapter.generate_diff("repo", files, "feature", "main")
+    finally:
+        adapter.close()
+
+    assert additions == 0
+    assert "⏭️ Ignorado: arquivo binário" in diff_text
+    assert "⏭️ Ignorado: arquivo muito grande" in diff_text
+
+
+class NoSyncSession:
+    """Sessão síncrona que falha em qualquer requisição: tudo deve sair pelo pool."""
+
+    def __init__(self) -> None:
+        self.headers: dict[str, str] = {}
+
+    def mount(self, prefix: str, adapter: Any) -> None:
+        pass
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("requisição pela sessão síncrona")
+
+    get = post = patch = request
+
+
+@pytest.mark.parametrize("fetch_mode", ["per_file", "batch", "archive"])
+def test_pooled_diff_requests_use_the_async_pool(
+    server: FakeAzureServer, monkeypatch: pytest.MonkeyPatch, fetch_mode: str
+):
+    """Testa que merge base, itemsbatch, blobs e zip do diff saem pelo pool assíncrono."""
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", NoSyncSession)
+    server.files[("/src/a.py", "c-base")] = "x\n"
+    server.files[("/src/a.py", "c-src")] = "x\ny\n"
+    files: list[Any] = [{"item": {"path": "/src/a.py"}, "changeType": "edit"}]
+    adapter = PooledAzureDevOpsAdapter(
+        make_config(),
+        ReviewBehavior(fetch_mode=fetch_mode),
+        ReviewLimits(max_diff_lines_per_file=50),
+        transport=httpx.MockTransport(server),
+    )
+    try:
+        diff_text, additions, _ = adapter.generate_diff(
+            "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+        )
+    finally:
+        adapter.close()
+
+    assert additions == 1, diff_text
+    endpoints = {request.url.path.rsplit("/", 1)[-1] for request in server.requests}
+    assert {"commits", "itemsbatch"} <= endpoints
+    if fetch_mode == "batch":
+        assert "blobs" in endpoints
+    if fetch_mode == "archive":
+        assert any(r.url.params.get("$format") == "zip" for r in server.requests)
+
+
+def test_pooled_posts_threads(pooled: PooledAzureDevOpsAdapter, server: FakeAzureServer):
+    """Testa que comentários e resumo usam o mesmo payload do adapter síncrono."""
+    assert pooled.post_comment("repo", 42, "/a.py", 3, 9, "texto") is True
+    stats = {"files_reviewed": 1, "critical": 0, "important": 1, "suggestions": 2}
+    assert pooled.post_summary_comment("repo", 42, stats) is True
+
+    posts = [request for request in server.requests if request.method == "POST"]
+    assert [request.method for request in server.requests].count("GET") == 1
+    comment_payload = json.loads(posts[0].content)
+    summary_payload = json.loads(posts[1].content)
+    assert comment_payload["threadContext"]["filePath"] == "/a.py"
+    assert comment_payload["threadContext"]["rightFileEnd"]["line"] == 9
+    assert "Arquivos analisados: 1" in summary_payload["comments"][0]["content"]
+
+
+def test_async_adapter_raises_on_http_error(server: FakeAzureServer):
+    """Testa que erros HTTP são propagados pelo cliente assíncrono."""
+    adapter = AsyncAzureDevOpsAdapter(make_config(), transport=httpx.MockTransport(server))
+
+    async def run() -> None:
+        try:
+            await adapter.get_pr_info("repo", 404)
+        finally:
+            await adapter.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_async_adapter_conditional_get(server: FakeAzureServer, tmp_path: Path):
+    """Testa que o cliente assíncrono revalida com If-None-Match e usa o cache no 304."""
+    cache = HttpValidatorCache(tmp_path)
+    adapter = AsyncAzureDevOpsAdapter(
+        make_config(), transport=httpx.MockTransport(server), http_cache=cache
+    )
+
+    async def run() -> list[int | None]:
+        try:
+            return [await adapter.get_latest_iteration("repo", 42) for _ in range(2)]
+        finally:
+            await adapter.aclose()
+
+    assert asyncio.run(run()) == [3, 3]
+    assert server.requests[1].headers["If-None-Match"] == '"it-3"'
+    assert cache.stats.hits == 1
+
+
+def test_async_adapter_waits_and_retries_throttled_requests():
+    """Testa que um 429 pausa o agendador e a requisição é repetida."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return httpx.Response(200, json={"value": [{"id": 5}]})
+
+    limiter = RateLimiter(rate=100, burst=10)
+    adapter = AsyncAzureDevOpsAdapter(
+        make_config(), transport=httpx.MockTransport(handler), rate_limiter=limiter
+    )
+
+    async def run() -> int | None:
+        try:
+            return await adapter.get_latest_iteration("repo", 42)
+        finally:
+            await adapter.aclose()
+
+    assert asyncio.run(run()) == 5
+    assert len(calls) == 2
+
+
+def test_async_adapter_runs_rate_limiter_off_the_event_loop():
+    """Testa que reserve/observe (transações SQLite) não rodam na thread do event loop."""
+    threads: set[int] = set()
+
+    class RecordingLimiter(RateLimiter):
+        def reserve(self) -> float:
+            threads.add(threading.get_ident())
+            return super().reserve()
+
+        def observe(self, status_code: int, headers: Any) -> None:
+            threads.add(threading.get_ident())
+            super().observe(status_code, headers)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"value": [{"id": 5}]})
+
+    adapter = AsyncAzureDevOpsAdapter(
+        make_config(),
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RecordingLimiter(rate=100, burst=10),
+    )
+
+    async def run() -> int | None:
+        try:
+            return await adapter.get_latest_iteration("repo", 42)
+        finally:
+            await adapter.aclose()
+
+    assert asyncio.run(run()) == 5
+    assert threads and threading.get_ident() not in threads
+
+
+def test_async_adapter_retries_throttled_requests_without_limiter():
+    """Testa que sem agendador o 429 ainda é repetido após o Retry-After."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return httpx.Response(200, json={"value": [{"id": 5}]})
+
+    adapter = AsyncAzureDevOpsAdapter(make_config(), transport=httpx.MockTransport(handler))
+
+    async def run() -> int | None:
+        try:
+            return await adapter.get_latest_iteration("repo", 42)
+        finally:
+            await adapter.aclose()
+
+    assert asyncio.run(run()) == 5
+    assert len(calls) == 2
+
+
+def test_async_adapter_retries_server_errors_only_on_idempotent_methods():
+    """Testa que 5xx em GET é repetido (como na sessão síncrona) e POST não."""
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if request.method == "GET" and calls.count("GET") < 3:
+            return httpx.Response(503)
+        if request.method == "GET":
+            return httpx.Response(200, json={"value": [{"id": 5}]})
+        return httpx.Response(502)
+
+    http = HttpTransport(HttpConfig(max_retries=3, backoff_factor=0), "token")
+    adapter = AsyncAzureDevOpsAdapter(
+        make_config(), transport=httpx.MockTransport(handler), http=http
+    )
+
+    async def run() -> tuple[int | None, int]:
+        try:
+            iteration = await adapter.get_latest_iteration("repo", 42)
+            resp = await adapter._send("POST", f"{adapter.base_url}/threads", json={})
+            return iteration, resp.status_code
+        finally:
+            await adapter.aclose()
+
+    assert asyncio.run(run()) == (5, 502)
+    assert calls == ["GET", "GET", "GET", "POST"]
+
+
+def test_async_concurrent_posts_to_same_file_do_not_duplicate_threads():
+    """Testa que publicações concorrentes do mesmo arquivo criam uma única thread."""
+    posts: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"value": []})
+        posts.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": len(posts), "comments": [{"id": 1}]})
+
+    adapter = AsyncAzureDevOpsAdapter(make_config(), transport=httpx.MockTransport(handler))
+
+    async def run() -> list[bool]:
+        try:
+            return await asyncio.gather(
+                *(adapter.post_comment("repo", 5, "/a.py", 1, 2, "igual") for _ in range(4))
+            )
+        finally:
+            await adapter.aclose()
+
+    assert all(asyncio.run(run()))
+    assert len(posts) == 1
@@ -5,23 +5,37 @@ Testes para AzureDevOpsAdapter
 from __future__ import annotations
 
 import base64
+import json
+import threading
+import time
 from collections import deque
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any
 
 import pytest
 import requests
 from pytest import MonkeyPatch
-from src.adapters.azure_devops_adapter import AzureDevOpsAdapter
+from src.adapters.azure_devops_adapter import (
+    FINGERPRINT_PROPERTY,
+    AzureDevOpsAdapter,
+    build_comment_payload,
+    comment_fingerprint,
+)
+from src.infrastructure.cache.http_cache import HttpValidatorCache
 from src.infrastructure.config.settings import AzureDevOpsConfig
 
 
 class FakeResponse:
     """Resposta fake com suporte a json/raise_for_status."""
 
-    def __init__(self, json_data: Any, status_code: int = 200):
+    def __init__(
+        self, json_data: Any, status_code: int = 200, headers: dict[str, str] | None = None
+    ):
         self._json = json_data
         self.status_code = status_code
+        self.headers = headers or {}
 
     def json(self) -> Any:
         return self._json
@@ -39,6 +53,7 @@ class FakeSession:
         self.mounted: dict[str, Any] = {}
         self.get_calls: list[dict[str, Any]] = []
         self.post_calls: list[dict[str, Any]] = []
+        self.patch_calls: list[dict[str, Any]] = []
         self._get_responses: deque[FakeResponse] = deque()
         self._post_responses: deque[FakeResponse] = deque()
 
@@ -51,8 +66,37 @@ class FakeSession:
     def queue_post(self, response: FakeResponse) -> None:
         self._post_responses.append(response)
 
-    def get(self, url: str, params: dict[str, Any] | None = None, timeout: int | None = None):
-        self.get_calls.append({"url": url, "params": params, "timeout": timeout})
+    def patch(
+        self,
+        url: str,
+        data: str | None = None,
+        json: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: int | None = None,
+    ):
+        self.patch_calls.append(
+            {
+                "url": url,
+                "data": data,
+                "json": json,
+                "params": params,
+                "headers": headers,
+                "timeout": timeout,
+            }
+        )
+        return FakeResponse({})
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: int | None = None,
+    ):
+        self.get_calls.append(
+            {"url": url, "params": params, "headers": headers, "timeout": timeout}
+        )
         if not self._get_responses:
             raise AssertionError("Sem resposta fake para GET")
         return self._get_responses.popleft()
@@ -64,9 +108,7 @@ class FakeSession:
         params: dict[str, Any] | None = None,
         timeout: int | None = None,
     ):
-        self.post_calls.append(
-            {"url": url, "json": json, "params": params, "timeout": timeout}
-        )
+        self.post_calls.append({"url": url, "json": json, "params": params, "timeout": timeout})
         if not self._post_responses:
             raise AssertionError("Sem resposta fake para POST")
         return self._post_responses.popleft()
@@ -89,9 +131,7 @@ def make_adapter(monkeypatch: MonkeyPatch) -> AdapterFactory:
     def _make() -> tuple[AzureDevOpsAdapter, FakeSession, AzureDevOpsConfig]:
         monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
         session = FakeSession()
-        monkeypatch.setattr(
-            "src.adapters.azure_devops_adapter.requests.Session", lambda: session
-        )
+        monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
         config = make_config()
         adapter = AzureDevOpsAdapter(config)
         return adapter, session, config
@@ -122,6 +162,8 @@ def test_get_pr_info_returns_normalized_pull_request(make_adapter: AdapterFactor
                 "targetRefName": "refs/heads/main",
                 "isDraft": True,
                 "labels": [{"name": "bug"}, {"name": "important"}],
+                "lastMergeSourceCommit": {"commitId": "abc123"},
+                "lastMergeTargetCommit": {"commitId": "def456"},
             }
         )
     )
@@ -134,6 +176,8 @@ def test_get_pr_info_returns_normalized_pull_request(make_adapter: AdapterFactor
     assert pr_info.target_branch == "main"
     assert pr_info.is_draft is True
     assert pr_info.labels == ["bug", "important"]
+    assert pr_info.source_commit == "abc123"
+    assert pr_info.target_commit == "def456"
     assert session.get_calls[0]["url"].endswith("/pullrequests/42")
 
 
@@ -173,9 +217,170 @@ def test_get_pr_files_returns_empty_when_no_iterations(make_adapter: AdapterFact
     assert len(session.get_calls) == 1
 
 
+def test_iter_pr_files_follows_pagination(make_adapter: AdapterFactory):
+    """Testa que as páginas são seguidas via nextSkip e buscadas sob demanda."""
+    adapter, session, _ = make_adapter()
+    session.queue_get(
+        FakeResponse({"changeEntries": [{"item": {"path": "/a.py"}}], "nextSkip": 1, "nextTop": 1})
+    )
+    session.queue_get(FakeResponse({"changeEntries": [{"item": {"path": "/b.py"}}], "nextSkip": 0}))
+
+    entries = adapter.iter_pr_files("repo", 99, iteration_id=2)
+
+    assert next(entries) == {"item": {"path": "/a.py"}}
+    assert len(session.get_calls) == 1
+    assert list(entries) == [{"item": {"path": "/b.py"}}]
+    assert [call["params"]["$skip"] for call in session.get_calls] == [0, 1]
+    assert session.get_calls[0]["params"]["$top"] == 100
+
+
+def test_get_pr_files_compares_to_previous_iteration(make_adapter: AdapterFactory):
+    """Testa que compare_to usa $compareTo e iteration_id evita buscar iterações."""
+    adapter, session, _ = make_adapter()
+    session.queue_get(FakeResponse({"changeEntries": [{"item": {"path": "/a.py"}}]}))
+
+    files = adapter.get_pr_files("repo", 99, iteration_id=5, compare_to=3)
+
+    assert files == [{"item": {"path": "/a.py"}}]
+    assert len(session.get_calls) == 1
+    assert session.get_calls[0]["url"].endswith("/pullrequests/99/iterations/5/changes")
+    assert session.get_calls[0]["params"]["$compareTo"] == 3
+
+
+class RoutedSession(FakeSession):
+    """Session fake que responde GETs pelo final da URL (ordem livre, p/ chamadas paralelas)."""
+
+    def __init__(self, routes: dict[str, Any]):
+        super().__init__()
+        self.routes = routes
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: int | None = None,
+    ):
+        self.get_calls.append({"url": url, "params": params})
+        suffix = next(suffix for suffix in self.routes if url.endswith(suffix))
+        return FakeResponse(self.routes[suffix])
+
+
+def test_fetch_pr_snapshot_combines_parallel_requests(monkeypatch: MonkeyPatch):
+    """Testa que o snapshot reúne PR, iterações, última revisada e a primeira página."""
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    session = RoutedSession(
+        {
+            "/pullrequests/7": {
+                "pullRequestId": 7,
+                "title": "Snapshot",
+                "sourceRefName": "refs/heads/feature",
+                "targetRefName": "refs/heads/main",
+            },
+            "/iterations": {
+                "value": [
+                    {"id": 2, "sourceRefCommit": {"commitId": "c2"}},
+                    {"id": 4, "sourceRefCommit": {"commitId": "c4"}},
+                ]
+            },
+            "/properties": {"value": {"CodeReviewBot.LastReviewedIteration": {"$value": "2"}}},
+            "/iterations/4/changes": {
+                "changeEntries": [{"item": {"path": "/a.py"}}],
+                "nextSkip": 1,
+            },
+        }
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = AzureDevOpsAdapter(make_config())
+
+    snapshot = adapter.fetch_pr_snapshot("repo", 7, incremental=True)
+
+    assert snapshot.pr_info.title == "Snapshot"
+    assert (snapshot.iteration_id, snapshot.last_reviewed_iteration) == (4, 2)
+    # Base do diff incremental: a origem da iteração revisada, não a última
+    assert snapshot.compare_commit == "c2"
+    assert snapshot.changes == ({"item": {"path": "/a.py"}},)
+    assert snapshot.next_skip == 1
+    changes_call = next(c for c in session.get_calls if c["url"].endswith("/changes"))
+    assert changes_call["params"]["$compareTo"] == 2
+    assert len(session.get_calls) == 4
+
+
+def test_fetch_pr_snapshot_skips_changes_when_already_reviewed(monkeypatch: MonkeyPatch):
+    """Testa que a página de mudanças não é buscada se a iteração já foi revisada."""
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    session = RoutedSession(
+        {
+            "/pullrequests/7": {
+                "pullRequestId": 7,
+                "title": "Snapshot",
+                "sourceRefName": "refs/heads/feature",
+                "targetRefName": "refs/heads/main",
+            },
+            "/iterations": {"value": [{"id": 3}]},
+            "/properties": {"value": {"CodeReviewBot.LastReviewedIteration": {"$value": "3"}}},
+        }
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = AzureDevOpsAdapter(make_config())
+
+    snapshot = adapter.fetch_pr_snapshot("repo", 7, incremental=True)
+
+    assert snapshot.already_reviewed is True
+    assert snapshot.changes == ()
+    assert not any(c["url"].endswith("/changes") for c in session.get_calls)
+
+
+def test_get_latest_iteration(make_adapter: AdapterFactory):
+    """Testa que get_latest_iteration retorna a última iteração ou None."""
+    adapter, session, _ = make_adapter()
+    session.queue_get(FakeResponse({"value": [{"id": 1}, {"id": 4}]}))
+    session.queue_get(FakeResponse({"value": []}))
+
+    assert adapter.get_latest_iteration("repo", 1) == 4
+    assert adapter.get_latest_iteration("repo", 1) is None
+
+
+def test_get_last_reviewed_iteration_reads_pr_property(make_adapter: AdapterFactory):
+    """Testa leitura da última iteração revisada nas propriedades da PR."""
+    adapter, session, _ = make_adapter()
+    session.queue_get(
+        FakeResponse(
+            {
+                "value": {
+                    "CodeReviewBot.LastReviewedIteration": {
+                        "$type": "System.String",
+                        "$value": "3",
+                    }
+                }
+            }
+        )
+    )
+    session.queue_get(FakeResponse({"value": {}}))
+
+    assert adapter.get_last_reviewed_iteration("repo", 10) == 3
+    assert adapter.get_last_reviewed_iteration("repo", 10) is None
+    assert session.get_calls[0]["url"].endswith("/pullRequests/10/properties")
+
+
+def test_set_last_reviewed_iteration_patches_pr_property(make_adapter: AdapterFactory):
+    """Testa que a iteração revisada é gravada via JSON Patch."""
+    adapter, session, _ = make_adapter()
+
+    adapter.set_last_reviewed_iteration("repo", 10, 7)
+
+    call = session.patch_calls[0]
+    assert call["url"].endswith("/pullRequests/10/properties")
+    assert call["headers"]["Content-Type"] == "application/json-patch+json"
+    assert json.loads(call["data"]) == [
+        {"op": "add", "path": "/CodeReviewBot.LastReviewedIteration", "value": "7"}
+    ]
+
+
 def test_post_comment_truncates_long_payload(make_adapter: AdapterFactory):
     """Testa que post_comment trunca comentários grandes."""
     adapter, session, _ = make_adapter()
+    session.queue_get(FakeResponse({"value": []}))
     session.queue_post(FakeResponse({}, status_code=200))
 
     huge_comment = "A" * 150500
@@ -194,6 +399,7 @@ def test_post_comment_truncates_long_payload(make_adapter: AdapterFactory):
 def test_post_summary_comment_formats_stats(make_adapter: AdapterFactory):
     """Testa que post_summary_comment monta texto com estatísticas."""
     adapter, session, _ = make_adapter()
+    session.queue_get(FakeResponse({"value": []}))
     session.queue_post(FakeResponse({}, status_code=200))
 
     stats = {"files_reviewed": 2, "critical": 1, "important": 3, "suggestions": 4}
@@ -204,6 +410,163 @@ def test_post_summary_comment_formats_stats(make_adapter: AdapterFactory):
     content = payload["comments"][0]["content"]
     assert "Arquivos analisados: 2" in content
     assert "Comentários: 1🔴 3🟡 4🟢" in content
-AdapterFactory = Callable[
-    [], tuple[AzureDevOpsAdapter, "FakeSession", AzureDevOpsConfig]
-]
+
+
+AdapterFactory = Callable[[], tuple[AzureDevOpsAdapter, "FakeSession", AzureDevOpsConfig]]
+
+
+def test_conditional_get_serves_not_modified_from_cache(
+    make_adapter: AdapterFactory, tmp_path: Path
+):
+    """Testa que um 304 reaproveita o corpo guardado junto com o ETag."""
+    adapter, session, _ = make_adapter()
+    adapter.http_cache = HttpValidatorCache(tmp_path)
+    iterations = {"value": [{"id": 1}, {"id": 2}]}
+    session.queue_get(FakeResponse(iterations, headers={"ETag": '"v1"'}))
+    session.queue_get(FakeResponse(None, status_code=304))
+
+    assert adapter.get_latest_iteration("repo", 42) == 2
+    assert adapter.get_latest_iteration("repo", 42) == 2
+
+    assert session.get_calls[0]["headers"] == {}
+    assert session.get_calls[1]["headers"] == {"If-None-Match": '"v1"'}
+    assert (adapter.http_cache.stats.hits, adapter.http_cache.stats.misses) == (1, 1)
+
+
+def existing_thread(
+    thread_id: int, file_path: str, start: int, end: int, fingerprint: str, status: str = "active"
+) -> dict[str, Any]:
+    """Thread no formato devolvido pelo GET threads da API."""
+    return {
+        "id": thread_id,
+        "status": status,
+        "comments": [{"id": 1, "content": "antigo"}],
+        "threadContext": {
+            "filePath": file_path,
+            "rightFileStart": {"line": start},
+            "rightFileEnd": {"line": end},
+        },
+        "properties": {FINGERPRINT_PROPERTY: {"$type": "System.String", "$value": fingerprint}},
+    }
+
+
+def test_comment_payload_carries_fingerprint():
+    """Testa que a thread criada leva o fingerprint do conteúdo nas propriedades."""
+    payload = build_comment_payload("/a.py", 1, 2, "texto")
+
+    fingerprint = payload["properties"][FINGERPRINT_PROPERTY]["$value"]
+    assert fingerprint == comment_fingerprint("/a.py", "texto")
+    assert fingerprint != comment_fingerprint("/b.py", "texto")
+
+
+def test_post_comment_reuses_existing_bot_threads(make_adapter: AdapterFactory):
+    """Testa que re-execuções ignoram, atualizam ou resolvem threads em vez de duplicar."""
+    adapter, session, _ = make_adapter()
+    same = comment_fingerprint("/same.py", "igual")
+    session.queue_get(
+        FakeResponse(
+            {
+                "value": [
+                    existing_thread(10, "/same.py", 1, 5, same),
+                    existing_thread(11, "/edit.py", 10, 20, "velho"),
+                    existing_thread(12, "/moved.py", 1, 3, "velho"),
+                    {"id": 13, "comments": [{"id": 1}], "threadContext": {"filePath": "/x.py"}},
+                ]
+            }
+        )
+    )
+    session.queue_post(FakeResponse({"id": 99, "comments": [{"id": 1}]}))
+    session.queue_post(FakeResponse({"id": 100, "comments": [{"id": 1}]}))
+
+    assert adapter.post_comment("repo", 5, "/same.py", 1, 5, "igual")
+    assert adapter.post_comment("repo", 5, "/edit.py", 15, 25, "novo")
+    assert adapter.post_comment("repo", 5, "/moved.py", 40, 50, "novo")
+    assert adapter.post_comment("repo", 5, "/x.py", 1, 2, "novo")
+    assert adapter.post_comment("repo", 5, "/moved.py", 40, 50, "novo")
+
+    assert len(session.get_calls) == 1
+    patched = [(call["url"].split("/threads/")[1], call["json"]) for call in session.patch_calls]
+    assert patched[0] == ("11/comments/1", {"content": "novo"})
+    assert patched[1][0] == "11"
+    assert patched[2] == ("12", {"status": 2})
+    assert len(patched) == 3
+    # /moved.py é substituído e /x.py (thread de outra pessoa) ganha thread nova; o
+    # último post repete /moved.py e cai no fingerprint da thread 99
+    assert [call["json"]["threadContext"]["filePath"] for call in session.post_calls] == [
+        "/moved.py",
+        "/x.py",
+    ]
+
+
+class SlowPostSession(FakeSession):
+    """Session fake cujo POST demora, para sobrepor publicações concorrentes."""
+
+    def __init__(self):
+        super().__init__()
+        self._ids = iter(range(100, 200))
+        self._lock = threading.Lock()
+
+    def post(
+        self,
+        url: str,
+        json: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout: int | None = None,
+    ):
+        time.sleep(0.05)
+        with self._lock:
+            self.post_calls.append({"url": url, "json": json})
+            return FakeResponse({"id": next(self._ids), "comments": [{"id": 1}]})
+
+
+def test_concurrent_posts_to_same_file_do_not_duplicate_threads(monkeypatch: MonkeyPatch):
+    """Testa que plan, POST e record são atômicos por arquivo com post_concurrency > 1."""
+    monkeypatch.delenv("SYSTEM_ACCESSTOKEN", raising=False)
+    session = SlowPostSession()
+    session.queue_get(FakeResponse({"value": []}))
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = AzureDevOpsAdapter(make_config())
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: adapter.post_comment("repo", 5, "/a.py", 1, 2, "igual"), range(4)
+            )
+        )
+
+    assert all(results)
+    assert len(session.post_calls) == 1
+
+
+def test_retry_does_not_repeat_posts(make_adapter: AdapterFactory):
+    """Testa que o retry automático não reenvia POST (evita threads duplicadas)."""
+    _, session, _ = make_adapter()
+
+    retry = session.mounted["https://"].max_retries
+    assert "POST" not in retry.allowed_methods
+    assert "GET" in retry.allowed_methods
+
+
+def test_post_pr_comment_updates_thread_with_same_key(make_adapter: AdapterFactory):
+    """Testa que a thread geral é identificada pela chave e atualizada em re-execuções."""
+    adapter, session, _ = make_adapter()
+    previous = {
+        "id": 30,
+        "status": "active",
+        "comments": [{"id": 4}],
+        "properties": {
+            FINGERPRINT_PROPERTY: {"$value": "antigo"},
+            "CodeReviewBot.ThreadKey": {"$value": "review:/src"},
+        },
+    }
+    session.queue_get(FakeResponse({"value": [previous]}))
+    session.queue_post(FakeResponse({"id": 31}))
+
+    assert adapter.post_pr_comment("repo", 5, "review:/src", "novo")
+    assert adapter.post_pr_comment("repo", 5, "review:/lib", "novo")
+
+    assert session.patch_calls[0]["url"].endswith("/threads/30/comments/4")
+    assert len(session.post_calls) == 1
+    payload = session.post_calls[0]["json"]
+    assert "threadContext" not in payload
+    assert payload["properties"]["CodeReviewBot.ThreadKey"]["$value"] == "review:/lib"
@@ -3,17 +3,27 @@ Testes para DiffAdapter
 """
 
 import base64
+import io
+import threading
+import time
+import zipfile
+from pathlib import Path
 from typing import Any
 
 import pytest
+import requests
 from src.adapters.diff_adapter import DiffAdapter
+from src.infrastructure.cache.blob_cache import BlobCache
 from src.infrastructure.config.settings import AzureDevOpsConfig, ReviewBehavior, ReviewLimits
+from src.infrastructure.diff.engines import HistogramEngine
 
 
-def make_adapter(max_diff_lines: int = 3) -> DiffAdapter:
+def make_adapter(max_diff_lines: int = 3, fetch_concurrency: int = 8) -> DiffAdapter:
     """Cria adapter configurado para testes."""
-    behavior = ReviewBehavior()
-    limits = ReviewLimits(max_diff_lines_per_file=max_diff_lines)
+    behavior = ReviewBehavior(skip_generated=False)
+    limits = ReviewLimits(
+        max_diff_lines_per_file=max_diff_lines, fetch_concurrency=fetch_concurrency
+    )
     azure_config = AzureDevOpsConfig(org="org", project="proj", pat="token")
     return DiffAdapter(behavior, limits, azure_config)
 
@@ -62,20 +72,47 @@ def test_truncate_diff_cuts_when_exceeding_limit():
 
 
 class FakeResponse:
-    def __init__(self, text: str):
+    def __init__(self, text: str, status_code: int = 200):
         self.text = text
+        self.content = text.encode()
+        self.status_code = status_code
+        self.headers: dict[str, str] = {}
+
+    def __enter__(self) -> "FakeResponse":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"status: {self.status_code}")
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
 
 
 class FakeSession:
     def __init__(self):
         self.headers: dict[str, str] = {}
+        self.mounted: dict[str, Any] = {}
         self.get_calls: list[dict[str, object]] = []
         self._queue: list[object] = []
 
+    def mount(self, prefix: str, adapter: Any) -> None:
+        self.mounted[prefix] = adapter
+
     def queue(self, response: object) -> None:
         self._queue.append(response)
 
-    def get(self, url: str, params: dict[str, str] | None = None, timeout: int | None = None):
+    def get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        timeout: Any = None,
+        stream: bool = False,
+    ):
         self.get_calls.append({"url": url, "params": params, "timeout": timeout})
         if not self._queue:
             raise AssertionError("Sem resposta fake")
@@ -88,19 +125,20 @@ class FakeSession:
 def test_setup_session_configures_auth_header(monkeypatch: pytest.MonkeyPatch):
     """Testa que _setup_session adiciona header Authorization básico."""
     session = FakeSession()
-    monkeypatch.setattr("src.adapters.diff_adapter.requests.Session", lambda: session)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
 
     adapter = make_adapter()
 
     expected = base64.b64encode(b":token").decode()
     assert session.headers["Authorization"] == f"Basic {expected}"
     assert adapter.session is session
+    assert "https://" in session.mounted
 
 
 def test_generate_diff_builds_output(monkeypatch: pytest.MonkeyPatch):
     """Testa geração de diff com truncamento e contagem de linhas."""
     session = FakeSession()
-    monkeypatch.setattr("src.adapters.diff_adapter.requests.Session", lambda: session)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
 
     adapter = make_adapter(max_diff_lines=3)
 
@@ -111,9 +149,7 @@ def test_generate_diff_builds_output(monkeypatch: pytest.MonkeyPatch):
 
     files: list[Any] = [{"item": {"path": "/src/app.py"}, "changeType": "edit"}]
 
-    diff_text, additions, deletions = adapter.generate_diff(
-        "repo", files, "feature", "main"
-    )
+    diff_text, additions, deletions = adapter.generate_diff("repo", files, "feature", "main")
 
     assert "Arquivo 1" in diff_text
     assert "```diff" in diff_text
@@ -125,7 +161,7 @@ def test_generate_diff_builds_output(monkeypatch: pytest.MonkeyPatch):
 def test_generate_diff_handles_errors(monkeypatch: pytest.MonkeyPatch):
     """Testa que erros ao buscar arquivo são reportados no diff."""
     session = FakeSession()
-    monkeypatch.setattr("src.adapters.diff_adapter.requests.Session", lambda: session)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
 
     adapter = make_adapter()
 
@@ -133,10 +169,870 @@ def test_generate_diff_handles_errors(monkeypatch: pytest.MonkeyPatch):
 
     files: list[Any] = [{"item": {"path": "/src/fail.py"}, "changeType": "edit"}]
 
-    diff_text, additions, deletions = adapter.generate_diff(
-        "repo", files, "source", "target"
-    )
+    diff_text, additions, deletions = adapter.generate_diff("repo", files, "source", "target")
 
     assert "Erro lendo arquivo" in diff_text
     assert additions == 0
     assert deletions == 0
+
+
+class KeyedSession(FakeSession):
+    """Session fake que responde por (path, branch) e mede concorrência."""
+
+    def __init__(self, contents: dict[tuple[str, str], str], delay: float = 0.0):
+        super().__init__()
+        self.contents = contents
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        timeout: Any = None,
+        stream: bool = False,
+    ):
+        assert params is not None
+        with self._lock:
+            self.get_calls.append({"url": url, "params": params, "timeout": timeout})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            content = self.contents[(params["path"], params["versionDescriptor.version"])]
+            if content == "<erro>":
+                raise RuntimeError(f"falha em {params['path']}")
+            return FakeResponse(content)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_generate_diff_concurrent_fetch_preserves_order(monkeypatch: pytest.MonkeyPatch):
+    """Testa que downloads paralelos mantêm ordem e contagens do modo sequencial."""
+    paths = [f"/src/file{i}.py" for i in range(6)]
+    contents: dict[tuple[str, str], str] = {}
+    for i, path in enumerate(paths):
+        contents[(path, "main")] = "a\nb\n"
+        contents[(path, "feature")] = "a\nb\n" + "novo\n" * (i + 1)
+    contents[(paths[3], "feature")] = "<erro>"
+
+    files: list[Any] = [{"item": {"path": p}, "changeType": "edit"} for p in paths]
+
+    results = []
+    for concurrency in (1, 4):
+        session = KeyedSession(contents, delay=0.01)
+        monkeypatch.setattr(
+            "src.infrastructure.http.transport.requests.Session", lambda s=session: s
+        )
+        adapter = make_adapter(max_diff_lines=50, fetch_concurrency=concurrency)
+        results.append(adapter.generate_diff("repo", files, "feature", "main"))
+        assert len(session.get_calls) == 12
+        if concurrency == 1:
+            assert session.max_in_flight == 1
+        else:
+            assert session.max_in_flight > 1
+
+    sequential, concurrent = results
+    assert concurrent == sequential
+
+    diff_text, additions, deletions = concurrent
+    positions = [diff_text.index(f"`{path}`") for path in paths]
+    assert positions == sorted(positions)
+    assert "falha em /src/file3.py" in diff_text
+    assert additions == 1 + 2 + 3 + 5 + 6
+    assert deletions == 0
+
+
+class UrlSession(FakeSession):
+    """Session fake que responde pelo último segmento da URL ou pelo path do item."""
+
+    def __init__(self, contents: dict[str, str], merge_base: str | None = None):
+        super().__init__()
+        self.contents = contents
+        self.merge_base = merge_base
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        timeout: Any = None,
+        stream: bool = False,
+    ):
+        self.get_calls.append({"url": url, "params": params, "timeout": timeout})
+        if url.endswith("/diffs/commits"):
+            return FakeJsonResponse({"commonCommit": self.merge_base})
+        key = url.rsplit("/", 1)[-1]
+        if key == "items" and params is not None:
+            key = f"{params['path']}@{params['versionDescriptor.version']}"
+        return FakeResponse(self.contents[key])
+
+
+def test_generate_diff_prefers_blob_object_ids(monkeypatch: pytest.MonkeyPatch):
+    """Testa que objectIds dos changeEntries são usados no lugar das branches."""
+    session = UrlSession({"base-sha": "a\n", "new-sha": "a\nb\n"})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = make_adapter(max_diff_lines=50)
+
+    files: list[Any] = [
+        {
+            "item": {"path": "/src/app.py", "objectId": "new-sha", "originalObjectId": "base-sha"},
+            "changeType": "edit",
+        }
+    ]
+
+    _, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (1, 0)
+    urls = [call["url"] for call in session.get_calls]
+    assert urls == [
+        "https://dev.azure.com/org/proj/_apis/git/repositories/repo/blobs/base-sha",
+        "https://dev.azure.com/org/proj/_apis/git/repositories/repo/blobs/new-sha",
+    ]
+
+
+def test_generate_diff_falls_back_to_commits(monkeypatch: pytest.MonkeyPatch):
+    """Testa que, sem objectIds, o conteúdo é buscado pelos commits da PR."""
+    session = UrlSession(
+        {"/src/app.py@c-base": "a\n", "/src/app.py@c-src": "b\n"}, merge_base="c-base"
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = make_adapter(max_diff_lines=50)
+
+    files: list[Any] = [{"item": {"path": "/src/app.py"}, "changeType": "edit"}]
+
+    _, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (1, 1)
+    merge_base_call, *item_calls = session.get_calls
+    assert merge_base_call["params"]["baseVersion"] == "c-tgt"  # type: ignore[index]
+    assert merge_base_call["params"]["targetVersion"] == "c-src"  # type: ignore[index]
+    params = [call["params"] for call in item_calls]
+    assert [p["versionDescriptor.version"] for p in params] == ["c-base", "c-src"]  # type: ignore[index]
+    assert [p["versionDescriptor.versionType"] for p in params] == ["commit", "commit"]  # type: ignore[index]
+
+
+def test_generate_diff_merge_base_is_cached_and_optional(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o merge base é resolvido uma vez e que, sem ele, a base é o topo do destino."""
+    session = UrlSession({"/a.py@c-tgt": "a\n", "/a.py@c-src": "b\n"})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = make_adapter(max_diff_lines=50)
+    files: list[Any] = [{"item": {"path": "/a.py"}, "changeType": "edit"}]
+
+    for _ in range(2):
+        _, additions, deletions = adapter.generate_diff(
+            "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+        )
+        assert (additions, deletions) == (1, 1)
+
+    urls = [call["url"] for call in session.get_calls]
+    assert sum(url.endswith("/diffs/commits") for url in urls) == 1
+
+
+def test_generate_diff_merge_base_failure_is_cached(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    """Testa que um merge base negado (403) é pedido e avisado uma vez por par de commits."""
+
+    class ForbiddenMergeBase(UrlSession):
+        def get(self, url: str, params: dict[str, str] | None = None, **kwargs: Any):
+            if url.endswith("/diffs/commits"):
+                self.get_calls.append({"url": url, "params": params})
+                return FakeResponse("", status_code=403)
+            return super().get(url, params, **kwargs)
+
+    paths = ["/a.py", "/b.py"]
+    contents = {f"{path}@c-{side}": f"{side}\n" for path in paths for side in ("tgt", "src")}
+    session = ForbiddenMergeBase(contents)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = make_adapter(max_diff_lines=50, fetch_concurrency=1)
+    files: list[Any] = [{"item": {"path": path}, "changeType": "edit"} for path in paths]
+
+    _, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (2, 2)
+    urls = [call["url"] for call in session.get_calls]
+    assert sum(url.endswith("/diffs/commits") for url in urls) == 1
+    assert capsys.readouterr().out.count("Merge base indisponível") == 1
+
+
+def test_generate_diff_skips_missing_side_of_adds_and_deletes(monkeypatch: pytest.MonkeyPatch):
+    """Testa que arquivos adicionados/removidos baixam só a versão existente."""
+    session = UrlSession({"added-sha": "x\ny\n", "deleted-sha": "z\n"})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = make_adapter(max_diff_lines=50)
+
+    files: list[Any] = [
+        {"item": {"path": "/src/new.py", "objectId": "added-sha"}, "changeType": "add"},
+        {
+            "item": {"path": "/src/old.py", "originalObjectId": "deleted-sha"},
+            "changeType": "delete",
+        },
+    ]
+
+    _, additions, deletions = adapter.generate_diff("repo", files, "feature", "main")
+
+    assert (additions, deletions) == (2, 1)
+    assert len(session.get_calls) == 2
+
+
+def test_generate_diff_serves_known_blobs_from_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Testa que uma segunda execução só baixa blobs novos."""
+    base_sha, old_sha, new_sha = "1" * 40, "2" * 40, "3" * 40
+    session = UrlSession({base_sha: "a\n", old_sha: "a\nb\n", new_sha: "a\nc\n"})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        blob_cache=cache,
+    )
+
+    def files_for(source_sha: str) -> list[Any]:
+        item = {"path": "/a.py", "objectId": source_sha, "originalObjectId": base_sha}
+        return [{"item": item, "changeType": "edit"}]
+
+    first = adapter.generate_diff("repo", files_for(old_sha), "feature", "main")
+    second = adapter.generate_diff("repo", files_for(new_sha), "feature", "main")
+
+    assert first[1:] == (1, 0)
+    assert second[1:] == (1, 0)
+    fetched = [str(call["url"]).rsplit("/", 1)[-1] for call in session.get_calls]
+    assert fetched == [base_sha, old_sha, new_sha]
+    assert cache.stats.hits == 1
+    assert cache.stats.bytes_saved == 2
+
+
+class BatchSession(FakeSession):
+    """Session fake para os endpoints itemsbatch e blobs (zip)."""
+
+    def __init__(
+        self,
+        object_ids: dict[tuple[str, str], str],
+        blobs: dict[str, str],
+        metadata: dict[tuple[str, str], dict[str, Any]] | None = None,
+    ):
+        super().__init__()
+        self.object_ids = object_ids
+        self.blobs = blobs
+        self.metadata = metadata or {}
+        self.post_calls: list[dict[str, Any]] = []
+
+    def post(self, url: str, json: Any = None, **kwargs: Any):
+        self.post_calls.append({"url": url, "json": json})
+        if url.endswith("/itemsbatch"):
+            value = []
+            for descriptor in json["itemDescriptors"]:
+                key = (descriptor["path"], descriptor["version"])
+                if key not in self.object_ids:
+                    value.append([])
+                    continue
+                value.append([{"objectId": self.object_ids[key], **self.metadata.get(key, {})}])
+            return FakeJsonResponse({"value": value})
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for object_id in json:
+                if object_id in self.blobs:
+                    archive.writestr(object_id, self.blobs[object_id])
+        return FakeJsonResponse(None, content=buffer.getvalue())
+
+
+class FakeJsonResponse(FakeResponse):
+    def __init__(self, data: Any, content: bytes = b""):
+        super().__init__("")
+        self._data = data
+        self.content = content
+
+    def json(self) -> Any:
+        return self._data
+
+
+def test_generate_diff_batch_mode_uses_few_requests(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o modo batch resolve objectIds e baixa blobs em lotes."""
+    session = BatchSession(
+        object_ids={("/b.py", "c-base"): "b0", ("/b.py", "c-src"): "b1"},
+        blobs={"a0": "x\n", "a1": "x\ny\n", "b0": "1\n", "b1": "2\n"},
+    )
+    session.queue(FakeJsonResponse({"commonCommit": "c-base"}))
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="batch"),
+        ReviewLimits(max_diff_lines_per_file=50, batch_chunk_size=4),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+
+    files: list[Any] = [
+        {
+            "item": {"path": "/a.py", "objectId": "a1", "originalObjectId": "a0"},
+            "changeType": "edit",
+        },
+        {"item": {"path": "/b.py"}, "changeType": "edit"},
+        {"item": {"path": "/c.py"}, "changeType": "edit"},
+    ]
+
+    diff_text, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (2, 1)
+    assert "/c.py não existe em c-base" in diff_text
+    # Só o merge base é buscado por GET (uma vez para a PR inteira)
+    assert [call["url"].rsplit("/", 2)[-2:] for call in session.get_calls] == [["diffs", "commits"]]
+    endpoints = [call["url"].rsplit("/", 1)[-1] for call in session.post_calls]
+    # Lotes de 2 arquivos (4 versões): [a, b] consulta os metadados de a (b e c passam pelo
+    # itemsbatch ao resolver o blob), resolve b e baixa 4 blobs; [c] não existe
+    assert endpoints == ["itemsbatch", "itemsbatch", "blobs", "itemsbatch"]
+
+
+def test_generate_diff_batch_mode_skips_binary_by_metadata(monkeypatch: pytest.MonkeyPatch):
+    """Testa que blob marcado como binário no itemsbatch não entra no zip de blobs."""
+    session = BatchSession(
+        object_ids={("/data.bin", "c-src"): "d1", ("/b.py", "c-src"): "b1"},
+        blobs={"d1": "nunca baixado", "b1": "2\n"},
+        metadata={("/data.bin", "c-src"): {"contentMetadata": {"isBinary": True}}},
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="batch"),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [
+        {"item": {"path": "/data.bin"}, "changeType": "add"},
+        {"item": {"path": "/b.py"}, "changeType": "add"},
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert additions == 1
+    assert "- `/data.bin`: binário" in diff_text
+    assert session.post_calls[-1]["json"] == ["b1"]
+
+
+def test_generate_diff_skips_by_change_metadata_without_requests(monkeypatch: pytest.MonkeyPatch):
+    """Testa pasta, tamanho e contentType dos metadados: nada é baixado e o cabeçalho lista."""
+    session = UrlSession({"/ok.py@dev": "novo\n"})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_file_bytes=1000),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [
+        {"item": {"path": "/src", "isFolder": True}, "changeType": "add"},
+        {"item": {"path": "/dump.sql", "size": 5_000_000}, "changeType": "add"},
+        {
+            "item": {"path": "/fonte.woff3", "contentMetadata": {"contentType": "font/woff3"}},
+            "changeType": "add",
+        },
+        {"item": {"path": "/ok.py"}, "changeType": "add"},
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff("repo", files, "dev", "main")
+
+    assert additions == 1
+    assert [call["params"]["path"] for call in session.get_calls] == ["/ok.py"]
+    assert diff_text.startswith("⏭️ **Arquivos ignorados (2):**")
+    assert "- `/dump.sql`: muito grande (4882.8 KB > 1.0 KB)" in diff_text
+    assert "- `/fonte.woff3`: binário" in diff_text
+    assert "`/src`" not in diff_text
+
+
+class MetadataSession(UrlSession):
+    """UrlSession com itemsbatch respondendo os metadados por (path, versão)."""
+
+    def __init__(self, contents: dict[str, str], metadata: dict[tuple[str, str], Any]):
+        super().__init__(contents)
+        self.metadata = metadata
+        self.post_calls: list[dict[str, Any]] = []
+
+    def post(self, url: str, json: Any = None, **kwargs: Any):
+        self.post_calls.append({"url": url, "json": json})
+        value = []
+        for descriptor in json["itemDescriptors"]:
+            item = self.metadata.get((descriptor["path"], descriptor["version"]))
+            value.append([item] if item is not None else [])
+        return FakeJsonResponse({"value": value})
+
+
+def test_generate_diff_per_file_skips_by_prefetched_metadata(monkeypatch: pytest.MonkeyPatch):
+    """Testa que, no modo per_file, o itemsbatch decide antes de qualquer GET de conteúdo."""
+    session = MetadataSession(
+        {"new-ok": "a\nb\n", "old-ok": "a\n"},
+        {
+            ("/dump.sql", "c-src"): {"objectId": "new-big", "size": 5_000_000},
+            ("/logo.ico", "c-src"): {"objectId": "new-bin", "contentMetadata": {"isImage": True}},
+            ("/ok.py", "c-src"): {"objectId": "new-ok", "contentMetadata": {"isBinary": False}},
+        },
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_file_bytes=1000, batch_chunk_size=2),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [
+        {
+            "item": {"path": path, "objectId": f"new-{name}", "originalObjectId": f"old-{name}"},
+            "changeType": "edit",
+        }
+        for path, name in (("/dump.sql", "big"), ("/logo.ico", "bin"), ("/ok.py", "ok"))
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert additions == 1
+    fetched = [str(call["url"]).rsplit("/", 1)[-1] for call in session.get_calls]
+    assert fetched == ["old-ok", "new-ok"]
+    assert [len(call["json"]["itemDescriptors"]) for call in session.post_calls] == [2, 1]
+    assert "- `/dump.sql`: muito grande (4882.8 KB > 1.0 KB)" in diff_text
+    assert "- `/logo.ico`: binário" in diff_text
+
+
+def test_generate_diff_skips_generated_and_vendored_files(monkeypatch: pytest.MonkeyPatch):
+    """Testa o .gitattributes (sem baixar o arquivo) e o cabeçalho de arquivo gerado."""
+    session = UrlSession(
+        {
+            "/.gitattributes@dev": "vendor_js/** linguist-vendored\n",
+            "/api_pb2.py@dev": "# Generated by the protocol buffer compiler.  DO NOT EDIT!\n",
+            "/app.py@dev": "novo\n",
+        }
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(),
+        ReviewLimits(),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [
+        {"item": {"path": f"/{path}"}, "changeType": "add"}
+        for path in ("vendor_js/lib.js", "api_pb2.py", "app.py")
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff("repo", files, "dev", "main")
+    adapter.generate_diff("repo", files[2:], "dev", "main")
+
+    assert additions == 1
+    assert "- `/vendor_js/lib.js`: vendorizado (linguist-vendored)" in diff_text
+    assert '- `/api_pb2.py`: gerado (cabeçalho "Generated by the protocol buffer' in diff_text
+    fetched = [call["params"]["path"] for call in session.get_calls]
+    assert fetched == ["/.gitattributes", "/api_pb2.py", "/app.py", "/app.py"]
+
+
+def test_generate_diff_consumes_only_needed_entries(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o diff lê os entries sob demanda e para em max_files_to_analyze."""
+    session = UrlSession({f"/f{i}.py@{v}": "x\n" for i in range(10) for v in ("main", "dev")})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_files_to_analyze=3, fetch_concurrency=2),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    consumed: list[int] = []
+
+    def entries() -> Any:
+        for i in range(10):
+            consumed.append(i)
+            yield {"item": {"path": f"/f{i}.py"}, "changeType": "edit"}
+
+    pages = entries()
+    diff_text, _, _ = adapter.generate_diff("repo", pages, "dev", "main")
+
+    assert consumed == [0, 1, 2]
+    assert len(session.get_calls) == 6
+    assert next(pages)["item"]["path"] == "/f3.py"
+
+
+def test_iter_file_diffs_streams_typed_chunks(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o primeiro lote sai antes de ler as próximas páginas, com hunks e truncamento."""
+    contents = {f"/f{i}.py@{v}": "a\nb\nc\n" for i in range(6) for v in ("main", "dev")}
+    contents["/f0.py@dev"] = "a\nB\nc\nd\ne\n"
+    session = UrlSession(contents)
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_diff_lines_per_file=4, fetch_concurrency=2, archive_threshold_files=0),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    consumed: list[int] = []
+
+    def entries() -> Any:
+        for i in range(6):
+            consumed.append(i)
+            yield {"item": {"path": f"/f{i}.py"}, "changeType": "edit"}
+
+    chunks = adapter.iter_file_diffs("repo", entries(), "dev", "main")
+    first = next(chunks)
+
+    assert consumed[-1] <= 3  # No máximo um lote lido à frente do entregue
+    assert (first.path, first.additions, first.deletions) == ("/f0.py", 3, 1)
+    assert [(h.old_start, h.old_lines, h.new_start, h.new_lines) for h in first.hunks] == [
+        (1, 3, 1, 5)
+    ]
+    assert (len(first.lines), first.total_lines, first.omitted_lines) == (4, 9, 5)
+
+    rest = list(chunks)
+    assert [chunk.path for chunk in rest] == [f"/f{i}.py" for i in range(1, 6)]
+    assert not any(chunk.has_diff for chunk in rest)
+
+    diff_text, additions, deletions = adapter.render_diff([first, *rest])
+    assert (additions, deletions) == (3, 1)
+    assert "... (5 linhas omitidas)" in diff_text
+
+
+class ArchiveResponse(FakeResponse):
+    def __init__(self, content: bytes):
+        super().__init__("")
+        self.content = content
+
+
+class ArchiveSession(FakeSession):
+    """Session fake para o endpoint items com $format=zip."""
+
+    def __init__(self, trees: dict[str, dict[str, str]], merge_base: str | None = None):
+        super().__init__()
+        self.trees = trees
+        self.merge_base = merge_base
+
+    def get(self, url: str, params: dict[str, str] | None = None, **kwargs: Any):
+        assert params is not None
+        if url.endswith("/diffs/commits"):
+            return FakeJsonResponse({"commonCommit": self.merge_base})
+        self.get_calls.append({"url": url, "params": params, "stream": kwargs.get("stream")})
+        tree = self.trees[params["versionDescriptor.version"]]
+        if params.get("$format") != "zip":
+            return FakeResponse(tree[params["path"]])  # Download por arquivo (fallback)
+        scope = params["scopePath"]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for path, content in tree.items():
+                if path.startswith(scope):
+                    archive.writestr(path.removeprefix(scope).lstrip("/"), content)
+        return ArchiveResponse(buffer.getvalue())
+
+
+def test_generate_diff_archive_mode_extracts_changed_paths(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o modo archive baixa um zip por commit e extrai só os arquivos alterados."""
+    session = ArchiveSession(
+        {
+            "c-base": {"/src/a.py": "x\n", "/src/lib/b.py": "1\n", "/src/other.py": "o\n"},
+            "c-src": {"/src/a.py": "x\ny\n", "/src/lib/b.py": "2\n", "/src/new.py": "n\n"},
+        },
+        merge_base="c-base",
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive"),
+        ReviewLimits(max_diff_lines_per_file=50, fetch_concurrency=1),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+
+    files: list[Any] = [
+        {"item": {"path": "/src/a.py"}, "changeType": "edit"},
+        {"item": {"path": "/src/lib/b.py"}, "changeType": "edit"},
+        {"item": {"path": "/src/new.py"}, "changeType": "add"},
+        {"item": {"path": "/src/gone.py"}, "changeType": "edit"},
+    ]
+
+    diff_text, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (3, 1)
+    assert "/src/gone.py não existe em c-base" in diff_text
+    assert "/src/other.py" not in diff_text
+    assert [call["params"]["versionDescriptor.version"] for call in session.get_calls] == [
+        "c-base",
+        "c-src",
+    ]
+    assert all(call["params"]["scopePath"] == "/src" for call in session.get_calls)
+    assert all(call["stream"] for call in session.get_calls)
+
+
+def test_generate_diff_archive_mode_does_not_cache_by_object_id(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Testa que o conteúdo baixado por commit no modo archive não vira blob no cache."""
+    base_sha, source_sha = "1" * 40, "2" * 40
+    # Sem merge base a base cai no topo do destino, que não é o blob originalObjectId
+    session = ArchiveSession({"c-tgt": {"/a.py": "outro\n"}, "c-src": {"/a.py": "b\n"}})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive"),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        blob_cache=cache,
+    )
+    item = {"path": "/a.py", "objectId": source_sha, "originalObjectId": base_sha}
+    files: list[Any] = [{"item": item, "changeType": "edit"}]
+
+    adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert cache.get(base_sha) is None
+    assert cache.get(source_sha) is None
+    assert cache.total_bytes == 0
+
+
+def test_generate_diff_archive_mode_falls_back_when_zip_is_too_large(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Testa que um zip acima de max_archive_bytes é abandonado e os arquivos vêm um a um."""
+    tree = {"/src/a.py": "x\n", "/src/big/data.txt": "0123456789\n" * 100}
+    session = ArchiveSession({"main": tree, "dev": {**tree, "/src/a.py": "y\n"}})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive"),
+        ReviewLimits(max_diff_lines_per_file=50, fetch_concurrency=1, max_archive_bytes=200),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [{"item": {"path": "/src/a.py"}, "changeType": "edit"}]
+
+    _, additions, deletions = adapter.generate_diff("repo", files, "dev", "main")
+
+    assert (additions, deletions) == (1, 1)
+    formats = [call["params"].get("$format") for call in session.get_calls]
+    assert formats == ["zip", None, "zip", None]
+
+
+def test_generate_diff_switches_to_archive_above_threshold(monkeypatch: pytest.MonkeyPatch):
+    """Testa a troca automática para o modo archive a partir do limiar de arquivos."""
+    tree = {f"/pkg/f{i}.py": f"{i}\n" for i in range(4)}
+    session = ArchiveSession({"main": tree, "dev": tree})
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(archive_threshold_files=3, fetch_concurrency=2),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    files: list[Any] = [{"item": {"path": path}, "changeType": "edit"} for path in tree]
+
+    diff_text, _, _ = adapter.generate_diff("repo", iter(files), "dev", "main")
+
+    assert diff_text.count("## Arquivo") == 4
+    assert len(session.get_calls) == 2
+    assert session.get_calls[0]["params"]["$format"] == "zip"
+
+
+def test_generate_diff_archive_mode_uses_compared_iteration_as_base(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Testa que o review incremental no modo archive diffa só o que veio depois da iteração."""
+    session = ArchiveSession(
+        {
+            "c-prev": {"/src/a.py": "x\ny\n"},
+            "c-src": {"/src/a.py": "x\ny\nz\n"},
+        },
+        merge_base="c-fork",
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive", metadata_prefetch=False),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    item = {"path": "/src/a.py", "objectId": "n1", "originalObjectId": "o1"}
+    files: list[Any] = [{"item": item, "changeType": "edit"}]
+
+    _, additions, deletions = adapter.generate_diff(
+        "repo",
+        files,
+        "feature",
+        "main",
+        source_commit="c-src",
+        target_commit="c-tgt",
+        base_commit="c-prev",
+    )
+
+    assert (additions, deletions) == (1, 0)
+    assert [call["params"]["versionDescriptor.version"] for call in session.get_calls] == [
+        "c-prev",
+        "c-src",
+    ]
+
+
+def test_generate_diff_archive_mode_uses_batch_for_scattered_paths(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Testa que arquivos sem diretório comum (scope "/") não baixam o repositório em zip."""
+    session = BatchSession(
+        object_ids={
+            ("/api/a.py", "c-base"): "a0",
+            ("/api/a.py", "c-src"): "a1",
+            ("/web/b.py", "c-base"): "b0",
+            ("/web/b.py", "c-src"): "b1",
+        },
+        blobs={"a0": "x\n", "a1": "x\ny\n", "b0": "1\n", "b1": "2\n"},
+    )
+    session.queue(FakeJsonResponse({"commonCommit": "c-base"}))
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive", metadata_prefetch=False),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    # O objectId da iteração (base "stale") é ignorado: a base vem do merge base
+    files: list[Any] = [
+        {"item": {"path": "/api/a.py", "originalObjectId": "stale"}, "changeType": "edit"},
+        {"item": {"path": "/web/b.py"}, "changeType": "edit"},
+    ]
+
+    _, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (2, 1)
+    assert not any(call["params"].get("$format") == "zip" for call in session.get_calls)
+    # Base e source juntas: um itemsbatch e um zip de blobs
+    assert [call["url"].rsplit("/", 1)[-1] for call in session.post_calls] == [
+        "itemsbatch",
+        "blobs",
+    ]
+    assert sorted(session.post_calls[-1]["json"]) == ["a0", "a1", "b0", "b1"]
+
+
+def test_generate_diff_archive_mode_ignores_cached_iteration_blob(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Testa que no modo archive a base vem do zip do merge base, não do blob em cache."""
+    base_sha = "1" * 40
+    session = ArchiveSession(
+        {"c-base": {"/src/a.py": "x\n"}, "c-src": {"/src/a.py": "x\ny\n"}},
+        merge_base="c-base",
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put(base_sha, "outra base\n")
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive"),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        blob_cache=cache,
+    )
+    item = {"path": "/src/a.py", "originalObjectId": base_sha}
+    files: list[Any] = [{"item": item, "changeType": "edit"}]
+
+    diff_text, additions, deletions = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert (additions, deletions) == (1, 0)
+    assert "outra base" not in diff_text
+
+
+class CountingResponse(FakeResponse):
+    """Resposta fake que conta quantos blocos do corpo foram lidos."""
+
+    def __init__(self, text: str):
+        super().__init__(text)
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size: int = 1):
+        for chunk in super().iter_content(chunk_size=64):
+            self.chunks_read += 1
+            yield chunk
+
+
+def test_generate_diff_skips_large_and_binary_files(monkeypatch: pytest.MonkeyPatch):
+    """Testa que binários e arquivos acima do limite abortam o download e são marcados."""
+    responses = {
+        "big-base": CountingResponse("x\n" * 1000),
+        "big-new": CountingResponse("y\n" * 1000),
+        "bin-base": CountingResponse("\0PNG" * 100),
+        "bin-new": CountingResponse("\0PNG" * 200),
+    }
+    session = FakeSession()
+    for name in ("big-base", "big-new", "bin-base", "bin-new"):
+        session.queue(responses[name])
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(max_diff_lines_per_file=50, fetch_concurrency=1, max_file_bytes=256),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+
+    files: list[Any] = [
+        {
+            "item": {"path": f"/src/{name}.py", "objectId": f"{name}-new"},
+            "changeType": "edit",
+        }
+        for name in ("big", "bin")
+    ]
+    for file in files:
+        file["item"]["originalObjectId"] = file["item"]["objectId"].replace("new", "base")
+
+    diff_text, additions, deletions = adapter.generate_diff("repo", files, "feature", "main")
+
+    assert (additions, deletions) == (0, 0)
+    assert "⏭️ Ignorado: arquivo muito grande" in diff_text
+    assert "⏭️ Ignorado: arquivo binário" in diff_text
+    assert responses["big-base"].chunks_read == 5  # 256 bytes = 4 blocos + o que estourou
+    assert responses["bin-base"].chunks_read == 1
+
+
+def test_generate_diff_archive_mode_skips_oversized_entries(monkeypatch: pytest.MonkeyPatch):
+    """Testa que no modo archive o tamanho declarado no zip basta para ignorar a entrada."""
+    session = ArchiveSession(
+        {
+            "c-tgt": {"/src/a.py": "x\n", "/src/big.py": "1\n" * 500},
+            "c-src": {"/src/a.py": "x\ny\n", "/src/big.py": "2\n" * 500},
+        }
+    )
+    monkeypatch.setattr("src.infrastructure.http.transport.requests.Session", lambda: session)
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False, fetch_mode="archive"),
+        ReviewLimits(max_diff_lines_per_file=50, fetch_concurrency=1, max_file_bytes=100),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+
+    files: list[Any] = [
+        {"item": {"path": "/src/a.py"}, "changeType": "edit"},
+        {"item": {"path": "/src/big.py"}, "changeType": "edit"},
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit="c-src", target_commit="c-tgt"
+    )
+
+    assert additions == 1
+    assert "⏭️ Ignorado: arquivo muito grande (1.0 KB > 0.1 KB)" in diff_text
+
+
+def test_diff_versions_uses_histogram_for_large_files(monkeypatch: pytest.MonkeyPatch):
+    """Testa que arquivos a partir de diff_large_file_lines usam o algoritmo histogram."""
+    adapter = DiffAdapter(
+        ReviewBehavior(skip_generated=False),
+        ReviewLimits(diff_large_file_lines=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+    )
+    sizes: list[int] = []
+
+    def fake_histogram(self: HistogramEngine, a: list[str], *args: Any, **kwargs: Any):
+        sizes.append(len(a))
+        return []
+
+    monkeypatch.setattr(HistogramEngine, "unified_diff", fake_histogram)
+
+    small = adapter._diff_versions("/a.py", ("a\n", "b\n"))
+    adapter._diff_versions("/b.py", ("x\n" * 60, "y\n"))
+
+    assert "+b\n" in small
+    assert sizes == [60]
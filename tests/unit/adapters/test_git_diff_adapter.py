@@ -0,0 +1,252 @@
+"""
+Testes para GitDiffAdapter
+"""
+
+import shutil
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from src.adapters.diff_adapter import DiffAdapter
+from src.adapters.git_diff_adapter import GitDiffAdapter
+from src.core.domain.file_diff import FileDiffChunk
+from src.infrastructure.config.settings import AzureDevOpsConfig, ReviewBehavior, ReviewLimits
+from src.infrastructure.git.mirror import GitMirrorStore
+from src.infrastructure.git.repository import GitRepository
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git indisponível")
+
+
+def git(path: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> tuple[Path, str, str]:
+    """Clone com a main avançada depois do fork da feature; retorna (path, main, feature)."""
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "app.py").write_text("a\nb\n")
+    (tmp_path / "util.py").write_text("".join(f"def f{i}(): pass\n" for i in range(10)))
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+
+    git(tmp_path, "checkout", "-q", "-b", "feature")
+    (tmp_path / "app.py").write_text("a\nb\nc\n")
+    (tmp_path / ".gitattributes").write_text("gen/** linguist-generated\n")
+    (tmp_path / "gen").mkdir()
+    (tmp_path / "gen" / "client.py").write_text("x = 1\n")
+    (tmp_path / "schema.py").write_text("# Code generated by sqlc. DO NOT EDIT.\nx = 1\n")
+    git(tmp_path, "mv", "util.py", "helpers.py")
+    (tmp_path / "data.bin").write_bytes(b"\0\1\2")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "feature")
+    feature = git(tmp_path, "rev-parse", "HEAD")
+
+    git(tmp_path, "checkout", "-q", "main")
+    (tmp_path / "app.py").write_text("main\na\nb\n")
+    git(tmp_path, "commit", "-q", "-am", "main avança")
+    return tmp_path, git(tmp_path, "rev-parse", "HEAD"), feature
+
+
+def make_adapter(path: Path) -> GitDiffAdapter:
+    return GitDiffAdapter(
+        ReviewBehavior(),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        GitRepository(path),
+    )
+
+
+def test_generate_diff_from_local_clone(repo: tuple[Path, str, str]):
+    """Testa o diff local: merge base como base, renomeação detectada e binário ignorado."""
+    path, main, feature = repo
+    files: list[Any] = [
+        {"item": {"path": "/app.py"}, "changeType": "edit"},
+        {"item": {"path": "/helpers.py"}, "changeType": "rename", "originalPath": "/util.py"},
+        {"item": {"path": "/data.bin"}, "changeType": "add"},
+    ]
+
+    diff_text, additions, deletions = make_adapter(path).generate_diff(
+        "repo", files, "feature", "main", source_commit=feature, target_commit=main
+    )
+
+    assert (additions, deletions) == (1, 0)
+    assert "+c\n" in diff_text
+    assert "main\n" not in diff_text  # mudança só da main não entra no diff
+    assert "## Arquivo 2: `/helpers.py`" in diff_text
+    assert "⏭️ Ignorado: arquivo binário" in diff_text
+
+
+def test_generate_diff_incremental_uses_compared_iteration(repo: tuple[Path, str, str]):
+    """Testa que o review incremental diffa a partir da origem da iteração revisada."""
+    path, main, reviewed = repo
+    git(path, "checkout", "-q", "feature")
+    (path / "app.py").write_text("a\nb\nc\nd\n")
+    git(path, "commit", "-q", "-am", "follow-up")
+    feature = git(path, "rev-parse", "HEAD")
+    files: list[Any] = [{"item": {"path": "/app.py"}, "changeType": "edit"}]
+
+    diff_text, additions, deletions = make_adapter(path).generate_diff(
+        "repo",
+        files,
+        "feature",
+        "main",
+        source_commit=feature,
+        target_commit=main,
+        base_commit=reviewed,
+    )
+
+    assert (additions, deletions) == (1, 0)
+    assert "+d\n" in diff_text
+    assert "+c\n" not in diff_text  # já revisado na iteração anterior
+
+
+def test_generate_diff_incremental_falls_back_without_compared_commit(
+    repo: tuple[Path, str, str], monkeypatch: pytest.MonkeyPatch
+):
+    """Testa que, sem o commit da iteração comparada no clone, o diff vem pela API."""
+    path, main, feature = repo
+    calls: list[tuple[Any, ...]] = []
+
+    def fake_iter(self: DiffAdapter, *args: Any) -> Iterator[FileDiffChunk]:
+        calls.append(args)
+        yield FileDiffChunk(path="/via_api.py", change_type="edit", error="via api")
+
+    monkeypatch.setattr(DiffAdapter, "iter_file_diffs", fake_iter)
+
+    diff_text, _, _ = make_adapter(path).generate_diff(
+        "repo",
+        [],
+        "feature",
+        "main",
+        source_commit=feature,
+        target_commit=main,
+        base_commit="e" * 40,
+    )
+
+    assert "`/via_api.py`" in diff_text
+    assert calls[0][-3:] == (feature, main, "e" * 40)
+
+
+def test_generate_diff_skips_generated_files(repo: tuple[Path, str, str]):
+    """Testa o .gitattributes lido do commit e o cabeçalho nas linhas novas do diff."""
+    path, main, feature = repo
+    files: list[Any] = [
+        {"item": {"path": "/gen/client.py"}, "changeType": "add"},
+        {"item": {"path": "/schema.py"}, "changeType": "add"},
+    ]
+
+    diff_text, additions, _ = make_adapter(path).generate_diff(
+        "repo", files, "feature", "main", source_commit=feature, target_commit=main
+    )
+
+    assert additions == 0
+    assert "- `/gen/client.py`: gerado (linguist-generated)" in diff_text
+    assert '- `/schema.py`: gerado (cabeçalho "Code generated by sqlc. DO NOT EDIT.")' in diff_text
+
+
+def test_generate_diff_falls_back_to_api_without_commits(
+    repo: tuple[Path, str, str], monkeypatch: pytest.MonkeyPatch
+):
+    """Testa que, sem os commits da PR no clone, o diff é gerado pela API."""
+    path, main, _ = repo
+    calls: list[tuple[Any, ...]] = []
+
+    def fake_iter(self: DiffAdapter, *args: Any) -> Iterator[FileDiffChunk]:
+        calls.append(args)
+        yield FileDiffChunk(path="/via_api.py", change_type="edit", error="via api")
+
+    monkeypatch.setattr(DiffAdapter, "iter_file_diffs", fake_iter)
+
+    diff_text, _, _ = make_adapter(path).generate_diff(
+        "repo", [], "feature", "main", source_commit="f" * 40, target_commit=main
+    )
+
+    assert "`/via_api.py`" in diff_text
+    assert calls[0][-3:] == ("f" * 40, main, None)
+
+
+def test_generate_diff_from_mirror(tmp_path: Path, repo: tuple[Path, str, str]):
+    """Testa o diff sem checkout: o mirror do repositório busca a PR e gera o diff."""
+    path, main, feature = repo
+    adapter = GitDiffAdapter(
+        ReviewBehavior(),
+        ReviewLimits(max_diff_lines_per_file=50),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        mirrors=GitMirrorStore(tmp_path / "mirrors", str(path)),
+    )
+    files: list[Any] = [{"item": {"path": "/app.py"}, "changeType": "edit"}]
+
+    diff_text, additions, _ = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit=feature, target_commit=main
+    )
+
+    assert additions == 1
+    assert "+c\n" in diff_text
+    assert (tmp_path / "mirrors" / "repo.git" / "HEAD").exists()
+
+
+def test_generate_diff_falls_back_to_api_without_merge_base(
+    tmp_path: Path, repo: tuple[Path, str, str], monkeypatch: pytest.MonkeyPatch
+):
+    """Testa que um clone raso (commits presentes, sem merge base) usa o diff da API."""
+    path, main, feature = repo
+    shallow = tmp_path / "shallow"
+    subprocess.run(
+        [
+            "git",
+            "clone",
+            "-q",
+            "--depth",
+            "1",
+            "--no-single-branch",
+            f"file://{path}",
+            str(shallow),
+        ],
+        capture_output=True,
+        check=True,
+    )
+    calls: list[tuple[Any, ...]] = []
+
+    def fake_iter(self: DiffAdapter, *args: Any) -> Iterator[FileDiffChunk]:
+        calls.append(args)
+        yield FileDiffChunk(path="/via_api.py", change_type="edit", error="via api")
+
+    monkeypatch.setattr(DiffAdapter, "iter_file_diffs", fake_iter)
+
+    diff_text, _, _ = make_adapter(shallow).generate_diff(
+        "repo", [], "feature", "main", source_commit=feature, target_commit=main
+    )
+
+    assert "`/via_api.py`" in diff_text
+    assert calls[0][-3:] == (feature, main, None)
+
+
+def test_generate_diff_skips_files_above_max_file_bytes(repo: tuple[Path, str, str]):
+    """Testa que blobs acima de max_file_bytes ficam fora do git diff, pelo tamanho."""
+    path, main, feature = repo
+    adapter = GitDiffAdapter(
+        ReviewBehavior(),
+        ReviewLimits(max_diff_lines_per_file=50, max_file_bytes=100),
+        AzureDevOpsConfig(org="org", project="proj", pat="token"),
+        GitRepository(path),
+    )
+    files: list[Any] = [
+        {"item": {"path": "/app.py"}, "changeType": "edit"},
+        {"item": {"path": "/helpers.py"}, "changeType": "rename", "originalPath": "/util.py"},
+    ]
+
+    diff_text, additions, _ = adapter.generate_diff(
+        "repo", files, "feature", "main", source_commit=feature, target_commit=main
+    )
+
+    assert additions == 1
+    assert "- `/helpers.py`: muito grande (0.1 KB > 0.1 KB)" in diff_text
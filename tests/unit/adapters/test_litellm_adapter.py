@@ -64,6 +64,18 @@ def test_build_user_prompt_includes_metadata_and_rules():
     assert diff_text in prompt
 
 
+def test_build_user_prompt_marks_file_count_floor():
+    """Testa que uma contagem parcial (páginas não lidas) não vai como exata para o LLM."""
+    adapter = make_adapter()
+    pr_info = make_pr().model_copy(
+        update={"changed_files_count": 100, "changed_files_is_floor": True}
+    )
+
+    prompt = adapter.build_user_prompt(pr_info, diff_text="conteúdo diff", custom_rules=None)
+
+    assert "100+" in prompt
+
+
 def test_build_user_prompt_uses_default_rules_when_none():
     """Testa que prompt usa texto padrão quando não há regras customizadas."""
     adapter = make_adapter()
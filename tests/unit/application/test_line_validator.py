@@ -0,0 +1,50 @@
+"""
+Testes para LineValidator
+"""
+
+from src.application.validators.line_validator import LineValidator
+from src.core.domain.file_diff import LineIndex
+from src.core.domain.file_review import FileReview, Issue
+
+INDEX = LineIndex.build(["@@ -10,3 +10,4 @@", " a\n", "+b\n", "+c\n", " d\n"])
+
+
+def test_validate_moves_lines_outside_hunks_to_nearest_change():
+    """Testa que linha fora do diff vira a alteração mais próxima e referenced_lines acompanha"""
+    review = FileReview(
+        filepath="src/app.py",
+        critical_issues=[Issue(text="ok", line=12)],
+        suggestions=[Issue(text="errada", line=40), Issue(text="geral")],
+        referenced_lines=[12, 40],
+    )
+
+    (validated,), fixed = LineValidator().validate([review], {"src/app.py": INDEX})
+
+    assert fixed == 1
+    assert [issue.line for issue in validated.suggestions] == [12, None]
+    assert validated.suggestions[0].text == "errada (linha 40 original)"
+    assert validated.suggestions[1].text == "geral"
+    assert validated.critical_issues[0].text == "ok"
+    assert validated.critical_issues[0].line == 12
+    assert validated.referenced_lines == [12]
+
+
+def test_validate_keeps_files_without_index():
+    """Testa que arquivo sem índice (path desconhecido) não é alterado"""
+    review = FileReview(filepath="/outro.py", suggestions=[Issue(text="x", line=99)])
+
+    validated, fixed = LineValidator().validate([review], {"src/app.py": INDEX})
+
+    assert (validated, fixed) == ([review], 0)
+
+
+def test_validate_keeps_original_line_when_file_has_no_changes():
+    """Testa que sem linhas alteradas a issue perde a linha mas o texto guarda a original"""
+    index = LineIndex.build(["@@ -1,2 +1,2 @@", " a\n", " b\n"])
+    review = FileReview(filepath="src/app.py", important_issues=[Issue(text="x", line=7)])
+
+    (validated,), fixed = LineValidator().validate([review], {"src/app.py": index})
+
+    assert fixed == 1
+    assert validated.important_issues == [Issue(text="x (linha 7 original)", line=None)]
+    assert validated.referenced_lines == []
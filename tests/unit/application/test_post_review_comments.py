@@ -1,9 +1,12 @@
+import threading
+import time
 from types import SimpleNamespace
 
 import pytest
 from src.core.domain.file_review import FileReview, Issue
 from src.core.domain.pull_request import PullRequestInfo
 from src.core.domain.review_result import ReviewResult
+from src.infrastructure.config.settings import AzureDevOpsConfig
 from src.main import post_review_comments
 
 
@@ -11,6 +14,11 @@ class FakeAzure:
     def __init__(self) -> None:
         self.summary_calls: list[tuple[str, int, dict[str, int]]] = []
         self.comment_calls: list[dict[str, object]] = []
+        self.pr_comment_calls: list[tuple[str, str]] = []
+
+    def post_pr_comment(self, repo_id: str, pr_id: int, key: str, comment: str) -> bool:
+        self.pr_comment_calls.append((key, comment))
+        return True
 
     def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
         self.summary_calls.append((repo_id, pr_id, stats))
@@ -68,13 +76,21 @@ def make_result() -> ReviewResult:
     )
 
 
-def make_app(post_summary: bool = True, context_lines: int = 6) -> SimpleNamespace:
+def make_app(
+    post_summary: bool = True,
+    context_lines: int = 6,
+    post_concurrency: int = 4,
+    post_mode: str = "per_file",
+) -> SimpleNamespace:
     return SimpleNamespace(
         config=SimpleNamespace(
             behavior=SimpleNamespace(
                 post_summary_comment=post_summary,
                 context_lines=context_lines,
-            )
+                post_mode=post_mode,
+            ),
+            limits=SimpleNamespace(post_concurrency=post_concurrency),
+            azure=AzureDevOpsConfig(org="org", project="proj"),
         ),
         azure=FakeAzure(),
     )
@@ -86,7 +102,7 @@ def test_post_review_comments_posts_summary_and_comments(
     app = make_app()
     result = make_result()
 
-    post_review_comments(app, "repo", 7, result) # type: ignore
+    post_review_comments(app, "repo", 7, result)  # type: ignore
 
     captured = capsys.readouterr()
     assert "Resumo postado" in captured.out
@@ -111,9 +127,115 @@ def test_post_review_comments_respects_post_summary_flag(
     app = make_app(post_summary=False)
     result = make_result()
 
-    post_review_comments(app, "repo", 7, result) # type: ignore
+    post_review_comments(app, "repo", 7, result)  # type: ignore
 
     captured = capsys.readouterr()
     assert "Resumo postado" not in captured.out
     assert app.azure.summary_calls == []
     assert len(app.azure.comment_calls) == 1
+
+
+class SlowAzure(FakeAzure):
+    """Simula latência de rede e falha em um arquivo específico."""
+
+    def __init__(self, failing: str) -> None:
+        super().__init__()
+        self.failing = failing
+        self.events: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post_summary_comment(self, repo_id: str, pr_id: int, stats: dict[str, int]) -> bool:
+        self.events.append("summary")
+        return super().post_summary_comment(repo_id, pr_id, stats)
+
+    def post_comment(
+        self,
+        repo_id: str,
+        pr_id: int,
+        file_path: str,
+        start_line: int,
+        end_line: int,
+        comment: str,
+    ) -> bool:
+        with self._lock:
+            self.events.append(file_path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.02)
+            if file_path == self.failing:
+                raise RuntimeError("HTTP 500")
+            return super().post_comment(repo_id, pr_id, file_path, start_line, end_line, comment)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_post_review_comments_posts_files_concurrently(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    app = make_app(post_concurrency=3)
+    app.azure = SlowAzure(failing="src/f2.py")
+    result = make_result()
+    template = result.files[0]
+    result.files = [
+        FileReview(
+            filepath=f"src/f{i}.py",
+            critical_issues=template.critical_issues,
+            referenced_lines=template.referenced_lines,
+        )
+        for i in range(6)
+    ]
+
+    post_review_comments(app, "repo", 7, result)  # type: ignore
+
+    output = capsys.readouterr().out
+    assert app.azure.events[0] == "summary"
+    assert 1 < app.azure.max_in_flight <= 3
+    assert "✗ Erro: src/f2.py: HTTP 500" in output
+    assert "5/6 comentários postados" in output
+    assert output.index("• src/f1.py") < output.index("• src/f5.py")
+
+
+def make_multi_dir_result() -> ReviewResult:
+    result = make_result()
+    template = result.files[0]
+    result.files = [
+        template,
+        FileReview(filepath="src/api/routes.py", suggestions=[Issue(text="Use constante")]),
+        FileReview(filepath="src/login.py", important_issues=template.important_issues),
+    ]
+    return result
+
+
+def test_post_review_comments_single_thread_mode(capsys: pytest.CaptureFixture[str]) -> None:
+    app = make_app(post_mode="single")
+    result = make_multi_dir_result()
+
+    post_review_comments(app, "repo", 7, result)  # type: ignore
+
+    assert app.azure.summary_calls == []
+    assert app.azure.comment_calls == []
+    assert len(app.azure.pr_comment_calls) == 1
+    key, comment = app.azure.pr_comment_calls[0]
+    assert key == "review"
+    assert "Arquivos analisados: 3" in comment
+    base = "https://dev.azure.com/org/proj/_git/repo/pullrequest/7?_a=files"
+    assert f"[`src/auth.py`]({base}&path=src/auth.py)" in comment
+    assert f"([L42]({base}&path=src/auth.py&line=42&lineEnd=42" in comment
+    assert "3/3 comentários postados" in capsys.readouterr().out
+
+
+def test_post_review_comments_per_directory_mode(capsys: pytest.CaptureFixture[str]) -> None:
+    app = make_app(post_mode="per_directory")
+    result = make_multi_dir_result()
+
+    post_review_comments(app, "repo", 7, result)  # type: ignore
+
+    assert len(app.azure.summary_calls) == 1
+    keys = [key for key, _ in app.azure.pr_comment_calls]
+    assert keys == ["review:src", "review:src/api"]
+    assert "src/login.py" in app.azure.pr_comment_calls[0][1]
+    assert "3/3 comentários postados" in capsys.readouterr().out
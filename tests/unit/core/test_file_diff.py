@@ -0,0 +1,63 @@
+"""
+Testes para FileDiffChunk e DiffHunk
+"""
+
+from src.core.domain.file_diff import DiffHunk, FileDiffChunk, LineIndex
+
+
+def test_diff_hunk_parses_header_with_default_lengths():
+    """Testa que tamanhos omitidos no cabeçalho valem 1"""
+    hunk = DiffHunk.parse("@@ -3 +4,2 @@ def main():")
+
+    assert hunk == DiffHunk(old_start=3, old_lines=1, new_start=4, new_lines=2)
+    assert DiffHunk.parse("+@@ -1 +1 @@") is None
+
+
+def test_chunk_from_diff_lines_counts_and_truncates():
+    """Testa contagens e hunks do diff completo, guardando só as linhas enviadas"""
+    diff_lines = ["--- a/x", "+++ b/x", "@@ -1,2 +1,2 @@", "-a\n", "+b\n", " c\n"]
+
+    chunk = FileDiffChunk.from_diff_lines("/x", "edit", diff_lines, diff_lines[:4])
+
+    assert (chunk.additions, chunk.deletions) == (1, 1)
+    assert len(chunk.hunks) == 1
+    assert chunk.is_truncated and chunk.omitted_lines == 2
+    assert FileDiffChunk(path="/y", change_type="add", skipped_reason="binário").has_diff is False
+
+
+DIFF = [
+    "--- a/x",
+    "+++ b/x",
+    "@@ -1,4 +1,5 @@",
+    " a\n",
+    "-b\n",
+    "+B\n",
+    "+C\n",
+    " c\n",
+    "@@ -20,3 +21,2 @@",
+    " x\n",
+    "-y\n",
+    " z\n",
+    "\\ No newline at end of file",
+]
+
+
+def test_line_index_maps_every_diff_line_to_new_file():
+    """Testa o mapa diff -> linha nova e as linhas alteradas (remoção ancora na seguinte)"""
+    index = LineIndex.build(DIFF)
+
+    assert list(index.new_lines) == [0, 0, 0, 1, 0, 2, 3, 4, 0, 21, 0, 22, 0]
+    assert list(index.changed) == [2, 3, 22]
+    assert index.new_line_at(5) == 2
+    assert index.new_line_at(4) is None
+
+
+def test_line_index_lookups():
+    """Testa hunk que contém a linha, linha alterada e alteração mais próxima"""
+    index = LineIndex.build(DIFF)
+
+    assert index.hunk_range(4) == (1, 4)
+    assert index.in_hunk(10) is False
+    assert index.is_changed(3) and not index.is_changed(4)
+    assert [index.nearest_changed(line) for line in (1, 10, 15, 30)] == [2, 3, 22, 22]
+    assert LineIndex().nearest_changed(5) is None
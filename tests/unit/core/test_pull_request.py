@@ -2,7 +2,9 @@
 Testes unitários para PullRequestInfo
 """
 
-from src.core.domain.pull_request import PullRequestInfo
+import pytest
+from pydantic import ValidationError
+from src.core.domain.pull_request import PullRequestInfo, PullRequestSnapshot
 
 
 def test_pull_request_info_creation():
@@ -110,3 +112,40 @@ def test_empty_labels_default():
     )
 
     assert pr.labels == []
+
+
+def test_pull_request_snapshot_is_immutable():
+    """Testa que o snapshot não aceita alterações e detecta iteração já revisada"""
+    pr = PullRequestInfo(
+        id=1,
+        title="Snapshot",
+        source_branch="feature",
+        target_branch="main",
+        is_draft=False,
+        additions=0,
+        deletions=0,
+        changed_files_count=0,
+    )
+    snapshot = PullRequestSnapshot(pr_info=pr, iteration_id=3, last_reviewed_iteration=3)
+
+    assert snapshot.already_reviewed is True
+    assert PullRequestSnapshot(pr_info=pr, iteration_id=3).already_reviewed is False
+    with pytest.raises(ValidationError):
+        snapshot.iteration_id = 4  # type: ignore[misc]
+
+
+def test_changed_files_label_marks_floor():
+    """Testa que a contagem parcial de arquivos aparece como piso"""
+    pr = PullRequestInfo(
+        id=1,
+        title="Test",
+        source_branch="feat/x",
+        target_branch="main",
+        is_draft=False,
+        additions=0,
+        deletions=0,
+        changed_files_count=100,
+    )
+
+    assert pr.changed_files_label == "100"
+    assert pr.model_copy(update={"changed_files_is_floor": True}).changed_files_label == "100+"
@@ -0,0 +1,85 @@
+"""
+Testes para BlobCache
+"""
+
+import os
+import zlib
+from pathlib import Path
+
+from src.infrastructure.cache.blob_cache import BlobCache
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+SHA_C = "c" * 40
+
+
+def test_put_and_get_roundtrip(tmp_path: Path):
+    """Testa que conteúdo gravado é recuperado e contabilizado como hit."""
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+
+    cache.put(SHA_A, "conteúdo ç\n" * 100)
+
+    assert cache.get(SHA_A) == "conteúdo ç\n" * 100
+    assert cache.stats.hits == 1
+    assert cache.stats.bytes_saved == len(("conteúdo ç\n" * 100).encode("utf-8"))
+
+
+def test_blobs_are_stored_compressed(tmp_path: Path):
+    """Testa que o arquivo em disco é menor que o conteúdo original."""
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+    content = "linha repetida\n" * 1000
+
+    cache.put(SHA_A, content)
+
+    stored = tmp_path / SHA_A[:2] / f"{SHA_A}.z"
+    assert stored.exists()
+    assert stored.stat().st_size < len(content)
+    assert cache.total_bytes == stored.stat().st_size
+
+
+def test_get_miss_counts(tmp_path: Path):
+    """Testa que blobs ausentes contam como miss."""
+    cache = BlobCache(tmp_path, max_bytes=1024)
+
+    assert cache.get(SHA_A) is None
+    assert cache.stats.misses == 1
+
+
+def test_rejects_non_object_id_keys(tmp_path: Path):
+    """Testa que chaves que não são objectIds não tocam o disco."""
+    cache = BlobCache(tmp_path, max_bytes=1024)
+
+    assert cache.is_cacheable("../../etc/passwd") is False
+    assert cache.is_cacheable(None) is False
+    assert cache.get("../../etc/passwd") is None
+    assert cache.stats.misses == 0
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    """Testa que o limite de tamanho remove o blob menos usado."""
+    content = os.urandom(300).hex()  # Incompressível o bastante para ocupar espaço
+    cache = BlobCache(tmp_path, max_bytes=1)
+    cache.put(SHA_A, content)  # Maior que o limite: não é gravado
+    assert cache.total_bytes == 0
+
+    size = len(zlib.compress(content.encode()))
+    cache = BlobCache(tmp_path, max_bytes=size * 2)
+    cache.put(SHA_A, content)
+    cache.put(SHA_B, content)
+    cache.get(SHA_A)  # A passa a ser o mais recente
+    cache.put(SHA_C, content)
+
+    assert cache.get(SHA_B) is None
+    assert cache.get(SHA_A) == content
+    assert cache.get(SHA_C) == content
+    assert cache.total_bytes <= size * 2
+
+
+def test_index_is_rebuilt_from_disk(tmp_path: Path):
+    """Testa que outra execução reaproveita blobs gravados anteriormente."""
+    BlobCache(tmp_path, max_bytes=1024 * 1024).put(SHA_A, "persistido")
+
+    cache = BlobCache(tmp_path, max_bytes=1024 * 1024)
+
+    assert cache.total_bytes > 0
+    assert cache.get(SHA_A) == "persistido"
@@ -0,0 +1,106 @@
+"""
+Testes para os algoritmos de diff e o benchmark
+"""
+
+import difflib
+import random
+
+import pytest
+from src.infrastructure.diff.benchmark import build_corpus, format_results, run_benchmark
+from src.infrastructure.diff.engines import (
+    DiffEngineSelector,
+    DifflibEngine,
+    HistogramEngine,
+    blocks_to_opcodes,
+    format_unified,
+    histogram_blocks,
+)
+
+
+def apply_opcodes(a: list[str], b: list[str], opcodes: list[tuple[str, int, int, int, int]]):
+    result: list[str] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            result += a[i1:i2]
+        else:
+            result += b[j1:j2]
+    return result
+
+
+def random_pair(rng: random.Random) -> tuple[list[str], list[str]]:
+    a = [f"{rng.randint(0, 5)}\n" for _ in range(rng.randint(0, 30))]
+    b = list(a)
+    for _ in range(rng.randint(0, 6)):
+        roll = rng.random()
+        if roll < 0.3 and b:
+            del b[rng.randrange(len(b))]
+        elif roll < 0.6:
+            b.insert(rng.randint(0, len(b)), f"{rng.randint(0, 8)}\n")
+        elif b:
+            b[rng.randrange(len(b))] = f"x{rng.randint(0, 3)}\n"
+    return a, b
+
+
+def test_histogram_opcodes_rebuild_source():
+    """Testa que os opcodes do histogram transformam a base exatamente na nova versão."""
+    rng = random.Random(7)
+    for _ in range(500):
+        a, b = random_pair(rng)
+        assert apply_opcodes(a, b, blocks_to_opcodes(histogram_blocks(a, b))) == b
+
+
+def test_format_unified_matches_difflib_output():
+    """Testa que o formatador gera a mesma saída do difflib para os mesmos opcodes."""
+    rng = random.Random(3)
+    for _ in range(300):
+        a, b = random_pair(rng)
+        matcher = difflib.SequenceMatcher(None, a, b)
+        blocks = [(m.a, m.b, m.size) for m in matcher.get_matching_blocks()]
+        expected = list(difflib.unified_diff(a, b, "a/x", "b/x", lineterm=""))
+
+        assert format_unified(a, b, blocks_to_opcodes(blocks), "a/x", "b/x") == expected
+
+
+def test_histogram_keeps_repetitive_files_compact():
+    """Testa que blocos repetitivos reordenados não viram um diff do arquivo inteiro."""
+    case = next(c for c in build_corpus(scale=0.2) if c.name == "generated_config")
+
+    difflib_diff = DifflibEngine().unified_diff(case.base, case.source, "a", "b")
+    histogram_diff = HistogramEngine().unified_diff(case.base, case.source, "a", "b")
+
+    assert len(histogram_diff) < len(difflib_diff) / 2
+
+
+@pytest.mark.parametrize(
+    ("preference", "lines", "expected"),
+    [("auto", 10, "difflib"), ("auto", 5000, "histogram"), ("histogram", 10, "histogram")],
+)
+def test_selector_picks_engine_by_size(preference: str, lines: int, expected: str):
+    """Testa a escolha do algoritmo pelo número de linhas e pela preferência."""
+    selector = DiffEngineSelector(preference, large_file_lines=2000)  # type: ignore[arg-type]
+    selector.engines.pop("accelerated", None)
+
+    assert selector.select(lines).name == expected
+
+
+def test_selector_falls_back_without_accelerated_backend():
+    """Testa que "accelerated" sem o pacote instalado usa o difflib."""
+    selector = DiffEngineSelector("accelerated")
+    selector.engines.pop("accelerated", None)
+
+    assert selector.select(10).name == "difflib"
+
+
+def test_benchmark_reports_every_engine_and_case():
+    """Testa que o benchmark mede todos os algoritmos em todos os casos do corpus."""
+    engines = {"difflib": DifflibEngine(), "histogram": HistogramEngine()}
+    results = run_benchmark(build_corpus(scale=0.05), engines, repeat=1)
+
+    assert {(r.case, r.engine) for r in results} == {
+        (case, engine)
+        for case in ("small_edit", "php_class", "generated_config", "sql_dump")
+        for engine in engines
+    }
+    assert all(r.hunks > 0 and r.changed_lines > 0 for r in results)
+    assert "generated_config" in format_results(results)
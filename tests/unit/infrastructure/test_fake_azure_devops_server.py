@@ -0,0 +1,148 @@
+"""
+Testes para o servidor fake do Azure DevOps
+"""
+
+import subprocess
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+import requests
+from src.adapters.azure_devops_adapter import AzureDevOpsAdapter
+from src.adapters.diff_adapter import DiffAdapter
+from src.infrastructure.config.settings import AzureDevOpsConfig, ReviewBehavior, ReviewLimits
+from src.infrastructure.fakes import FakeAzureDevOpsServer, FakeServerConfig, SyntheticRepository
+from src.infrastructure.fakes.azure_devops_server import (
+    SOURCE_COMMIT,
+    TARGET_COMMIT,
+    git_object_id,
+)
+from src.infrastructure.http.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def repo() -> SyntheticRepository:
+    return SyntheticRepository.generate("repo-0", files=15, lines=40, binary_files=1)
+
+
+@pytest.fixture
+def server(repo: SyntheticRepository) -> Iterator[FakeAzureDevOpsServer]:
+    with FakeAzureDevOpsServer([repo]) as server:
+        yield server
+
+
+def make_config(server: FakeAzureDevOpsServer) -> AzureDevOpsConfig:
+    return AzureDevOpsConfig(
+        base_url=server.base_url, org="org", project="proj", pat="token", changes_page_size=10
+    )
+
+
+def test_synthetic_repository_is_deterministic():
+    """Testa que a mesma semente gera o mesmo repositório, com objectIds do git."""
+    first = SyntheticRepository.generate("repo", files=10, seed=3)
+    second = SyntheticRepository.generate("repo", files=10, seed=3)
+
+    assert first.changes == second.changes
+    assert first.trees != SyntheticRepository.generate("repo", files=10, seed=4).trees
+
+    content = b"print('oi')\n"
+    expected = subprocess.run(
+        ["git", "hash-object", "--stdin"], input=content, capture_output=True, check=False
+    )
+    if expected.returncode == 0:
+        assert git_object_id(content) == expected.stdout.decode().strip()
+
+
+def test_vcs_adapter_pages_through_fake_server(
+    server: FakeAzureDevOpsServer, repo: SyntheticRepository
+):
+    """Testa snapshot, paginação, threads e propriedades contra o servidor fake."""
+    vcs = AzureDevOpsAdapter(make_config(server))
+
+    snapshot = vcs.fetch_pr_snapshot("repo-0", 1, incremental=True)
+    remaining = list(vcs.iter_pr_files("repo-0", 1, iteration_id=1, skip=snapshot.next_skip))
+
+    assert snapshot.pr_info.source_commit == repo.commit(SOURCE_COMMIT)
+    assert (len(snapshot.changes), snapshot.next_skip) == (10, 10)
+    assert [*snapshot.changes, *remaining] == repo.changes
+    assert server.stats.requests["changes"] == 2
+
+    assert vcs.post_comment("repo-0", 1, "/src/pkg_0/module_0.py", 1, 2, "texto") is True
+    assert vcs.post_comment("repo-0", 1, "/src/pkg_0/module_0.py", 1, 2, "texto") is True
+    assert len(server.app.threads[("repo-0", 1)]) == 1
+
+    vcs.set_last_reviewed_iteration("repo-0", 1, 1)
+    assert vcs.fetch_pr_snapshot("repo-0", 1, incremental=True).already_reviewed is True
+
+
+@pytest.mark.parametrize("fetch_mode", ["per_file", "batch", "archive"])
+def test_diff_adapter_against_fake_server(
+    server: FakeAzureDevOpsServer, repo: SyntheticRepository, fetch_mode: Any
+):
+    """Testa o diff nos três modos: mesmo resultado e nada do que só mudou no destino."""
+
+    def diff(mode: Any) -> tuple[str, int, int]:
+        adapter = DiffAdapter(ReviewBehavior(fetch_mode=mode), ReviewLimits(), make_config(server))
+        return adapter.generate_diff(
+            "repo-0",
+            repo.changes,
+            "feature",
+            "main",
+            source_commit=repo.commit(SOURCE_COMMIT),
+            target_commit=repo.commit(TARGET_COMMIT),
+        )
+
+    diff_text, additions, deletions = diff(fetch_mode)
+
+    assert (diff_text, additions, deletions) == diff("per_file")
+    assert additions > 0 and deletions > 0
+    assert "alterado no destino" not in diff_text
+    assert "⚠️" not in diff_text
+    assert "⏭️ Ignorado: arquivo binário" in diff_text
+
+
+def test_fake_server_throttles_with_retry_after(repo: SyntheticRepository):
+    """Testa o 429 com Retry-After e X-RateLimit-* quando o bucket do servidor esvazia."""
+    config = FakeServerConfig(rate_limit_per_second=0.5, rate_limit_burst=1)
+    with FakeAzureDevOpsServer([repo], config) as server:
+        url = f"{server.base_url}/org/proj/_apis/git/repositories/repo-0/pullRequests/1"
+
+        first = requests.get(url, timeout=5)
+        second = requests.get(url, timeout=5)
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "2"
+        # Orçamento da janela (0.5/s em 10 s), com uma requisição já aceita
+        assert second.headers["X-RateLimit-Limit"] == "5"
+        assert second.headers["X-RateLimit-Remaining"] == "4"
+        assert server.stats.throttled == 1
+
+
+def test_fake_server_answers_not_modified(server: FakeAzureDevOpsServer):
+    """Testa ETag/If-None-Match nas leituras JSON (cache de validadores)."""
+    url = f"{server.base_url}/org/proj/_apis/git/repositories/repo-0/pullRequests/1/iterations"
+
+    first = requests.get(url, timeout=5)
+    second = requests.get(url, headers={"If-None-Match": first.headers["ETag"]}, timeout=5)
+    missing = requests.get(url.replace("repo-0", "outro"), timeout=5)
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert missing.status_code == 404
+
+
+def test_transport_retries_throttled_http_calls(repo: SyntheticRepository):
+    """Testa que o transporte também cobre http://: 429 repetido após a pausa e métricas."""
+    config = FakeServerConfig(rate_limit_per_second=2, rate_limit_burst=1)
+    with FakeAzureDevOpsServer([repo], config) as server:
+        vcs = AzureDevOpsAdapter(make_config(server), rate_limiter=RateLimiter(rate=100, burst=100))
+
+        infos = [vcs.get_pr_info("repo-0", 1) for _ in range(3)]
+
+        assert all(info.source_commit == repo.commit(SOURCE_COMMIT) for info in infos)
+        assert server.stats.throttled >= 1
+        # Métricas contam a chamada já resolvida (o 429 é repetido dentro do adapter)
+        assert vcs.http.metrics.requests == 3
+        assert vcs.http.metrics.errors == 0
+        assert vcs.http.metrics.bytes_received > 0
@@ -2,8 +2,14 @@
 Testes para formatting utilities
 """
 
+from src.core.domain.file_diff import LineIndex
 from src.core.domain.file_review import FileReview, Issue
-from src.infrastructure.utils.formatting import calculate_line_range, format_file_comment
+from src.infrastructure.utils.formatting import (
+    calculate_line_range,
+    format_consolidated_comment,
+    format_file_comment,
+    group_by_directory,
+)
 
 
 def test_calculate_line_range_empty():
@@ -153,3 +159,38 @@ def test_format_file_comment_multiline_issues():
 
     assert "Very long issue description that spans multiple words" in comment
     assert comment.count("-") >= 1  # Pelo menos um item de lista
+
+
+def test_group_by_directory_preserves_order():
+    """Testa agrupamento por diretório na ordem de chegada"""
+    reviews = [FileReview(filepath=path) for path in ["/b/x.py", "/a/y.py", "/b/z.py", "r.py"]]
+
+    groups = group_by_directory(reviews)
+
+    assert list(groups) == ["/b", "/a", "/"]
+    assert [r.filepath for r in groups["/b"]] == ["/b/x.py", "/b/z.py"]
+
+
+def test_format_consolidated_comment_links_files_and_lines():
+    """Testa comentário consolidado com índice e links por linha"""
+    review = FileReview(
+        filepath="/src/app.py",
+        critical_issues=[Issue(text="Bug", line=7)],
+        suggestions=[Issue(text="Sem linha")],
+    )
+
+    comment = format_consolidated_comment("Review", [review], "https://pr")
+
+    assert comment.startswith("🤖 **Review**")
+    assert "- [`/src/app.py`](https://pr?_a=files&path=/src/app.py) — 1🔴 0🟡 1🟢" in comment
+    assert "- Bug ([L7](https://pr?_a=files&path=/src/app.py&line=7&lineEnd=7" in comment
+    assert "- Sem linha\n" in comment + "\n"
+    assert "📊" not in comment
+
+
+def test_calculate_line_range_stays_inside_hunk():
+    """Testa que, com o índice de linhas, o intervalo não sai do hunk do centro"""
+    index = LineIndex.build(["@@ -10,3 +10,4 @@", " a\n", "+b\n", "+c\n", " d\n"])
+
+    assert calculate_line_range([11], context=6, line_index=index) == (10, 13)
+    assert calculate_line_range([], context=6, line_index=index) == (10, 13)
@@ -0,0 +1,131 @@
+"""
+Testes para a detecção de arquivos gerados e vendorizados
+"""
+
+import base64
+import random
+from pathlib import Path
+
+from src.infrastructure.diff import generated
+from src.infrastructure.diff.generated import GeneratedFileDetector, GitAttributes
+
+
+def test_gitattributes_linguist_rules_last_match_wins():
+    """Testa padrões por nome e ancorados na raiz, valores falsos e sobrescrita."""
+    attributes = GitAttributes.parse(
+        "# comentário\n"
+        "*.pb.go linguist-generated\n"
+        "/api/gen/** linguist-generated=true\n"
+        "api/gen/manual.go -linguist-generated\n"
+        "third_party/** linguist-vendored\n"
+        "*.md text eol=lf\n"
+    )
+
+    assert attributes.linguist_reason("/pkg/x/foo.pb.go") == "gerado (linguist-generated)"
+    assert attributes.linguist_reason("/api/gen/v1/client.py") == "gerado (linguist-generated)"
+    assert attributes.linguist_reason("/api/gen/manual.go") is None
+    assert attributes.linguist_reason("/src/api/gen/client.py") is None
+    assert attributes.linguist_reason("/third_party/lib/a.c") == "vendorizado (linguist-vendored)"
+    assert attributes.linguist_reason("/README.md") is None
+
+
+def test_detector_recognizes_generated_headers():
+    """Testa cabeçalhos de geradores no comentário inicial e ignora menções no código."""
+    detector = GeneratedFileDetector()
+
+    headers = [
+        "// Code generated by protoc-gen-go. DO NOT EDIT.\n",
+        "#!/usr/bin/env python\n# Generated by the protocol buffer compiler.  DO NOT EDIT!\n",
+        "//------------------------------------------------------------------------------\n"
+        "// <auto-generated>\n",
+        "// Jest Snapshot v1, https://goo.gl/fbAQLP\n",
+        "/**\n * Copyright\n *\n * @generated\n */\n",
+    ]
+
+    assert all(detector.detect(header + "x = 1\n") for header in headers)
+    assert detector.detect("x = 1\n# Code generated by sqlc. DO NOT EDIT.\n") is None
+    assert GeneratedFileDetector(header_bytes=10).detect("# DO NOT EDIT\n" + "x = 1\n" * 5) is None
+
+
+def test_detector_ignores_ordinary_comments():
+    """Testa comentários comuns no cabeçalho que só citam geração ou edição."""
+    detector = GeneratedFileDetector()
+
+    comments = [
+        "# Do not modify this constant without updating the schema\n",
+        "/*\n * Generated by the invoice module when the order closes\n */\n",
+        "// Auto-generated IDs are validated here\n",
+        "# Generated by Django 4.2 on 2024-05-01 10:00\n",
+        "#\n# do not edit\n",
+    ]
+
+    assert [detector.detect(comment + "x = 1\n") for comment in comments] == [None] * 5
+
+
+def test_detector_reason_is_a_single_header_line():
+    """Testa que o motivo traz só a linha do marcador, sem quebras de linha."""
+    reason = GeneratedFileDetector().detect(
+        "#\n#\n# Code generated by sqlc. DO NOT EDIT.\n# versions: sqlc v1.20.0\nx = 1\n"
+    )
+
+    assert reason == 'gerado (cabeçalho "Code generated by sqlc. DO NOT EDIT.")'
+
+
+def test_detector_heuristics_are_configurable():
+    """Testa linhas longas (minificado) e entropia alta (base64), e o 0 que desliga."""
+    rng = random.Random(0)
+    minified = "var a=function(){return 1};" * 200
+    encoded = base64.encodebytes(rng.randbytes(6000)).decode()
+    code = "".join(f"def funcao_{i}(valor):\n    return valor * {i}\n" for i in range(100))
+
+    assert "média de" in (GeneratedFileDetector().detect(minified) or "")
+    assert "entropia" in (GeneratedFileDetector().detect(encoded) or "")
+    assert GeneratedFileDetector().detect(code) is None
+    assert GeneratedFileDetector(max_average_line_length=0, max_entropy=0).detect(encoded) is None
+
+
+def test_detector_skips_preamble_before_header():
+    """Testa cabeçalhos depois de <?php, <?xml ...?> e shebang com declaração de encoding."""
+    detector = GeneratedFileDetector()
+
+    files = [
+        "<?php\n// Code generated by protoc-gen-php. DO NOT EDIT.\n$x = 1;\n",
+        "<?php /** @generated */\n$x = 1;\n",
+        '<?xml version="1.0" encoding="utf-8"?>\n<!-- <auto-generated> -->\n<root/>\n',
+        "#!/usr/bin/env php\n# -*- coding: utf-8 -*-\n<?php\n"
+        "// Code generated by sqlc. DO NOT EDIT.\n$x = 1;\n",
+    ]
+
+    assert all(detector.detect(text) for text in files)
+    assert detector.detect("<?php\n$x = 1;\n// Code generated by x. DO NOT EDIT.\n") is None
+
+
+def test_detector_does_not_flag_its_own_source():
+    """Testa que os marcadores no código do detector não o fazem parecer gerado."""
+    source = Path(generated.__file__).read_text(encoding="utf-8")
+
+    assert GeneratedFileDetector().detect(source) is None
+
+
+def test_detector_entropy_ignores_non_latin_text():
+    """Testa um recurso de i18n em chinês, com entropia alta por caractere, como código."""
+    strings = [
+        "欢迎使用订单管理系统，请先登录您的账户。",
+        "您的密码已过期，请在下一次登录时修改密码。",
+        "无法连接到服务器，请检查网络设置后重试。",
+        "付款成功！我们会在三个工作日内为您发货。",
+        "该商品库存不足，预计到货时间为下周五。",
+        "请输入有效的电子邮件地址和手机号码。",
+        "您确定要删除这条记录吗？此操作无法撤销。",
+        "发票已生成，可在个人中心的账单页面下载。",
+        "系统维护通知：本周六凌晨两点至四点暂停服务。",
+        "感谢您的反馈，客服人员将尽快与您联系。",
+        "优惠券仅限新用户首次下单时使用。",
+        "退货申请已提交，审核结果将通过短信通知。",
+    ]
+    resource = "".join(f'  "message.{i}": "{text}",\n' for i, text in enumerate(strings * 3))
+    text = "{\n" + resource + '  "end": ""\n}\n'
+
+    assert len(text) > 1024
+    assert generated.shannon_entropy(text) > GeneratedFileDetector().max_entropy
+    assert GeneratedFileDetector().detect(text) is None
@@ -0,0 +1,90 @@
+"""
+Testes para GitMirror e GitMirrorStore
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from src.infrastructure.git.mirror import GitMirror, GitMirrorStore
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git indisponível")
+
+
+def git(path: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+def commit(path: Path, name: str, content: str) -> str:
+    (path / name).write_text(content)
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", name)
+    return git(path, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def remote(tmp_path: Path) -> Path:
+    """Repositório "remoto" com main e feature."""
+    path = tmp_path / "remote"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    commit(path, "app.py", "a\n")
+    git(path, "checkout", "-q", "-b", "feature")
+    commit(path, "app.py", "a\nb\n")
+    git(path, "checkout", "-q", "main")
+    return path
+
+
+def test_mirror_fetches_only_when_commits_are_missing(
+    tmp_path: Path, remote: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Testa que o mirror é criado na primeira PR e só busca de novo quando falta commit."""
+    mirror = GitMirror(tmp_path / "mirrors" / "repo.git", str(remote))
+    fetches: list[list[str]] = []
+    original_fetch = GitMirror.fetch
+
+    def counting_fetch(self: GitMirror, refspecs: list[str]) -> None:
+        fetches.append(refspecs)
+        original_fetch(self, refspecs)
+
+    monkeypatch.setattr(GitMirror, "fetch", counting_fetch)
+    main, feature = git(remote, "rev-parse", "main"), git(remote, "rev-parse", "feature")
+
+    assert mirror.ensure_commits([feature, main], ["feature", "main"]) is True
+    assert mirror.ensure_commits([feature, main], ["feature", "main"]) is True
+    assert len(fetches) == 1
+    assert (mirror.path / "HEAD").exists()
+    assert mirror.merge_base(main, feature) == main
+
+    git(remote, "checkout", "-q", "feature")
+    new_feature = commit(remote, "app.py", "a\nb\nc\n")
+
+    assert mirror.ensure_commits([new_feature, main], ["feature", "main"]) is True
+    assert len(fetches) == 2
+    assert "+c\n" in mirror.diff(main, new_feature, ["app.py"])["app.py"].lines
+
+
+def test_mirror_reports_unreachable_commit(tmp_path: Path, remote: Path):
+    """Testa que um commit inexistente no remoto resulta em False, não em exceção."""
+    mirror = GitMirror(tmp_path / "repo.git", str(remote))
+
+    assert mirror.ensure_commits(["f" * 40], ["main"]) is False
+
+
+def test_mirror_store_builds_url_and_safe_path(tmp_path: Path):
+    """Testa o caminho sanitizado e a URL do remoto por repositório."""
+    store = GitMirrorStore(tmp_path, "https://dev.azure.com/org/proj/_git/{repo_id}", token="pat")
+
+    mirror = store.get("../meu repo")
+
+    assert mirror.path == tmp_path / ".._meu_repo.git"
+    assert mirror.remote_url == "https://dev.azure.com/org/proj/_git/..%2Fmeu%20repo"
+    assert mirror.env["GIT_CONFIG_KEY_0"] == "http.extraHeader"
+    assert "pat" not in mirror.env["GIT_CONFIG_VALUE_0"]
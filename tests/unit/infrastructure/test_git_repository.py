@@ -0,0 +1,109 @@
+"""
+Testes para GitRepository e parse_git_diff
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from src.infrastructure.git.repository import GitError, GitRepository, parse_git_diff
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git indisponível")
+
+
+def git(path: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> tuple[Path, str, str]:
+    """Repositório com main avançando depois do fork da feature; retorna (path, main, feature)."""
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "keep.py").write_text("a\nb\nc\nd\ne\nf\n")
+    (tmp_path / "old name.py").write_text("".join(f"linha {i}\n" for i in range(20)))
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+
+    git(tmp_path, "checkout", "-q", "-b", "feature")
+    (tmp_path / "keep.py").write_text("a\nb\nc\nd\ne\nf\nnovo\n")
+    git(tmp_path, "mv", "old name.py", "new name.py")
+    (tmp_path / "logo.bin").write_bytes(b"\0\1\2\3")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "feature")
+    feature = git(tmp_path, "rev-parse", "HEAD")
+
+    git(tmp_path, "checkout", "-q", "main")
+    (tmp_path / "main_only.py").write_text("x\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "main avança")
+    main = git(tmp_path, "rev-parse", "HEAD")
+    return tmp_path, main, feature
+
+
+def test_parse_git_diff_splits_files_and_detects_rename():
+    """Testa que a saída do git diff é separada por arquivo, sem o cabeçalho estendido."""
+    output = (
+        "diff --git a/a b.py b/a b.py\n"
+        "index 1..2 100644\n"
+        "--- a/a b.py\n"
+        "+++ b/a b.py\n"
+        "@@ -1 +1 @@\n"
+        "-x\n"
+        "+y\n"
+        "diff --git a/old.py b/new.py\n"
+        "similarity index 100%\n"
+        "rename from old.py\n"
+        "rename to new.py\n"
+        "diff --git a/img.png b/img.png\n"
+        "Binary files a/img.png and b/img.png differ\n"
+    )
+
+    diffs = parse_git_diff(output)
+
+    assert diffs["a b.py"].lines[0] == "--- a/a b.py\n"
+    assert diffs["a b.py"].lines[-1] == "+y\n"
+    assert diffs["new.py"].old_path == "old.py"
+    assert diffs["new.py"].lines == []
+    assert diffs["img.png"].binary is True
+
+
+def test_repository_commits_and_merge_base(repo: tuple[Path, str, str]):
+    """Testa has_commit e merge_base em um repositório real."""
+    path, main, feature = repo
+    repository = GitRepository(path)
+
+    assert GitRepository.is_repository(path) is True
+    assert GitRepository.is_repository(path / "nao-existe") is False
+    assert repository.has_commit(feature) is True
+    assert repository.has_commit("0" * 40) is False
+    assert repository.merge_base(main, feature) == git(path, "rev-parse", "main~1")
+
+
+def test_repository_diff_from_merge_base(repo: tuple[Path, str, str]):
+    """Testa que o diff a partir do merge base ignora o que só mudou na main."""
+    path, main, feature = repo
+    repository = GitRepository(path)
+    base = repository.merge_base(main, feature)
+    assert base is not None
+
+    diffs = repository.diff(
+        base, feature, ["keep.py", "old name.py", "new name.py", "logo.bin", "main_only.py"]
+    )
+
+    assert set(diffs) == {"keep.py", "new name.py", "logo.bin"}
+    assert "+novo\n" in diffs["keep.py"].lines
+    assert diffs["new name.py"].old_path == "old name.py"
+    assert diffs["logo.bin"].binary is True
+
+
+def test_repository_run_raises_git_error(tmp_path: Path):
+    """Testa que falhas do git viram GitError com a mensagem do stderr."""
+    with pytest.raises(GitError):
+        GitRepository(tmp_path).run("rev-parse", "HEAD")
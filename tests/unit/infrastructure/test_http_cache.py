@@ -0,0 +1,81 @@
+"""
+Testes para HttpValidatorCache
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.infrastructure.cache.http_cache import CachedResponse, HttpValidatorCache
+
+URL = "https://dev.azure.com/org/proj/_apis/git/repositories/repo/pullrequests/1"
+
+
+def test_put_and_get_roundtrip(tmp_path: Path):
+    """Testa que ETag e corpo são recuperados para a mesma requisição."""
+    cache = HttpValidatorCache(tmp_path)
+
+    cache.put(URL, {"api-version": "7.0"}, '"abc"', {"title": "PR"})
+
+    assert cache.get(URL, {"api-version": "7.0"}) == CachedResponse('"abc"', {"title": "PR"})
+    assert cache.get(URL, {"api-version": "7.1"}) is None
+    assert cache.stats.misses == 1
+
+
+def test_key_ignores_param_order():
+    """Testa que a ordem dos parâmetros não muda a chave."""
+    assert HttpValidatorCache.key(URL, {"a": 1, "b": 2}) == HttpValidatorCache.key(
+        URL, {"b": 2, "a": 1}
+    )
+
+
+def test_revalidated_returns_body_and_counts_hit(tmp_path: Path):
+    """Testa que um 304 devolve o corpo guardado e contabiliza bytes economizados."""
+    cache = HttpValidatorCache(tmp_path)
+    cache.put(URL, None, '"v1"', {"value": [1, 2]})
+    cached = cache.get(URL)
+    assert cached is not None
+
+    assert cache.revalidated(URL, None, cached) == {"value": [1, 2]}
+    assert cache.stats.hits == 1
+    assert cache.stats.bytes_saved > 0
+
+
+def test_entries_persist_and_evict_least_recently_used(tmp_path: Path):
+    """Testa que o índice é recarregado do disco e respeita max_entries."""
+    cache = HttpValidatorCache(tmp_path, max_entries=2)
+    cache.put(f"{URL}/a", None, "a", 1)
+    cache.put(f"{URL}/b", None, "b", 2)
+
+    reloaded = HttpValidatorCache(tmp_path, max_entries=2)
+    reloaded.put(f"{URL}/c", None, "c", 3)
+
+    assert len(reloaded) == 2
+    assert reloaded.get(f"{URL}/c") is not None
+    assert len(list(tmp_path.glob("*/*.json"))) == 2
+
+
+def test_corrupted_entry_is_ignored(tmp_path: Path):
+    """Testa que arquivo inválido vira miss em vez de erro."""
+    cache = HttpValidatorCache(tmp_path)
+    cache.put(URL, None, "v", {"ok": True})
+    next(tmp_path.glob("*/*.json")).write_text("{quebrado")
+
+    assert cache.get(URL) is None
+
+
+def test_concurrent_puts_keep_index_within_limit(tmp_path: Path):
+    """Testa put/get/evict de várias threads sem corromper o índice LRU."""
+    cache = HttpValidatorCache(tmp_path, max_entries=10)
+
+    def work(worker: int) -> None:
+        for i in range(50):
+            params = {"worker": worker, "i": i}
+            cache.put(URL, params, f'"{worker}-{i}"', {"i": i})
+            cache.get(URL, params)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(work, range(4)))
+
+    assert len(cache) == 10
+    assert cache.stats.misses == 200
+    assert len(list(tmp_path.glob("*/*.json"))) == 10
@@ -6,6 +6,8 @@ from pytest import CaptureFixture
 from src.core.domain.file_review import FileReview, Issue
 from src.core.domain.pull_request import PullRequestInfo
 from src.core.domain.review_result import ReviewResult
+from src.infrastructure.cache.blob_cache import CacheStats
+from src.infrastructure.http.transport import TransportMetrics
 from src.infrastructure.utils.output import print_summary
 
 
@@ -62,3 +64,34 @@ def test_print_summary_shows_detailed_comments(capsys: CaptureFixture[str]):
     assert "📋 COMENTÁRIOS QUE SERIAM POSTADOS" in captured
     assert "src/security.py" in captured
     assert "Na linha 10" in captured
+
+
+def test_print_summary_shows_cache_stats(capsys: CaptureFixture[str]):
+    """Testa que contadores do cache aparecem no resumo quando informados."""
+    result = make_review_result()
+
+    print_summary(result, cache_stats=CacheStats(hits=3, misses=2, bytes_saved=2048))
+
+    captured = capsys.readouterr().out
+    assert "Cache de blobs: 3 hits, 2 misses, 2.0 KB economizados" in captured
+
+
+def test_print_summary_shows_http_metrics(capsys: CaptureFixture[str]):
+    """Testa que as métricas do transporte HTTP aparecem no resumo quando informadas."""
+    result = make_review_result()
+    metrics = TransportMetrics(
+        requests=12,
+        errors=1,
+        bytes_received=4096,
+        request_seconds=2.5,
+        first_started=10.0,
+        last_finished=11.0,
+    )
+
+    print_summary(result, http_metrics=metrics)
+
+    captured = capsys.readouterr().out
+    assert (
+        "HTTP: 12 requisições, 1 erros, 4.0 KB recebidos, "
+        "1.0s decorridos (2.5s somando as requisições)"
+    ) in captured
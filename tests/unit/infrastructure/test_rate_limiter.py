@@ -0,0 +1,143 @@
+"""
+Testes para RateLimiter e RateLimitedHTTPAdapter
+"""
+
+import io
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from src.infrastructure.http.rate_limiter import (
+    RateLimitedHTTPAdapter,
+    RateLimiter,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(clock: FakeClock, state_path: Path | None = None) -> RateLimiter:
+    return RateLimiter(rate=2, burst=2, state_path=state_path, clock=clock, sleep=clock.sleep)
+
+
+def test_burst_then_paced():
+    """Testa que a rajada passa direto e as próximas seguem a taxa configurada."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    waits = [limiter.reserve() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+
+
+def test_retry_after_blocks_bucket():
+    """Testa que Retry-After pausa as próximas requisições."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    limiter.observe(429, {"Retry-After": "7"})
+
+    assert limiter.reserve() == pytest.approx(7.0)
+
+
+def test_remaining_budget_slows_rate_gradually():
+    """Testa que o ritmo cai aos poucos com X-RateLimit-Remaining baixo, até o piso."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "100"})
+    waits = [limiter.reserve() for _ in range(3)]
+
+    # Uma resposta só: fator 0.85 (EWMA), bucket limitado a 1.7 tokens
+    assert waits == pytest.approx([0.0, 0.3 / 1.7, 1.3 / 1.7])
+
+    for _ in range(50):
+        limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "100"})
+    clock.now += 100
+
+    waits = [limiter.reserve() for _ in range(3)]
+    # No piso (25% da taxa): a rajada passa e depois um slot a cada 2 s
+    assert waits == pytest.approx([0.0, 0.0, 2.0], abs=1e-3)
+
+
+def test_slowdown_does_not_reprice_queued_reservations():
+    """Testa que reservas já na fila mantêm o horário; só as novas seguem o ritmo menor."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    queued = [limiter.reserve() for _ in range(6)]
+
+    limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "100"})
+
+    assert queued == pytest.approx([0.0, 0.0, 0.5, 1.0, 1.5, 2.0])
+    assert limiter.reserve() == pytest.approx(2.0 + 1 / (2 * 0.85))
+
+
+def test_rate_limit_delay_header_pauses():
+    """Testa que X-RateLimit-Delay também vira pausa."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    limiter.observe(200, {"X-RateLimit-Delay": "2.5"})
+
+    assert limiter.reserve() == pytest.approx(2.5)
+
+
+def test_state_is_shared_through_sqlite(tmp_path: Path):
+    """Testa que dois limitadores no mesmo arquivo dividem o mesmo bucket."""
+    clock = FakeClock()
+    first = make_limiter(clock, tmp_path / "state.sqlite")
+    second = make_limiter(clock, tmp_path / "state.sqlite")
+
+    first.reserve()
+    first.reserve()
+    second.observe(429, {"Retry-After": "3"})
+
+    assert second.reserve() == pytest.approx(3.0)
+    assert first.reserve() == pytest.approx(3.0)
+    first.close()
+    second.close()
+
+
+def test_parse_retry_after_http_date():
+    """Testa Retry-After no formato de data HTTP."""
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:10 GMT", now=4.0) == pytest.approx(6.0)
+    assert parse_retry_after("inválido", now=0.0) is None
+
+
+def test_adapter_repeats_throttled_requests(monkeypatch: pytest.MonkeyPatch):
+    """Testa que o adapter espera a pausa do servidor e repete respostas 429."""
+    statuses = [429, 200]
+    sent: list[str] = []
+
+    def fake_send(self: HTTPAdapter, request: Any, *args: Any, **kwargs: Any):
+        sent.append(request.url)
+        response = requests.Response()
+        response.raw = io.BytesIO()
+        response.status_code = statuses.pop(0)
+        if response.status_code == 429:
+            response.headers["Retry-After"] = "4"
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    clock = FakeClock()
+    adapter = RateLimitedHTTPAdapter(make_limiter(clock))
+    request = requests.Request("GET", "https://dev.azure.com/x").prepare()
+
+    response = adapter.send(request)
+
+    assert response.status_code == 200
+    assert len(sent) == 2
+    assert clock.sleeps == pytest.approx([4.0])
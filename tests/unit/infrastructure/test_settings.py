@@ -3,11 +3,17 @@ Testes para Config Settings
 """
 
 import importlib
+from pathlib import Path
 
+import pytest
+from pydantic import ValidationError
 from pytest import MonkeyPatch
 from src.infrastructure.config.settings import (
     AzureDevOpsConfig,
+    CacheConfig,
     Config,
+    GitConfig,
+    HttpConfig,
     LLMConfig,
     ReviewBehavior,
     ReviewLimits,
@@ -22,6 +28,9 @@ def test_azure_devops_config_defaults(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.delenv("AZDO_ORG", raising=False)
     monkeypatch.delenv("AZDO_PROJECT", raising=False)
     monkeypatch.delenv("AZDO_API_VERSION", raising=False)
+    monkeypatch.delenv("AZDO_ASYNC_CLIENT", raising=False)
+    monkeypatch.delenv("AZDO_MAX_CONNECTIONS", raising=False)
+    monkeypatch.delenv("AZDO_BASE_URL", raising=False)
 
     config = AzureDevOpsConfig()
 
@@ -29,6 +38,15 @@ def test_azure_devops_config_defaults(monkeypatch: MonkeyPatch) -> None:
     assert config.project == ""
     assert config.pat == ""
     assert config.api_version == "7.0"
+    assert config.async_client is False
+    assert config.max_connections == 10
+    assert config.rate_limit_per_second == 0.0
+    assert config.rate_limit_burst == 20
+    assert config.base_url == "https://dev.azure.com"
+    assert config.project_url() == "https://dev.azure.com/finnetbrasil/"
+    assert AzureDevOpsConfig(base_url="http://127.0.0.1:8089/", project="p").project_url() == (
+        "http://127.0.0.1:8089/finnetbrasil/p"
+    )
 
 
 def test_azure_devops_config_get_token_from_env(monkeypatch: MonkeyPatch) -> None:
@@ -111,6 +129,8 @@ def test_review_limits_defaults(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.delenv("REVIEW_MAX_PR_SIZE_LINES", raising=False)
     monkeypatch.delenv("REVIEW_MAX_DIFF_LINES_PER_FILE", raising=False)
     monkeypatch.delenv("REVIEW_MAX_COMMENT_LENGTH", raising=False)
+    monkeypatch.delenv("REVIEW_FETCH_CONCURRENCY", raising=False)
+    monkeypatch.delenv("REVIEW_BATCH_CHUNK_SIZE", raising=False)
 
     limits = ReviewLimits()
 
@@ -121,6 +141,20 @@ def test_review_limits_defaults(monkeypatch: MonkeyPatch) -> None:
     assert limits.max_pr_size_lines == 2000
     assert limits.max_diff_lines_per_file == 400
     assert limits.max_comment_length == 150000
+    assert limits.fetch_concurrency == 8
+    assert limits.batch_chunk_size == 100
+    assert limits.post_concurrency == 4
+    assert limits.archive_threshold_files == 0
+    assert limits.max_archive_bytes == 50_000_000
+    assert limits.max_file_bytes == 1_000_000
+
+
+def test_review_limits_rejects_unreachable_archive_threshold() -> None:
+    """Testa que o limiar do modo archive não pode passar de max_files_to_analyze"""
+    assert ReviewLimits(max_files_to_analyze=30, archive_threshold_files=30)
+
+    with pytest.raises(ValidationError, match="archive_threshold_files"):
+        ReviewLimits(max_files_to_analyze=30, archive_threshold_files=200)
 
 
 def test_review_limits_custom_values(monkeypatch: MonkeyPatch) -> None:
@@ -144,6 +178,9 @@ def test_review_behavior_defaults():
     assert behavior.skip_label == "skip-review"
     assert behavior.context_lines == 6
     assert behavior.post_summary_comment is True
+    assert behavior.incremental is False
+    assert behavior.fetch_mode == "per_file"
+    assert behavior.post_mode == "per_file"
 
 
 def test_review_behavior_ignored_extensions():
@@ -183,6 +220,56 @@ def test_review_behavior_disable_skip_drafts(monkeypatch: MonkeyPatch) -> None:
     assert behavior.skip_drafts is False
 
 
+def test_cache_config_defaults(monkeypatch: MonkeyPatch) -> None:
+    """Testa valores padrão do CacheConfig"""
+    monkeypatch.delenv("REVIEW_CACHE_ENABLED", raising=False)
+    monkeypatch.delenv("REVIEW_CACHE_DIR", raising=False)
+    monkeypatch.delenv("REVIEW_CACHE_MAX_SIZE_MB", raising=False)
+
+    cache = CacheConfig()
+
+    assert cache.enabled is True
+    assert cache.dir == "~/.cache/code-review-bot"
+    assert cache.max_size_mb == 512
+    assert cache.http_max_entries == 2000
+
+
+def test_http_config_defaults(monkeypatch: MonkeyPatch) -> None:
+    """Testa valores padrão e override do HttpConfig"""
+    monkeypatch.setenv("AZDO_HTTP_POOL_SIZE", "4")
+
+    http = HttpConfig()
+
+    assert http.pool_size == 4
+    assert http.max_retries == 3
+    assert (http.connect_timeout, http.timeout, http.bulk_timeout) == (10.0, 30.0, 300.0)
+    assert http.gzip is True
+
+
+def test_git_config_repo_path(monkeypatch: MonkeyPatch) -> None:
+    """Testa que o checkout do pipeline é usado quando não há caminho configurado"""
+    monkeypatch.delenv("REVIEW_GIT_REPO_PATH", raising=False)
+    monkeypatch.setenv("BUILD_SOURCESDIRECTORY", "/agent/s")
+
+    assert GitConfig().get_repo_path() == "/agent/s"
+    assert GitConfig(repo_path="/repo").get_repo_path() == "/repo"
+    assert GitConfig(enabled=False).get_repo_path() is None
+
+    monkeypatch.delenv("BUILD_SOURCESDIRECTORY")
+    assert GitConfig().get_repo_path() is None
+
+
+def test_git_config_mirror_dir(monkeypatch: MonkeyPatch) -> None:
+    """Testa que mirrors são opt-in e ficam sob o diretório de cache por padrão"""
+    monkeypatch.delenv("REVIEW_GIT_MIRROR_ENABLED", raising=False)
+    monkeypatch.delenv("REVIEW_GIT_MIRROR_DIR", raising=False)
+
+    assert GitConfig().get_mirror_dir("/cache") is None
+    assert GitConfig(mirror_enabled=True).get_mirror_dir("/cache") == Path("/cache/mirrors")
+    assert GitConfig(mirror_enabled=True, mirror_dir="/m").get_mirror_dir("/cache") == Path("/m")
+    assert GitConfig(enabled=False, mirror_enabled=True).get_mirror_dir("/cache") is None
+
+
 def test_config_aggregation(monkeypatch: MonkeyPatch) -> None:
     """Testa agregação de todas as configs"""
     monkeypatch.setenv("LITELLM_API_BASE", "https://api.test.com")
@@ -194,6 +281,8 @@ def test_config_aggregation(monkeypatch: MonkeyPatch) -> None:
     assert isinstance(config.llm, LLMConfig)
     assert isinstance(config.limits, ReviewLimits)
     assert isinstance(config.behavior, ReviewBehavior)
+    assert isinstance(config.cache, CacheConfig)
+    assert isinstance(config.http, HttpConfig)
 
 
 def test_load_config_function(monkeypatch: MonkeyPatch) -> None:
@@ -0,0 +1,109 @@
+"""
+Testes para HttpTransport
+"""
+
+import asyncio
+import io
+from typing import Any
+
+import httpx
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from src.infrastructure.config.settings import HttpConfig
+from src.infrastructure.http.rate_limiter import RateLimiter
+from src.infrastructure.http.transport import HttpTransport, RequestRecord
+
+
+@pytest.fixture
+def sent(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Substitui o envio do HTTPAdapter por uma resposta 200 fixa, registrando a chamada."""
+    calls: list[dict[str, Any]] = []
+
+    def fake_send(self: HTTPAdapter, request: Any, **kwargs: Any) -> requests.Response:
+        calls.append({"request": request, **kwargs})
+        response = requests.Response()
+        response.status_code = 404 if request.url.endswith("/missing") else 200
+        response.headers["Content-Length"] = "2048"
+        response.raw = io.BytesIO(b"")
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    return calls
+
+
+def test_session_applies_headers_and_default_timeout(sent: list[dict[str, Any]]):
+    """Testa que a sessão leva autenticação, gzip e timeout padrão a toda requisição."""
+    transport = HttpTransport(HttpConfig(connect_timeout=5, timeout=20), "token")
+
+    transport.session.get("https://dev.azure.com/org/_apis/a")
+    transport.session.get("https://dev.azure.com/org/_apis/b", timeout=99)
+
+    request = sent[0]["request"]
+    assert request.headers["Authorization"].startswith("Basic ")
+    assert request.headers["Accept-Encoding"] == "gzip, deflate"
+    assert sent[0]["timeout"] == (5, 20)
+    assert sent[1]["timeout"] == 99
+
+
+def test_metrics_and_hooks(sent: list[dict[str, Any]]):
+    """Testa que cada resposta alimenta as métricas e os hooks registrados."""
+    transport = HttpTransport(HttpConfig(), "token")
+    records: list[RequestRecord] = []
+    transport.add_hook(records.append)
+
+    transport.session.get("https://dev.azure.com/org/_apis/ok")
+    transport.session.get("https://dev.azure.com/org/_apis/missing")
+
+    assert transport.metrics.requests == 2
+    assert transport.metrics.errors == 1
+    assert transport.metrics.bytes_received == 4096
+    assert [(r.method, r.status_code) for r in records] == [("GET", 200), ("GET", 404)]
+
+
+def test_metrics_separate_wall_time_from_summed_request_time():
+    """Testa que requisições concorrentes somam duração, mas o tempo de parede não."""
+    transport = HttpTransport(HttpConfig(), "token")
+    record = RequestRecord("GET", "https://dev.azure.com/org/_apis/x", 200, 1.0, 0)
+
+    transport._record(record)
+    transport._record(record)
+
+    assert transport.metrics.request_seconds == 2.0
+    assert 1.0 <= transport.metrics.wall_seconds < 1.5
+
+
+def test_retry_policy_leaves_throttling_to_limiter():
+    """Testa que 429 só é repetido pelo urllib3 quando não há agendador, e POST nunca."""
+    without_limiter = HttpTransport(HttpConfig(max_retries=5), "token").retry_policy()
+    with_limiter = HttpTransport(
+        HttpConfig(), "token", rate_limiter=RateLimiter(rate=10, burst=10)
+    ).retry_policy()
+
+    assert without_limiter.total == 5
+    assert 429 in (without_limiter.status_forcelist or [])
+    assert 429 not in (with_limiter.status_forcelist or [])
+    assert "POST" not in (with_limiter.allowed_methods or [])
+
+
+def test_async_client_shares_headers_and_metrics():
+    """Testa que o cliente httpx usa os mesmos headers e registra nas mesmas métricas."""
+    transport = HttpTransport(HttpConfig(gzip=False), "token")
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, content=b"abc")
+
+    async def run() -> None:
+        client = transport.async_client(2, httpx.MockTransport(handler))
+        try:
+            await client.get("https://dev.azure.com/org/_apis/x")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    assert seen[0].headers["Authorization"] == transport.headers["Authorization"]
+    assert transport.metrics.requests == 1
+    assert transport.metrics.bytes_received == 3